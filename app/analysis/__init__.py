@@ -0,0 +1,8 @@
+from app.startup.lazy import lazy_exports
+
+# So that a route using one of these doesn't import matplotlib with the rest
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    'build': ['BUILD_DIR', 'BuildGraph', 'code_fingerprint'],
+    'figures': ['DEEP_DIVE_IMAGES', 'ChartJob', 'FigureBuild', 'RenderResult'],
+    'smoothing': ['SMOOTHING_CACHE', 'SmoothingCache', 'lowess_batch', 'smooth', 'smooth_groups'],
+})
@@ -0,0 +1,252 @@
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+import types
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+
+# Project-relative home of build state and cached derived tables
+BUILD_DIR = os.path.join("data", "build")
+
+
+# -----------------------------------------------------------------------
+# Fingerprints
+#
+# A node's fingerprint covers everything that can change its output: the
+# source of its function (and of the helpers and constants it uses, from
+# its own module or anywhere in the app package), its parameters, the
+# files it reads and the fingerprints of the nodes it depends on. If none
+# of those changed, neither did the output.
+# -----------------------------------------------------------------------
+
+_CONSTANT_TYPES = (str, int, float, bool, type(None), tuple, list, dict, range)
+
+# Packages whose code is followed into from a fingerprinted function. Other
+# libraries change with their installed version, not with this repo.
+_TRACKED_PACKAGES = ("app",)
+
+
+def _code_names(code: types.CodeType) -> List[str]:
+    names = list(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):  # lambdas, comprehensions, nested defs
+            names.extend(_code_names(const))
+    return names
+
+
+def _tracked(module: Optional[str], func: Callable) -> bool:
+    # Code in the function's own module (an analysis script) or in the app package
+    return module == func.__module__ or (module or "").split(".")[0] in _TRACKED_PACKAGES
+
+
+def _reference_fingerprint(value: Any, func: Callable, seen: set) -> Optional[str]:
+    # What a global a function uses contributes, if anything
+    value = inspect.unwrap(value) if callable(value) else value  # lru_cache and other wrappers
+    if inspect.isfunction(value) and _tracked(value.__module__, func):
+        return code_fingerprint(value, seen) if value not in seen else ""
+    if inspect.isclass(value) and _tracked(value.__module__, func) and value not in seen:
+        seen.add(value)
+        try:
+            return hashlib.sha256(inspect.getsource(value).encode("utf-8")).hexdigest()
+        except (OSError, TypeError):
+            return None
+    if isinstance(value, _CONSTANT_TYPES):
+        return repr(value)
+    return None
+
+
+def code_fingerprint(func: Callable, _seen: Optional[set] = None) -> str:
+    """Hash of a function's source plus the source of the functions and
+    classes it uses from its own module or any app.* module (directly or
+    as `module.name`), and the values of plain constants (dicts, lists,
+    strings, numbers) it reads from module globals."""
+    seen = set() if _seen is None else _seen
+    seen.add(func)
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = func.__code__.co_code.hex()
+    digest = hashlib.sha256(source.encode("utf-8"))
+
+    names = sorted(set(_code_names(func.__code__)))
+    for name in names:
+        if name not in func.__globals__:
+            continue
+        value = func.__globals__[name]
+        if inspect.ismodule(value):
+            # `seasons.season_labels(...)`: the module's members this function names
+            if not _tracked(value.__name__, func):
+                continue
+            for attr in names:
+                part = _reference_fingerprint(getattr(value, attr, None), func, seen)
+                if part:
+                    digest.update(f"{name}.{attr}:{part}".encode("utf-8"))
+            continue
+        part = _reference_fingerprint(value, func, seen)
+        if part is not None:
+            digest.update(f"{name}:{part}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def file_signature(path: str) -> List[list]:
+    # (relative path, size, mtime) of a file, or of every file under a directory
+    if os.path.isfile(path):
+        stat = os.stat(path)
+        return [[os.path.basename(path), stat.st_size, stat.st_mtime_ns]]
+    entries = []
+    for root, _, files in os.walk(path):
+        for name in sorted(files):
+            full = os.path.join(root, name)
+            stat = os.stat(full)
+            entries.append([os.path.relpath(full, path), stat.st_size, stat.st_mtime_ns])
+    return sorted(entries)
+
+
+def _hash(*parts: Any) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=repr).encode("utf-8")).hexdigest()
+
+
+# -----------------------------------------------------------------------
+# Graph
+#
+# Derived tables are lazy nodes: a table is only computed (or read back
+# from its cached Parquet file) when something that needs it is actually
+# out of date. Dependencies are the function's parameter names, so
+# `def country_year_df(roster)` depends on the node called "roster".
+# -----------------------------------------------------------------------
+
+@dataclass
+class Node:
+    name: str
+    func: Callable
+    deps: List[str]
+    inputs: List[str] = field(default_factory=list)
+    params: Dict[str, Any] = field(default_factory=dict)
+    persist: bool = False
+
+
+class BuildGraph:
+
+    def __init__(self, name: str, root: str = BUILD_DIR):
+        self.name = name
+        self.root = root
+        self.state_path = os.path.join(root, f"{name}.json")
+        self.table_dir = os.path.join(root, "tables", name)
+        self.nodes: Dict[str, Node] = {}
+        self.state: Dict[str, dict] = {}
+        self._fingerprints: Dict[str, str] = {}
+        self._values: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+        if os.path.isfile(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    # -------------------------------------------------------------------
+    # Declaring nodes
+    # -------------------------------------------------------------------
+
+    def table(self, name: Optional[str] = None, inputs: Iterable[str] = (), persist: bool = True,
+              **params) -> Callable:
+        """Register a derived-table function. `inputs` are the files or
+        directories it reads; `params` are passed to it as keyword arguments
+        and are part of its fingerprint. With `persist`, the DataFrame it
+        returns is cached as Parquet and reused until the fingerprint moves."""
+        def register(func: Callable) -> Callable:
+            deps = [p for p in inspect.signature(func).parameters if p not in params]
+            self.nodes[name or func.__name__] = Node(name or func.__name__, func, deps, list(inputs),
+                                                     dict(params), persist)
+            return func
+        return register
+
+    def dependencies(self, func: Callable, params: Optional[dict] = None) -> List[str]:
+        # Parameters of `func` that name a node in this graph
+        params = params or {}
+        return [p for p in inspect.signature(func).parameters if p in self.nodes and p not in params]
+
+    # -------------------------------------------------------------------
+    # Fingerprints and state
+    # -------------------------------------------------------------------
+
+    def fingerprint(self, name: str) -> str:
+        with self._lock:
+            if name not in self._fingerprints:
+                node = self.nodes[name]
+                self._fingerprints[name] = _hash(
+                    code_fingerprint(node.func),
+                    node.params,
+                    {path: file_signature(path) for path in node.inputs},
+                    {dep: self.fingerprint(dep) for dep in node.deps}
+                )
+            return self._fingerprints[name]
+
+    def job_fingerprint(self, func: Callable, params: dict, extra: Any = None) -> str:
+        deps = self.dependencies(func, params)
+        return _hash(code_fingerprint(func), params, extra, {dep: self.fingerprint(dep) for dep in deps})
+
+    def is_current(self, key: str, fingerprint: str, outputs: Iterable[str] = ()) -> bool:
+        entry = self.state.get(key)
+        return (entry is not None and entry.get("fingerprint") == fingerprint
+                and all(os.path.exists(path) for path in outputs))
+
+    def record(self, key: str, fingerprint: str, outputs: Iterable[str] = (), **details) -> None:
+        with self._lock:
+            self.state[key] = {
+                "fingerprint": fingerprint,
+                "outputs": list(outputs),
+                "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                **details
+            }
+
+    def save(self) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        with open(f"{self.state_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=1, sort_keys=True, default=repr)
+        os.replace(f"{self.state_path}.tmp", self.state_path)
+
+    # -------------------------------------------------------------------
+    # Values
+    # -------------------------------------------------------------------
+
+    def _table_path(self, name: str, fingerprint: str) -> str:
+        return os.path.join(self.table_dir, f"{name}-{fingerprint[:16]}.parquet")
+
+    def value(self, name: str) -> Any:
+        """The table's value for this process: memoized, read from its cached
+        Parquet file if the fingerprint matches, otherwise computed (which
+        pulls in its dependencies) and cached."""
+        with self._lock:
+            if name in self._values:
+                return self._values[name]
+
+            node = self.nodes[name]
+            fingerprint = self.fingerprint(name)
+            path = self._table_path(name, fingerprint)
+            if node.persist and os.path.isfile(path):
+                self._values[name] = pd.read_parquet(path)
+                return self._values[name]
+
+            value = node.func(**{dep: self.value(dep) for dep in node.deps}, **node.params)
+            self._values[name] = value
+            outputs = []
+            if node.persist and isinstance(value, pd.DataFrame):
+                self._write_table(name, path, value)
+                outputs.append(path)
+            self.record(f"table:{name}", fingerprint, outputs,
+                        code=code_fingerprint(node.func), params=node.params, deps=node.deps,
+                        inputs={p: file_signature(p) for p in node.inputs})
+            return value
+
+    def _write_table(self, name: str, path: str, df: pd.DataFrame) -> None:
+        os.makedirs(self.table_dir, exist_ok=True)
+        df.to_parquet(f"{path}.tmp", compression="zstd")
+        os.replace(f"{path}.tmp", path)
+        # Older versions of this table are never read again
+        for old in os.listdir(self.table_dir):
+            if old.startswith(f"{name}-") and old.endswith(".parquet") and old != os.path.basename(path):
+                os.remove(os.path.join(self.table_dir, old))
@@ -0,0 +1,186 @@
+import multiprocessing as mp
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+
+import matplotlib.pyplot as plt
+
+from .build import BuildGraph
+
+
+# Project-relative root for deep-dive chart images
+DEEP_DIVE_IMAGES = os.path.join("static", "images", "deep-dives")
+
+
+# -----------------------------------------------------------------------
+# Chart jobs
+#
+# A deep-dive script registers each chart as a job: a function that draws
+# one figure and returns it, plus the PNG it's saved to. Jobs don't share
+# matplotlib state, so FigureBuild.render() can hand them to a pool of
+# worker processes and rasterize several 300-dpi figures at once.
+#
+# Workers look jobs up by build name rather than pickling the functions:
+# with fork they inherit the registry, and with spawn re-importing the
+# script registers the same jobs again before any of them run.
+#
+# With a BuildGraph, a draw function's parameters that name graph tables
+# are filled in with those tables, and a chart whose fingerprint (its code,
+# params, save options and the tables it uses) hasn't changed since it was
+# last rendered is skipped.
+# -----------------------------------------------------------------------
+
+@dataclass
+class ChartJob:
+    filename: str
+    draw: Callable
+    params: Dict = field(default_factory=dict)
+
+
+@dataclass
+class RenderResult:
+    filename: str
+    path: str
+    seconds: float
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+_BUILDS: Dict[str, "FigureBuild"] = {}
+
+
+def _render_job(build_name: str, filename: str) -> RenderResult:
+    # Runs in a worker process (or in-process with one worker)
+    build = _BUILDS[build_name]
+    job = build.jobs[filename]
+    path = os.path.join(build.output_dir, filename)
+    start = time.perf_counter()
+    try:
+        tables = {}
+        if build.graph is not None:
+            tables = {dep: build.graph.value(dep) for dep in build.graph.dependencies(job.draw, job.params)}
+        fig = job.draw(**tables, **job.params)
+        fig.savefig(path, **build.savefig_kwargs)
+        plt.close(fig)
+    except Exception:
+        plt.close("all")
+        return RenderResult(filename, path, time.perf_counter() - start, traceback.format_exc())
+    return RenderResult(filename, path, time.perf_counter() - start)
+
+
+def _headless() -> None:
+    # Builds never open windows: rasterize with Agg whatever backend the session picked
+    plt.switch_backend("Agg")
+
+
+def _pool_context():
+    # fork lets workers reuse the data the script already loaded
+    if "fork" in mp.get_all_start_methods():
+        return mp.get_context("fork")
+    return mp.get_context()
+
+
+class FigureBuild:
+
+    def __init__(self, name: str, output_dir: str, graph: Optional[BuildGraph] = None, **savefig_kwargs):
+        self.name = name
+        self.output_dir = output_dir
+        self.graph = graph
+        self.savefig_kwargs = savefig_kwargs
+        self.jobs: Dict[str, ChartJob] = {}
+        _BUILDS[name] = self
+
+    def chart(self, filename: str) -> Callable:
+        # Decorator: register a no-argument draw function for `filename`
+        def register(draw: Callable) -> Callable:
+            self.add(filename, draw)
+            return draw
+        return register
+
+    def add(self, filename: str, draw: Callable, **params) -> None:
+        if filename in self.jobs:
+            raise ValueError(f"Chart {filename} is registered twice in {self.name}")
+        self.jobs[filename] = ChartJob(filename, draw, params)
+
+    def fingerprint(self, filename: str) -> str:
+        job = self.jobs[filename]
+        return self.graph.job_fingerprint(job.draw, job.params, extra=self.savefig_kwargs)
+
+    def stale(self, names: Iterable[str]) -> List[str]:
+        # Charts whose inputs, code or params changed, or whose PNG is missing
+        if self.graph is None:
+            return list(names)
+        return [name for name in names
+                if not self.graph.is_current(f"chart:{name}", self.fingerprint(name),
+                                             [os.path.join(self.output_dir, name)])]
+
+    def render(self, workers: Optional[int] = None, only: Optional[Iterable[str]] = None,
+               force: bool = False, verbose: bool = True) -> List[RenderResult]:
+        """Render the registered charts (or just `only`) across `workers`
+        processes, one figure per task, skipping charts that are up to date
+        unless `force`. Results for the rendered charts come back in
+        registration order; a chart that raises is reported, not fatal."""
+        wanted = list(self.jobs) if only is None else [name for name in self.jobs if name in set(only)]
+        names = wanted if force else self.stale(wanted)
+        if verbose and len(names) < len(wanted):
+            print(f"⏭  {len(wanted) - len(names)} charts up to date")
+        if not names:
+            return []
+        workers = min(workers or os.cpu_count() or 1, len(names))
+        os.makedirs(self.output_dir, exist_ok=True)
+        _headless()
+
+        # Build the tables the stale charts need once, up front; forked
+        # workers inherit them instead of each rebuilding their own copy
+        if self.graph is not None:
+            for name in names:
+                job = self.jobs[name]
+                for dep in self.graph.dependencies(job.draw, job.params):
+                    self.graph.value(dep)
+
+        start = time.perf_counter()
+        results: Dict[str, RenderResult] = {}
+        if workers == 1:
+            for name in names:
+                results[name] = _render_job(self.name, name)
+                if verbose:
+                    self._print(results[name])
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context(),
+                                     initializer=_headless) as pool:
+                futures = [pool.submit(_render_job, self.name, name) for name in names]
+                for future in as_completed(futures):
+                    result = future.result()
+                    results[result.filename] = result
+                    if verbose:
+                        self._print(result)
+
+        ordered = [results[name] for name in names]
+        if self.graph is not None:
+            for result in ordered:
+                if result.ok:
+                    job = self.jobs[result.filename]
+                    self.graph.record(f"chart:{result.filename}", self.fingerprint(result.filename),
+                                      [result.path], params=job.params,
+                                      deps=self.graph.dependencies(job.draw, job.params))
+            self.graph.save()
+        if verbose:
+            wall = time.perf_counter() - start
+            busy = sum(result.seconds for result in ordered)
+            failed = sum(not result.ok for result in ordered)
+            print(f"🖼  {len(ordered) - failed}/{len(ordered)} charts in {wall:.1f}s "
+                  f"({busy:.1f}s of rendering across {workers} workers)")
+        return ordered
+
+    @staticmethod
+    def _print(result: RenderResult) -> None:
+        if result.ok:
+            print(f"✅ Saved: {result.path} ({result.seconds:.2f}s)")
+        else:
+            print(f"❌ Failed: {result.filename}\n{result.error}")
@@ -0,0 +1,271 @@
+import hashlib
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+# Project-relative location of the on-disk smoothing cache
+SMOOTHING_CACHE = os.path.join("data", "smoothing_cache")
+
+
+# -----------------------------------------------------------------------
+# Batched LOESS
+#
+# The same algorithm as statsmodels' lowess (local linear fits with
+# tricube distance weights, `it` rounds of bisquare robustness weights,
+# delta=0), but every fitted point of every series is solved at once.
+# Series are concatenated; each fitted point gets a row of neighbour
+# indices into the concatenation, so one round of the fit is a handful of
+# array operations over a (points x window) matrix per distinct window
+# size, no matter how many groups there are. The arithmetic is done in
+# statsmodels' order, so the curves are bit-for-bit identical to its own.
+# -----------------------------------------------------------------------
+
+def _windows(x: np.ndarray, starts: np.ndarray, sizes: np.ndarray, frac: float
+             ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # First neighbour index, window size and radius for every point
+    left = np.empty(len(x), dtype=np.int64)
+    ks = np.empty(len(x), dtype=np.int64)
+    for start, n in zip(starts, sizes):
+        xs = x[start:start + n]
+        k = min(max(int(frac * n + 1e-10), 2), n)
+        # statsmodels slides the window right while x_i is past the midpoint
+        # of its two ends; counting those midpoints gives the same window
+        midpoints = (xs[:n - k] + xs[k:]) / 2.0
+        left[start:start + n] = start + np.searchsorted(midpoints, xs, side='left')
+        ks[start:start + n] = k
+
+    right = left + ks - 1
+    radius = np.maximum(x - x[left], x[right] - x)
+    return left, ks, radius
+
+
+def _fit_windows(x: np.ndarray, y: np.ndarray, rows: np.ndarray, index: np.ndarray,
+                 radius: np.ndarray, resid_weights: np.ndarray) -> np.ndarray:
+    # Local linear fits at x[rows], each over one row of `index`. The sums
+    # run over the window in order and the cubes are written out, as in
+    # statsmodels' C loop: when most fits interpolate their points exactly,
+    # the median residual is rounding noise and the robustness weights
+    # depend on the last bit of every fit.
+    xi = x[rows]
+    xj = x[index]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dist = np.abs(xj - xi[:, None]) / radius[:, None]
+        tricube = 1.0 - dist * dist * dist
+        weights = tricube * tricube * tricube * resid_weights[index]
+
+        # Too few usable neighbours: statsmodels falls back to the raw value
+        reg_ok = (weights > 1e-12).sum(axis=1) >= 2
+        weights = weights / weights.sum(axis=1, keepdims=True)
+
+        mean_x = np.zeros(len(rows))
+        for j in range(index.shape[1]):
+            mean_x += weights[:, j] * xj[:, j]
+        sqdev_x = np.zeros(len(rows))
+        for j in range(index.shape[1]):
+            sqdev_x += weights[:, j] * (xj[:, j] - mean_x) ** 2
+        sqdev_x = np.maximum(sqdev_x, 1e-12)
+        fitted = np.zeros(len(rows))
+        for j in range(index.shape[1]):
+            fitted += weights[:, j] * (1.0 + (xi - mean_x) * (xj[:, j] - mean_x) / sqdev_x) * y[index[:, j]]
+    return np.where(reg_ok, fitted, y[rows])
+
+
+def _fit(x: np.ndarray, y: np.ndarray, left: np.ndarray, ks: np.ndarray,
+         radius: np.ndarray, resid_weights: np.ndarray) -> np.ndarray:
+    # Points are fitted in one batch per window size (one per series
+    # length), so no window is padded
+    fitted = np.empty(len(x))
+    for k in np.unique(ks):
+        rows = np.flatnonzero(ks == k)
+        index = left[rows, None] + np.arange(k)[None, :]
+        fitted[rows] = _fit_windows(x, y, rows, index, radius[rows], resid_weights)
+    return fitted
+
+
+def _residual_weights(y: np.ndarray, fitted: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    resid = np.abs(y - fitted)
+    median = pd.Series(resid).groupby(groups).transform('median').to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scaled = np.where(median == 0, (resid > 0).astype(float), resid / (6.0 * median))
+    return (1.0 - np.minimum(scaled, 1.0) ** 2) ** 2
+
+
+def lowess_batch(series: Sequence[Tuple[np.ndarray, np.ndarray]], frac: float = 2.0 / 3.0,
+                 it: int = 3) -> List[np.ndarray]:
+    """Smooth several (x, y) series in one pass.
+
+    Returns one (n, 2) array per series, sorted by x, exactly as
+    statsmodels' `lowess(y, x, frac=frac, it=it, return_sorted=True)` would.
+    Non-finite points are dropped first, as statsmodels does.
+    """
+    if not 0 <= frac <= 1:
+        raise ValueError("LOESS `frac` must be in the range [0, 1]")
+
+    xs, ys, sizes = [], [], []
+    for x, y in series:
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        valid = np.isfinite(x) & np.isfinite(y)
+        # Same (unstable) sort as statsmodels, so tied x values line up identically
+        order = np.argsort(x[valid])
+        xs.append(x[valid][order])
+        ys.append(y[valid][order])
+        sizes.append(len(order))
+    sizes = np.array(sizes, dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+
+    results = [np.empty((0, 2)) for _ in sizes]
+    smoothable = sizes > 0
+    if smoothable.any():
+        x = np.concatenate(xs)
+        y = np.concatenate(ys)
+        groups = np.repeat(np.arange(len(sizes)), sizes)
+        left, ks, radius = _windows(x, starts[smoothable], sizes[smoothable], frac)
+
+        # statsmodels fits the first of a run of tied x values and copies
+        # that fit to the rest of the run
+        run_start = np.ones(len(x), dtype=bool)
+        run_start[1:] = (x[1:] != x[:-1]) | (groups[1:] != groups[:-1])
+        first_of_run = np.maximum.accumulate(np.where(run_start, np.arange(len(x)), 0))
+
+        resid_weights = np.ones(len(x))
+        for round_ in range(it + 1):
+            fitted = _fit(x, y, left, ks, radius, resid_weights)[first_of_run]
+            if round_ < it:
+                resid_weights = _residual_weights(y, fitted, groups)
+
+        for i in np.flatnonzero(smoothable):
+            span = slice(starts[i], starts[i] + sizes[i])
+            results[i] = np.column_stack([x[span], fitted[span]])
+    return results
+
+
+# -----------------------------------------------------------------------
+# Result cache
+#
+# Keyed by a hash of the series itself plus the smoothing parameters, so
+# a chart rebuild only re-smooths series whose data actually changed.
+# Entries live in memory and, with a root directory, as .npy files that
+# survive between script runs.
+# -----------------------------------------------------------------------
+
+@dataclass
+class SmoothingStats:
+    hits: int = 0
+    misses: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, name: str, n: int = 1) -> None:
+        with self.lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def report(self) -> str:
+        return f"{self.hits} smoothed series reused, {self.misses} recomputed"
+
+
+class SmoothingCache:
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root
+        self.stats = SmoothingStats()
+        self._memory: Dict[str, np.ndarray] = {}
+
+    @staticmethod
+    def key(x: np.ndarray, y: np.ndarray, frac: float, it: int) -> str:
+        digest = hashlib.sha256(f"lowess frac={frac!r} it={it}".encode("utf-8"))
+        for values in (x, y):
+            values = np.ascontiguousarray(values, dtype=float)
+            digest.update(len(values).to_bytes(8, "little"))
+            digest.update(values.tobytes())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.npy")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        if key in self._memory:
+            return self._memory[key]
+        if self.root is not None and os.path.isfile(self._path(key)):
+            self._memory[key] = np.load(self._path(key))
+            return self._memory[key]
+        return None
+
+    def put(self, key: str, curve: np.ndarray) -> None:
+        self._memory[key] = curve
+        if self.root is None:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Per-writer temp name: charts built in parallel processes can smooth the same series
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, curve)
+        os.replace(tmp_path, path)
+
+
+def _cached_batch(series: List[Tuple[np.ndarray, np.ndarray]], frac: float, it: int,
+                  cache: Optional[SmoothingCache]) -> List[np.ndarray]:
+    if cache is None:
+        return lowess_batch(series, frac=frac, it=it)
+
+    keys = [SmoothingCache.key(x, y, frac, it) for x, y in series]
+    curves = [cache.get(key) for key in keys]
+    todo = [i for i, curve in enumerate(curves) if curve is None]
+    cache.stats.add('hits', len(series) - len(todo))
+    cache.stats.add('misses', len(todo))
+
+    for i, curve in zip(todo, lowess_batch([series[i] for i in todo], frac=frac, it=it)):
+        cache.put(keys[i], curve)
+        curves[i] = curve
+    return curves
+
+
+# -----------------------------------------------------------------------
+# Frame-level API
+# -----------------------------------------------------------------------
+
+def smooth_groups(df: pd.DataFrame, x: str, y: Union[str, List[str]], group: Optional[str] = None,
+                  frac: float = 2.0 / 3.0, it: int = 3,
+                  cache: Optional[SmoothingCache] = None) -> pd.DataFrame:
+    """LOESS-smooth every `y` column within every `group` of a long frame.
+
+    Returns a long frame of smoothed curves: `group` (if given), `x` and one
+    column per `y`, sorted by x within each group, ready to plot group by
+    group. All series (groups x metrics) are smoothed in a single batch and
+    unchanged ones come straight from `cache`.
+    """
+    metrics = [y] if isinstance(y, str) else list(y)
+    parts = [(None, df)] if group is None else list(df.groupby(group, observed=True, sort=False))
+
+    series, labels = [], []
+    for name, part in parts:
+        for metric in metrics:
+            series.append((part[x].to_numpy(dtype=float), part[metric].to_numpy(dtype=float)))
+            labels.append((name, metric))
+    curves = _cached_batch(series, frac, it, cache)
+
+    frames = []
+    for name, _ in parts:
+        by_metric = {metric: curve for (label, metric), curve in zip(labels, curves) if label == name}
+        lengths = {len(curve) for curve in by_metric.values()}
+        if len(lengths) > 1:
+            # Metrics with different gaps can't share an x column; keep them apart
+            out = pd.concat([pd.DataFrame({x: c[:, 0], m: c[:, 1]}) for m, c in by_metric.items()])
+        else:
+            first = next(iter(by_metric.values()))
+            out = pd.DataFrame({x: first[:, 0], **{m: c[:, 1] for m, c in by_metric.items()}})
+        if group is not None:
+            out.insert(0, group, name)
+        frames.append(out)
+    return pd.concat(frames, ignore_index=True)
+
+
+def smooth(x, y, frac: float = 2.0 / 3.0, it: int = 3, cache: Optional[SmoothingCache] = None) -> np.ndarray:
+    # Single-series convenience: same (n, 2) array as statsmodels' lowess
+    series = [(np.asarray(x, dtype=float), np.asarray(y, dtype=float))]
+    return _cached_batch(series, frac, it, cache)[0]
@@ -0,0 +1,4 @@
+from .compress import (ENCODINGS, PrecompressedStaticFiles, cached_response, compress_static, negotiated_response, precompress,
+                       variant_etag)
+from .fingerprint import ASSET_MANIFEST, HASHED_DIR, IMMUTABLE, ImmutableStaticFiles, asset_url, fingerprint_assets
+from .images import IMAGE_MANIFEST, OPTIMIZED_DIR, optimize_images, picture
@@ -0,0 +1,21 @@
+import argparse
+
+from .compress import compress_static
+from .fingerprint import fingerprint_assets
+from .images import optimize_images
+
+
+# -----------------------------------------------------------------------
+# Asset pipeline: python -m app.assets
+# -----------------------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build optimized variants of the site's static assets")
+    parser.add_argument("--force", action="store_true", help="rebuild every asset, changed or not")
+    args = parser.parse_args()
+
+    # Fingerprint after optimizing so the chart variants get hashed names
+    # too, then precompress the text files among everything that's served
+    optimize_images(force=args.force)
+    fingerprint_assets()
+    compress_static()
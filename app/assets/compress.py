@@ -0,0 +1,224 @@
+import gzip
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, Mapping, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:  # brotli is optional: without it everything is gzip-only
+    brotli = None
+
+
+# Text formats worth compressing; images and fonts are compressed already
+COMPRESSIBLE = (".html", ".css", ".js", ".json", ".svg", ".txt", ".xml")
+
+# Bodies smaller than this go out as-is: the headers would eat the saving
+MIN_SIZE = 512
+
+# Server preference when the client accepts several encodings
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+EXTENSIONS = {"br": ".br", "gzip": ".gz"}
+
+
+# -----------------------------------------------------------------------
+# Encoding
+#
+# Everything is compressed once at the highest level (it's done at build
+# time or when a page is first rendered, never per request) and a variant
+# is only kept if it is actually smaller.
+# -----------------------------------------------------------------------
+
+def encode(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=11)
+    # mtime=0 keeps the output, and so ETags and file hashes, reproducible
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def precompress(body: bytes) -> Dict[str, bytes]:
+    # Every supported encoding of `body` that's worth sending instead of it
+    if len(body) < MIN_SIZE:
+        return {}
+    variants = {encoding: encode(body, encoding) for encoding in ENCODINGS}
+    return {encoding: data for encoding, data in variants.items() if len(data) < len(body)}
+
+
+def negotiate(accept_encoding: Optional[str], available: Iterable[str]) -> Optional[str]:
+    """The encoding to send, given the request's Accept-Encoding and the
+    variants on hand, or None for the identity body."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    available = set(available)
+    for encoding in ENCODINGS:
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def negotiated_response(request: Request, body: bytes, variants: Mapping[str, bytes], media_type: str,
+                        headers: Optional[Dict[str, str]] = None, etag: Optional[str] = None) -> Response:
+    """Response carrying the best pre-encoded variant of `body` the client
+    accepts. `etag` is the identity ETag; encoded variants get their own
+    ("<etag>-br") since they're different bytes."""
+    headers = dict(headers or {})
+    headers["Vary"] = "Accept-Encoding"
+    encoding = negotiate(request.headers.get("accept-encoding"), variants)
+    if encoding is not None:
+        body = variants[encoding]
+        headers["Content-Encoding"] = encoding
+    if etag is not None:
+        headers["ETag"] = variant_etag(etag, encoding)
+    return Response(content = body, media_type = media_type, headers = headers)
+
+
+def variant_etag(etag: str, encoding: Optional[str]) -> str:
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+
+def cached_response(request: Request, body: bytes, variants: Mapping[str, bytes], media_type: str,
+                    etag: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    """negotiated_response for a body held in memory with its ETag, that
+    answers a matching If-None-Match (for any of its encodings) with an
+    empty 304 instead."""
+    tags = [tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")]
+    for encoding in [None, *variants]:
+        if variant_etag(etag, encoding) in tags:
+            return Response(status_code = 304, headers = {
+                **(headers or {}), "ETag": variant_etag(etag, encoding), "Vary": "Accept-Encoding"
+            })
+    return negotiated_response(request, body, variants, media_type, headers, etag = etag)
+
+
+# -----------------------------------------------------------------------
+# Build step: .gz / .br files next to every compressible static file
+# -----------------------------------------------------------------------
+
+@dataclass
+class CompressionStats:
+    files: int = 0
+    source_bytes: int = 0
+    best_bytes: int = 0
+
+    def report(self) -> str:
+        return (f"{self.files} text files precompressed "
+                f"({self.source_bytes / 1024:.0f} KB -> {self.best_bytes / 1024:.0f} KB)")
+
+
+def compress_static(static_dir: str = "static", verbose: bool = True) -> CompressionStats:
+    """Write <file>.br / <file>.gz beside each compressible file under
+    `static_dir` whose variants are missing or older than the file."""
+    stats = CompressionStats()
+    for root, _, files in os.walk(static_dir):
+        for name in sorted(files):
+            if not name.endswith(COMPRESSIBLE):
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                body = f.read()
+            variants = {}
+            for encoding in ENCODINGS:
+                target = path + EXTENSIONS[encoding]
+                if os.path.isfile(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                    variants[encoding] = os.path.getsize(target)
+                    continue
+                data = encode(body, encoding)
+                if len(body) < MIN_SIZE or len(data) >= len(body):
+                    if os.path.isfile(target):
+                        os.remove(target)
+                    continue
+                with open(f"{target}.tmp", "wb") as f:
+                    f.write(data)
+                os.replace(f"{target}.tmp", target)
+                variants[encoding] = len(data)
+            if variants:
+                stats.files += 1
+                stats.source_bytes += len(body)
+                stats.best_bytes += min(variants.values())
+
+    if verbose:
+        print(f"🗜  {stats.report()}")
+    return stats
+
+
+# -----------------------------------------------------------------------
+# Serving
+# -----------------------------------------------------------------------
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that answers with a prebuilt .br / .gz sibling when the
+    client accepts it, and optionally sets a Cache-Control on everything."""
+
+    def __init__(self, *args, cache_control: Optional[str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+
+    async def get_response(self, path: str, scope: Scope):
+        response = await super().get_response(path, scope)
+        if isinstance(response, FileResponse) and response.status_code == 200 and path.endswith(COMPRESSIBLE):
+            response = self._encoded(response, scope)
+        cache_control = self._cache_control(path)
+        if cache_control is not None and response.status_code in (200, 304):
+            response.headers["Cache-Control"] = cache_control
+        return response
+
+    def _cache_control(self, path: str) -> Optional[str]:
+        return self.cache_control
+
+    @staticmethod
+    def _variants(path: str) -> Dict[str, os.stat_result]:
+        # The .br / .gz siblings of `path` that are at least as new as it. One
+        # left behind by an edit that wasn't followed by a rebuild would serve
+        # the old content, so it's skipped until compress_static() catches up.
+        source_mtime = os.stat(path).st_mtime
+        variants = {}
+        for encoding in ENCODINGS:
+            try:
+                stat = os.stat(path + EXTENSIONS[encoding])
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime >= source_mtime:
+                variants[encoding] = stat
+        return variants
+
+    @classmethod
+    def _encoded(cls, response: FileResponse, scope: Scope) -> Response:
+        request_headers = Headers(scope = scope)
+        variants = cls._variants(response.path)
+        encoding = negotiate(request_headers.get("accept-encoding"), variants)
+        if encoding is None:
+            response.headers["Vary"] = "Accept-Encoding"
+            return response
+
+        path = response.path + EXTENSIONS[encoding]
+        encoded = FileResponse(path, media_type = response.media_type, stat_result = variants[encoding])
+        encoded.headers["Content-Encoding"] = encoding
+        encoded.headers["Vary"] = "Accept-Encoding"
+        encoded.headers["ETag"] = variant_etag(response.headers["etag"], encoding)
+        encoded.headers["Last-Modified"] = response.headers["last-modified"]
+
+        # StaticFiles only checked the identity ETag; a cached encoded copy is revalidated here
+        if_none_match = request_headers.get("if-none-match", "")
+        if encoded.headers["ETag"] in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+            return NotModifiedResponse(encoded.headers)
+        return encoded
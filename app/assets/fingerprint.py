@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+from .compress import EXTENSIONS, PrecompressedStaticFiles
+
+
+# Project-relative locations: what gets fingerprinted, where the hashed
+# copies go (served under /static/hashed) and the logical -> hashed map
+STATIC_DIR = "static"
+HASHED_DIR = os.path.join(STATIC_DIR, "hashed")
+ASSET_MANIFEST = os.path.join(HASHED_DIR, "manifest.json")
+
+# A hashed URL never changes content, so it can be cached for a year
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# <stem>.<10 hex digits><ext>, as _hashed_name() builds them
+HASHED_NAME = re.compile(r"\.[0-9a-f]{10}(\.[^./]*)?$")
+
+
+# -----------------------------------------------------------------------
+# Build step
+#
+# Every file under static/ (the stylesheet, images and the optimized chart
+# variants) is copied to static/hashed/ with the first 10 hex digits of its
+# sha256 in the name: style.css -> hashed/style.1a2b3c4d5e.css. Copies,
+# not links, because matplotlib rewrites chart PNGs in place. A changed
+# file gets a new URL; pages that reference it through asset_url() pick
+# up the new one the next time they're rendered.
+# -----------------------------------------------------------------------
+
+@dataclass
+class FingerprintStats:
+    copied: int = 0
+    unchanged: int = 0
+    removed: int = 0
+
+    def report(self) -> str:
+        return f"{self.copied} fingerprinted, {self.unchanged} unchanged, {self.removed} stale copies removed"
+
+
+def _hashed_name(rel: str, digest: str) -> str:
+    stem, ext = os.path.splitext(rel)
+    return f"{stem}.{digest[:10]}{ext}"
+
+
+def _static_files(static_dir: str, skip: Iterable[str]) -> Iterable[str]:
+    skip = {os.path.normpath(path) for path in skip}
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.normpath(os.path.join(root, d)) not in skip)
+        for name in sorted(files):
+            if not name.endswith((".tmp", *EXTENSIONS.values())):
+                yield os.path.join(root, name)
+
+
+def fingerprint_assets(static_dir: str = STATIC_DIR, hashed_dir: str = HASHED_DIR,
+                       manifest_path: str = ASSET_MANIFEST, verbose: bool = True) -> FingerprintStats:
+    """Copy every static file to its content-hashed name under `hashed_dir`,
+    drop copies nothing refers to any more and write the asset manifest."""
+    stats = FingerprintStats()
+    manifest = {}
+    for path in _static_files(static_dir, skip=[hashed_dir]):
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        rel = os.path.relpath(path, static_dir)
+        hashed = _hashed_name(rel, digest)
+        target = os.path.join(hashed_dir, hashed)
+        if os.path.isfile(target):
+            stats.unchanged += 1
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(path, f"{target}.tmp")
+            os.replace(f"{target}.tmp", target)
+            stats.copied += 1
+        manifest[rel.replace(os.sep, "/")] = os.path.relpath(target, static_dir).replace(os.sep, "/")
+
+    keep = {os.path.normpath(os.path.join(static_dir, hashed)) for hashed in manifest.values()}
+    keep.add(os.path.normpath(manifest_path))
+    for root, _, files in os.walk(hashed_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            # A precompressed .br / .gz copy lives as long as the file it encodes
+            original = os.path.splitext(path)[0] if name.endswith(tuple(EXTENSIONS.values())) else path
+            if os.path.normpath(original) not in keep:
+                os.remove(path)
+                stats.removed += 1
+
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    _load_manifest.cache_clear()
+
+    if verbose:
+        print(f"🔖 {stats.report()}")
+    return stats
+
+
+# -----------------------------------------------------------------------
+# Template helper and serving
+# -----------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def _load_manifest(path: str = ASSET_MANIFEST) -> Dict[str, str]:
+    if not os.path.isfile(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def asset_url(name: str) -> str:
+    """URL for a static file, by its logical name ("style.css" or
+    "/static/style.css"): the fingerprinted copy if the pipeline has built
+    one, otherwise the plain /static URL."""
+    rel = name[len("/static/"):] if name.startswith("/static/") else name.lstrip("/")
+    return f"/static/{_load_manifest().get(rel, rel)}"
+
+
+class ImmutableStaticFiles(PrecompressedStaticFiles):
+    # Static files for fingerprinted copies, which may be cached for good.
+    # Anything else in the directory (the manifest, rewritten on every build)
+    # has to be revalidated instead.
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, cache_control = IMMUTABLE, **kwargs)
+
+    def _cache_control(self, path: str) -> Optional[str]:
+        return self.cache_control if HASHED_NAME.search(path) else "no-cache"
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from html import escape
+from typing import Dict, Iterable, List, Optional
+
+from markupsafe import Markup
+
+from .fingerprint import asset_url
+
+
+# Project-relative locations: charts to optimize, where variants go, and
+# the manifest the templates read to emit <picture> / srcset markup
+IMAGE_SOURCES = (os.path.join("static", "images", "deep-dives"),)
+OPTIMIZED_DIR = os.path.join("static", "optimized")
+IMAGE_MANIFEST = os.path.join(OPTIMIZED_DIR, "images.json")
+
+# Rendered widths. Charts are 3600px wide at 300 dpi; the post column is
+# at most ~1100 CSS px, so 1920 covers 2x screens and 640 covers phones.
+WIDTHS = (640, 1280, 1920)
+
+# Preferred first: browsers take the first <source> they can decode. The
+# PNG fallback is the full-size chart recompressed losslessly: downscaled
+# PNGs of antialiased charts come out bigger, not smaller.
+FORMATS = {
+    "avif": ("AVIF", {"quality": 60, "speed": 6}),
+    "webp": ("WEBP", {"quality": 82, "method": 4}),
+    "png": ("PNG", {"optimize": True})
+}
+FALLBACK = "png"
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp", "png": "image/png"}
+
+
+# -----------------------------------------------------------------------
+# Build step
+#
+# For every chart PNG: resize to each width (never upscaling), save AVIF
+# and WebP, add the recompressed PNG fallback, and record every variant with its
+# pixel dimensions in the manifest. Sources whose content and settings
+# are unchanged since the last run are skipped. Pillow is only needed
+# here, at build time; serving the site only reads the manifest.
+# -----------------------------------------------------------------------
+
+@dataclass
+class ImageStats:
+    optimized: int = 0
+    skipped: int = 0
+    source_bytes: int = 0
+    avif_bytes: int = 0
+
+    def report(self) -> str:
+        ratio = self.source_bytes / self.avif_bytes if self.avif_bytes else 0
+        return (f"{self.optimized} optimized, {self.skipped} up to date; "
+                f"{self.source_bytes / 1e6:.1f} MB of PNG -> {self.avif_bytes / 1e6:.1f} MB "
+                f"as {WIDTHS[1]}px AVIF ({ratio:.1f}x smaller)")
+
+
+def _url(path: str) -> str:
+    # static/images/x.png -> /static/images/x.png
+    return "/" + path.replace(os.sep, "/")
+
+
+def _settings_key() -> str:
+    return json.dumps([WIDTHS, FORMATS], sort_keys=True)
+
+
+def _source_images(sources: Iterable[str]) -> List[str]:
+    paths = []
+    for source in sources:
+        for root, _, files in os.walk(source):
+            paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(".png"))
+    return sorted(paths)
+
+
+def _optimize(path: str, out_dir: str) -> Dict:
+    from PIL import Image
+
+    rel = os.path.splitext(os.path.relpath(path, "static"))[0]
+    with Image.open(path) as image:
+        image.load()
+        width, height = image.size
+        scaled = {width: image}
+        for target in {min(w, width) for w in WIDTHS} - {width}:
+            scaled[target] = image.resize((target, round(height * target / width)), Image.Resampling.LANCZOS)
+
+        variants = {}
+        for fmt, (pil_format, options) in FORMATS.items():
+            targets = [width] if fmt == FALLBACK else sorted({min(w, width) for w in WIDTHS})
+            variants[fmt] = []
+            for target in targets:
+                out = os.path.join(out_dir, f"{rel}-{target}.{fmt}")
+                os.makedirs(os.path.dirname(out), exist_ok=True)
+                scaled[target].save(f"{out}.tmp", pil_format, **options)
+                os.replace(f"{out}.tmp", out)
+                variants[fmt].append({
+                    "url": _url(out),
+                    "width": scaled[target].width,
+                    "height": scaled[target].height,
+                    "bytes": os.path.getsize(out)
+                })
+    return {"width": width, "height": height, "variants": variants}
+
+
+def optimize_images(sources: Iterable[str] = IMAGE_SOURCES, out_dir: str = OPTIMIZED_DIR,
+                    manifest_path: str = IMAGE_MANIFEST, force: bool = False,
+                    verbose: bool = True) -> ImageStats:
+    """Build width/format variants of every PNG under `sources` and write the
+    image manifest. Only sources that changed since the last run are redone."""
+    try:
+        import PIL  # noqa: F401
+    except ImportError as exc:
+        raise RuntimeError("Image optimization needs Pillow: pip install pillow") from exc
+
+    previous = {}
+    if os.path.isfile(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    settings = _settings_key()
+
+    stats = ImageStats()
+    manifest = {}
+    for path in _source_images(sources):
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        url = _url(path)
+        stats.source_bytes += os.path.getsize(path)
+
+        entry = previous.get(url)
+        current = (
+            not force and entry is not None
+            and entry.get("sha256") == digest and entry.get("settings") == settings
+            and all(os.path.isfile(v["url"].lstrip("/")) for vs in entry["variants"].values() for v in vs)
+        )
+        if current:
+            stats.skipped += 1
+        else:
+            start = time.perf_counter()
+            entry = {"sha256": digest, "settings": settings, **_optimize(path, out_dir)}
+            stats.optimized += 1
+            if verbose:
+                print(f"🗜  {url} ({time.perf_counter() - start:.1f}s)")
+        stats.avif_bytes += next((v["bytes"] for v in entry["variants"]["avif"] if v["width"] >= WIDTHS[1]),
+                                 entry["variants"]["avif"][-1]["bytes"])
+        manifest[url] = entry
+
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(f"{manifest_path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    _load_manifest.cache_clear()
+
+    if verbose:
+        print(f"🖼  {stats.report()}")
+    return stats
+
+
+# -----------------------------------------------------------------------
+# Template helper
+# -----------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def _load_manifest(path: str = IMAGE_MANIFEST) -> Dict:
+    if not os.path.isfile(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def picture(src: str, alt: str, sizes: str = "(max-width: 900px) 100vw, 60vw",
+            manifest: Optional[Dict] = None, **attrs) -> Markup:
+    """<picture> markup for a chart: AVIF and WebP sources with a srcset over
+    the built widths, the full-size PNG as the <img> fallback, and explicit
+    width/height so the layout doesn't shift while it loads. Falls back to a plain <img> of
+    `src` if the image hasn't been through the optimizer."""
+    entry = (_load_manifest() if manifest is None else manifest).get(src)
+    extra = "".join(f' {name.replace("_", "-")}="{escape(str(value))}"' for name, value in attrs.items())
+    if entry is None:
+        return Markup(f'<img src="{escape(asset_url(src))}" alt="{escape(alt)}"{extra}>')
+
+    def srcset(fmt: str) -> str:
+        return ", ".join(f'{asset_url(v["url"])} {v["width"]}w' for v in entry["variants"][fmt])
+
+    fallback = entry["variants"][FALLBACK][-1]
+    sources = "".join(
+        f'<source type="{MIME_TYPES[fmt]}" srcset="{srcset(fmt)}" sizes="{escape(sizes)}">'
+        for fmt in FORMATS if fmt != FALLBACK
+    )
+    return Markup(
+        f'<picture>{sources}'
+        f'<img src="{asset_url(fallback["url"])}" '
+        f'width="{entry["width"]}" height="{entry["height"]}" alt="{escape(alt)}" '
+        f'loading="lazy" decoding="async"{extra}></picture>'
+    )
+
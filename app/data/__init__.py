@@ -0,0 +1,13 @@
+from app.startup.lazy import lazy_exports
+
+# Imported when first used, so the server (which needs lookup and shared)
+# never imports pandas; see app.startup.lazy
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    'careers': ['PLAYER_CAREERS', 'POSITION_GROUPS', 'build_player_careers', 'load_player_careers',
+                'write_player_careers'],
+    'lookup': ['LookupDocument', 'RosterIndex', 'roster_index'],
+    'paths': ['ROSTER_CSV', 'ROSTER_STORE', 'store_mtime'],
+    'shared': ['SERVING_DIR', 'DocumentTable', 'SharedDataset'],
+    'store': ['load_rosters', 'write_roster_store'],
+    'seasons': ['season_index', 'season_labels', 'season_start_dates', 'season_ticks', 'start_year', 'year_labels'],
+})
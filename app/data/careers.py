@@ -0,0 +1,102 @@
+import os
+from typing import List, Optional
+
+import pandas as pd
+
+from .paths import ROSTER_STORE, store_mtime
+from .seasons import start_year
+from .store import load_rosters
+
+
+# Project-relative location of the materialized careers table
+PLAYER_CAREERS = os.path.join("data", "nhl-player-demographics", "player_careers.parquet")
+
+# Position codes -> the groups every deep dive charts by
+POSITION_GROUPS = {'C': 'Forward', 'L': 'Forward', 'R': 'Forward', 'D': 'Defense', 'G': 'Goalie'}
+
+
+# -----------------------------------------------------------------------
+# Build
+#
+# One row per player id with everything the deep dives keep re-deriving
+# from the roster rows: debut/final season, career length, teams played
+# for, debut team and how long they stayed, most-played team, position
+# group and whether they're still active.
+# -----------------------------------------------------------------------
+
+def build_player_careers(roster: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate roster rows (one per player-team-season) into careers.
+
+    `career_length` counts roster rows, i.e. team-seasons, to match how the
+    deep dives have always measured it; `num_seasons` counts distinct seasons.
+    """
+    df = roster.sort_values(['id', 'season'], kind='stable').copy()
+    df['team'] = df['team'].astype(str)
+    df['position_group'] = df['position'].astype(object).map(POSITION_GROUPS)
+    by_player = df.groupby('id', sort=True)
+
+    careers = by_player.agg(
+        first_season=('season', 'min'),
+        last_season=('season', 'max'),
+        career_length=('season', 'size'),
+        num_seasons=('season', 'nunique'),
+        num_teams=('team', 'nunique'),
+        first_team=('team', 'first'),
+        position=('position', 'first'),
+        position_group=('position_group', 'first'),
+    )
+    for name in ['first_name', 'last_name', 'birth_date', 'birth_country', 'headshot']:
+        if name in df.columns:
+            careers[name] = by_player[name].last()
+
+    careers['first_year'] = start_year(careers['first_season']).astype('int16')
+    careers['last_year'] = start_year(careers['last_season']).astype('int16')
+    careers['active'] = careers['last_year'] == careers['last_year'].max()
+
+    # Debut team retention
+    on_first_team = df['team'].to_numpy() == df['id'].map(careers['first_team']).to_numpy()
+    careers['seasons_on_first_team'] = pd.Series(on_first_team, index=df.index).groupby(df['id']).sum()
+    careers['retained_on_first_team'] = careers['seasons_on_first_team'] / careers['career_length'] >= 0.5
+
+    # Most-played team (ties go to the alphabetically first team)
+    team_counts = df.groupby(['id', 'team']).size().rename('seasons_with_team').reset_index()
+    primary = (
+        team_counts
+        .sort_values(['id', 'seasons_with_team'], ascending=[True, False], kind='stable')
+        .drop_duplicates('id')
+        .set_index('id')
+    )
+    careers['primary_team'] = primary['team']
+    careers['max_team_seasons'] = primary['seasons_with_team']
+    careers['max_team_share'] = careers['max_team_seasons'] / careers['career_length']
+    careers['avg_duration_per_team'] = careers['career_length'] / careers['num_teams']
+
+    for name in ['first_team', 'primary_team', 'position', 'position_group']:
+        careers[name] = careers[name].astype('category')
+    return careers.reset_index()
+
+
+# -----------------------------------------------------------------------
+# Persist and load
+# -----------------------------------------------------------------------
+
+def write_player_careers(store: str = ROSTER_STORE, path: str = PLAYER_CAREERS) -> pd.DataFrame:
+    # Rebuild the careers table from the roster store and save it
+    roster = load_rosters(
+        columns=['id', 'team', 'position', 'first_name', 'last_name', 'birth_date', 'birth_country', 'headshot'],
+        store=store
+    )
+    careers = build_player_careers(roster)
+    careers.to_parquet(f"{path}.tmp", index=False, compression="zstd")
+    os.replace(f"{path}.tmp", path)
+    return careers
+
+
+def load_player_careers(columns: Optional[List[str]] = None, store: str = ROSTER_STORE,
+                        path: str = PLAYER_CAREERS) -> pd.DataFrame:
+    """Load the player_careers table, rebuilding it first if it's missing or
+    older than the roster store it was derived from."""
+    if not os.path.isfile(path) or os.path.getmtime(path) < store_mtime(store):
+        careers = write_player_careers(store, path)
+        return careers[columns] if columns is not None else careers
+    return pd.read_parquet(path, columns=columns)
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Tuple
+
+from .paths import ROSTER_STORE
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# -----------------------------------------------------------------------
+# Lookup documents
+#
+# Every player, team-season and season the lookup API can return is
+# serialized to JSON once, when the index is built, and kept as bytes
+# with its ETag. The brotli/gzip encodings are made the first time a
+# document is asked for (compressing all of them up front would hold
+# startup up for minutes) and kept from then on; documents served from the
+# shared dataset (app.data.shared) keep them in a bounded cache instead.
+# -----------------------------------------------------------------------
+
+class LookupDocument:
+    __slots__ = ("body", "etag", "_encoded")
+
+    def __init__(self, payload: Any):
+        self.body = json.dumps(payload, separators=(',', ':')).encode("utf-8")
+        self.etag = f'"{hashlib.blake2b(self.body, digest_size=16).hexdigest()}"'
+        self._encoded: Optional[Dict[str, bytes]] = None
+
+    @classmethod
+    def from_body(cls, body: bytes, etag: str) -> "LookupDocument":
+        # An already serialized document (read back from the shared dataset)
+        document = cls.__new__(cls)
+        document.body, document.etag, document._encoded = body, etag, None
+        return document
+
+    @property
+    def encoded(self) -> Dict[str, bytes]:
+        if self._encoded is None:
+            # Imported here so the data package doesn't pull in the web stack
+            from app.assets.compress import precompress
+            self._encoded = precompress(self.body)
+        return self._encoded
+
+
+def _records(df: "pd.DataFrame") -> List[dict]:
+    # JSON-ready rows: dates as ISO strings, missing values as None
+    import pandas as pd
+    df = df.copy()
+    for name in df.columns:
+        column = df[name]
+        if pd.api.types.is_datetime64_any_dtype(column):
+            df[name] = column.dt.strftime("%Y-%m-%d")
+        df[name] = df[name].astype(object).where(df[name].notna(), None)
+    # Column lists zipped back into rows: far quicker than DataFrame.to_dict
+    columns = list(df.columns)
+    return [dict(zip(columns, values)) for values in zip(*(df[name].tolist() for name in columns))]
+
+
+# -----------------------------------------------------------------------
+# Roster index
+#
+# The roster store loaded once (at startup) into three hash indexes - by
+# player id, by (team, season) and by season - each mapping straight to a
+# finished LookupDocument. A lookup is one dict hit; pandas is only used
+# (and only imported) while building.
+# -----------------------------------------------------------------------
+
+BIO_COLUMNS = ['first_name', 'last_name', 'position', 'shoots', 'birth_date', 'birth_city', 'birth_province',
+               'birth_country', 'height_in', 'weight_lb', 'headshot']
+TEAM_COLUMNS = ['id', 'first_name', 'last_name', 'position', 'sweater', 'shoots', 'birth_date', 'birth_country',
+                'height_in', 'weight_lb', 'headshot']
+CAREER_COLUMNS = ['first_season', 'last_season', 'career_length', 'num_seasons', 'num_teams', 'first_team',
+                  'primary_team', 'active']
+
+
+class RosterIndex:
+
+    def __init__(self):
+        # Dicts when built here, DocumentTables when attached to the shared dataset
+        self.players: Mapping[int, LookupDocument] = {}
+        self.teams: Mapping[Tuple[str, int], LookupDocument] = {}
+        self.seasons: Mapping[int, LookupDocument] = {}
+        self.build_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self.players)
+
+    def player(self, player_id: int) -> Optional[LookupDocument]:
+        return self.players.get(player_id)
+
+    def team(self, abbr: str, season: int) -> Optional[LookupDocument]:
+        return self.teams.get((abbr.upper(), season))
+
+    def season(self, season: int) -> Optional[LookupDocument]:
+        return self.seasons.get(season)
+
+    # -------------------------------------------------------------------
+    # Build
+    # -------------------------------------------------------------------
+
+    def build(self, roster: "pd.DataFrame", careers: Optional["pd.DataFrame"] = None) -> "RosterIndex":
+        """(Re)build every index from roster rows (rosters.csv shaped) and
+        their careers (built from them if not given). Each
+        index is built aside and swapped in whole, so a lookup during a
+        rebuild never sees a half-built index."""
+        import numpy as np
+        import pandas as pd
+
+        from .careers import build_player_careers
+        from .seasons import season_labels, season_start_dates
+
+        start = time.perf_counter()
+        roster = roster.reset_index(drop=True)
+        roster['team'] = roster['team'].astype(str)
+        roster['season'] = roster['season'].astype(np.int64)
+        labels = season_labels(roster['season'], short=True).astype(str)
+
+        # Age on January 1st of the season, as the demographics deep dive measures it
+        birth = pd.to_datetime(roster['birth_date'], errors='coerce')
+        roster['age'] = ((season_start_dates(roster['season']) - birth).dt.days / 365.25).round(1)
+
+        rows = _records(roster)
+        if careers is None:
+            careers = build_player_careers(roster)
+        careers = {record['id']: record for record in _records(careers[['id'] + CAREER_COLUMNS])}
+
+        by_player: Dict[int, List[dict]] = {}
+        by_team: Dict[Tuple[str, int], List[dict]] = {}
+        for row in rows:
+            by_player.setdefault(row['id'], []).append(row)
+            by_team.setdefault((row['team'], row['season']), []).append(row)
+
+        players = {}
+        for player_id, player_rows in by_player.items():
+            player_rows.sort(key=lambda row: row['season'])
+            latest = player_rows[-1]
+            career = {name: careers[player_id][name] for name in CAREER_COLUMNS}
+            players[player_id] = LookupDocument({
+                'id': player_id,
+                **{name: latest.get(name) for name in BIO_COLUMNS},
+                'career': career,
+                'seasons': [{'season': row['season'], 'team': row['team'], 'sweater': row.get('sweater'),
+                             'age': row['age']} for row in player_rows]
+            })
+
+        teams = {}
+        for (team, season), team_rows in by_team.items():
+            teams[(team, season)] = LookupDocument({
+                'team': team,
+                'season': season,
+                'players': [{**{name: row.get(name) for name in TEAM_COLUMNS}, 'age': row['age']}
+                            for row in team_rows]
+            })
+
+        seasons = {}
+        season_players = roster.groupby('season')['id'].nunique()
+        summary = roster.assign(label=labels).groupby(['season', 'team'], observed=True).agg(
+            label=('label', 'first'),
+            players=('id', 'size'),
+            avg_age=('age', 'mean'),
+            avg_height_in=('height_in', 'mean'),
+            avg_weight_lb=('weight_lb', 'mean'),
+        ).round(1).reset_index()
+        for season, season_teams in summary.groupby('season', sort=True):
+            team_rows = _records(season_teams.drop(columns=['season', 'label']))
+            seasons[int(season)] = LookupDocument({
+                'season': int(season),
+                'label': season_teams['label'].iloc[0],
+                'players': int(season_players[season]),
+                'teams': team_rows
+            })
+
+        self.players, self.teams, self.seasons = players, teams, seasons
+        self.build_seconds = time.perf_counter() - start
+        return self
+
+    def load(self, store: str = ROSTER_STORE) -> "RosterIndex":
+        from .store import load_rosters
+        return self.build(load_rosters(store=store))
+
+    def tables(self) -> Dict[str, Mapping]:
+        return {"players": self.players, "teams": self.teams, "seasons": self.seasons}
+
+    def attach(self, dataset) -> "RosterIndex":
+        # Serve the documents a SharedDataset published instead of building them
+        self.players, self.teams, self.seasons = (dataset.documents(name) for name in ("players", "teams", "seasons"))
+        return self
+
+
+# The app's roster index, built at startup
+roster_index = RosterIndex()
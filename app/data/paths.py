@@ -0,0 +1,15 @@
+import os
+
+
+# Project-relative locations of the roster data. Kept apart from store.py
+# (and free of pandas/pyarrow) so the server can find and version the
+# store without importing either.
+ROSTER_CSV = os.path.join("data", "nhl-player-demographics", "rosters.csv")
+ROSTER_STORE = os.path.join("data", "nhl-player-demographics", "rosters")
+
+
+def store_mtime(store: str) -> float:
+    # Newest file in the store: anything derived from it is stale if older
+    mtimes = [os.path.getmtime(os.path.join(root, name))
+              for root, _, files in os.walk(store) for name in files]
+    return max(mtimes, default=0.0)
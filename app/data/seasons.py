@@ -0,0 +1,90 @@
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+# Seasons are stored as 8-digit integers, start year then end year:
+# 20242025 is the 2024-25 season. Everything here works on whole columns
+# with integer arithmetic instead of formatting a string per row.
+
+SeasonLike = Union[int, np.ndarray, pd.Series]
+
+
+# -----------------------------------------------------------------------
+# Integer conversions
+# -----------------------------------------------------------------------
+
+def start_year(season: SeasonLike) -> SeasonLike:
+    # 20242025 -> 2024
+    return season // 10000
+
+
+def end_year(season: SeasonLike) -> SeasonLike:
+    # 20242025 -> 2025
+    return season % 10000
+
+
+def season_from_year(year: SeasonLike) -> SeasonLike:
+    # 2024 -> 20242025
+    return year * 10000 + year + 1
+
+
+def season_start_dates(season: pd.Series) -> pd.Series:
+    """January 1st of each season's start year, as datetime64 (what the
+    age charts measure players against)."""
+    years = start_year(_as_int_array(season))
+    dates = (years - 1970).astype('datetime64[Y]').astype('datetime64[ns]')
+    return pd.Series(dates, index=season.index)
+
+
+# -----------------------------------------------------------------------
+# Labels and ordinal positions
+# -----------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def _label(season: int, short: bool) -> str:
+    start, end = divmod(season, 10000)
+    return f"{start}-{end % 100:02d}" if short else f"{start}-{end}"
+
+
+@lru_cache(maxsize=64)
+def _label_dtype(seasons: Tuple[int, ...], short: bool) -> pd.CategoricalDtype:
+    return pd.CategoricalDtype([_label(s, short) for s in seasons], ordered=True)
+
+
+def _as_int_array(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.int64)
+
+
+def season_index(season: SeasonLike, seasons: Optional[SeasonLike] = None) -> SeasonLike:
+    """Ordinal x position of each season: 0 for the earliest season in
+    `seasons` (default: the seasons in `season` itself), 1 for the next one
+    that appears, and so on. Gaps like the 2004-05 lockout are skipped."""
+    values = _as_int_array(season)
+    axis = np.unique(values if seasons is None else _as_int_array(seasons))
+    index = np.searchsorted(axis, values)
+    return pd.Series(index, index=season.index) if isinstance(season, pd.Series) else index
+
+
+def season_labels(season: pd.Series, short: bool = False) -> pd.Series:
+    """"1917-1918" style labels (or "1917-18" with `short`) as an ordered
+    categorical. Only the distinct seasons are formatted; the labels for a
+    given set of seasons are built once and reused."""
+    values = _as_int_array(season)
+    axis, codes = np.unique(values, return_inverse=True)
+    dtype = _label_dtype(tuple(axis.tolist()), short)
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=dtype), index=season.index, name=season.name)
+
+
+def year_labels(year: SeasonLike, short: bool = True) -> List[str]:
+    # Labels for debut years (2000 -> "2000-01"), as used on the career charts
+    return [_label(int(s), short) for s in np.atleast_1d(season_from_year(_as_int_array(year)))]
+
+
+def season_ticks(season: SeasonLike, step: int = 15, short: bool = False) -> Tuple[List[int], List[str]]:
+    """Tick positions and labels for an axis laid out by season_index():
+    every `step`th season that appears in `season`."""
+    axis = np.unique(_as_int_array(season))[::step]
+    return list(range(0, step * len(axis), step)), [_label(int(s), short) for s in axis]
@@ -0,0 +1,252 @@
+import json
+import mmap
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Iterator, List, Optional
+
+from .lookup import LookupDocument, RosterIndex
+from .paths import ROSTER_STORE, store_mtime
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, so concurrent workers may each publish (harmlessly)
+    fcntl = None
+
+
+# Project-relative root of the published serving dataset
+SERVING_DIR = os.path.join("data", "serving")
+
+# Bumped whenever the published files change, so older datasets are republished
+_LAYOUT = 2
+
+# Memory budget for the brotli/gzip encodings each document table keeps
+ENCODED_CACHE_BYTES = 16 * 1024 * 1024
+
+
+# -----------------------------------------------------------------------
+# Shared serving dataset
+#
+# With several server workers, each one loading the roster store and
+# building the lookup indexes itself would multiply both the memory and the
+# startup time by the worker count. Instead the first worker to start
+# publishes everything the site serves into data/serving/<version>/ -
+#   careers.arrow          - the careers table, Arrow IPC, uncompressed
+#   <index>.bin            - the lookup API's JSON documents, back to back
+#   <index>.index.json     - their keys, byte offsets and ETags
+#   search/                - the player search index (app.search), .npy files
+# - and every worker (the publisher included) attaches to those files by
+# memory mapping them. The pages are the OS page cache's, shared by every
+# process, and attaching is reading a small key list. Documents are served
+# straight from the mapping; only their compressed encodings take up
+# memory in each worker, within a fixed budget. The shot bins
+# (app.shots) are memory mapped .npy files already and need nothing more.
+#
+# A file lock makes the other workers wait while one publishes; `version`
+# follows the roster store, so a rebuilt store is republished by the next
+# worker to start and older versions are removed (processes still mapping
+# them keep their pages until they exit), as are versions published in an
+# older layout. Attaching imports neither pandas nor (until the careers
+# table is read) pyarrow; publishing imports both.
+# -----------------------------------------------------------------------
+
+@contextmanager
+def _exclusive(path: str) -> Iterator[None]:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _map(path: str) -> mmap.mmap:
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) else mmap.mmap(-1, 1)
+
+
+# -----------------------------------------------------------------------
+# Published documents
+# -----------------------------------------------------------------------
+
+def _encode_key(key: Hashable) -> Any:
+    return list(key) if isinstance(key, tuple) else key
+
+
+def _decode_key(key: Any) -> Hashable:
+    return tuple(key) if isinstance(key, list) else key
+
+
+def publish_documents(directory: str, name: str, documents: Dict[Hashable, Any]) -> None:
+    """Write `documents` (key -> LookupDocument) as <name>.bin, every body
+    back to back, and <name>.index.json with each key's offset and ETag."""
+    keys, offsets, etags = [], [0], []
+    with open(os.path.join(directory, f"{name}.bin"), "wb") as f:
+        for key, document in documents.items():
+            f.write(document.body)
+            keys.append(_encode_key(key))
+            offsets.append(offsets[-1] + len(document.body))
+            etags.append(document.etag)
+    with open(os.path.join(directory, f"{name}.index.json"), "w") as f:
+        json.dump({"keys": keys, "offsets": offsets, "etags": etags}, f, separators=(',', ':'))
+
+
+class _MappedDocument(LookupDocument):
+    # A document whose body is a view of the mapped file; its encodings are
+    # kept by the table it came from
+    __slots__ = ("_table", "_key")
+
+    @property
+    def encoded(self) -> Dict[str, bytes]:
+        return self._table.encoded(self._key, self.body)
+
+
+class DocumentTable:
+    """Read-only mapping of key -> LookupDocument over a memory-mapped
+    <name>.bin. A document's body is a view of the mapped file, never
+    copied or kept; its brotli/gzip encodings are made on first use and
+    kept in an LRU of at most `max_encoded_bytes`. `hits` counts encodings
+    served from there, `misses` the ones compressed."""
+
+    def __init__(self, directory: str, name: str, max_encoded_bytes: int = ENCODED_CACHE_BYTES):
+        with open(os.path.join(directory, f"{name}.index.json")) as f:
+            index = json.load(f)
+        self._rows: Dict[Hashable, int] = {_decode_key(key): row for row, key in enumerate(index["keys"])}
+        self._offsets: List[int] = index["offsets"]
+        self._etags: List[str] = index["etags"]
+        self._blob = memoryview(_map(os.path.join(directory, f"{name}.bin")))
+        self.max_encoded_bytes = max_encoded_bytes
+        self._encoded: "OrderedDict[Hashable, Dict[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.encoded_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rows
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._rows)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        row = self._rows.get(key)
+        if row is None:
+            return default
+        document = _MappedDocument.from_body(self._blob[self._offsets[row]:self._offsets[row + 1]], self._etags[row])
+        document._table, document._key = self, key
+        return document
+
+    def encoded(self, key: Hashable, body: memoryview) -> Dict[str, bytes]:
+        with self._lock:
+            variants = self._encoded.get(key)
+            if variants is not None:
+                self._encoded.move_to_end(key)
+                self.hits += 1
+                return variants
+
+        # Imported here so the data package doesn't pull in the web stack
+        from app.assets.compress import precompress
+        variants = precompress(body)
+        size = sum(len(data) for data in variants.values())
+        with self._lock:
+            self.misses += 1
+            previous = self._encoded.pop(key, None)
+            if previous is not None:
+                self.encoded_bytes -= sum(len(data) for data in previous.values())
+            self._encoded[key] = variants
+            self.encoded_bytes += size
+            while self.encoded_bytes > self.max_encoded_bytes and len(self._encoded) > 1:
+                _, evicted = self._encoded.popitem(last=False)
+                self.encoded_bytes -= sum(len(data) for data in evicted.values())
+                self.evictions += 1
+        return variants
+
+
+# -----------------------------------------------------------------------
+# Publish and attach
+# -----------------------------------------------------------------------
+
+def _version(store: str) -> str:
+    # Changes whenever the roster store is rewritten
+    return f"{int(store_mtime(store) * 1000):x}-{_LAYOUT}"
+
+
+def _publish(store: str, directory: str) -> None:
+    import pyarrow as pa
+
+    from app.search import PlayerSearch
+
+    from .careers import build_player_careers
+    from .store import load_rosters
+
+    start = time.perf_counter()
+    roster = load_rosters(store=store)
+    careers = build_player_careers(roster)
+    index = RosterIndex().build(roster, careers)
+
+    tmp_dir = f"{directory}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    table = pa.Table.from_pandas(careers, preserve_index=False)
+    with pa.OSFile(os.path.join(tmp_dir, "careers.arrow"), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    for name, documents in index.tables().items():
+        publish_documents(tmp_dir, name, documents)
+    PlayerSearch().build(careers=careers).save(os.path.join(tmp_dir, "search"))
+    with open(os.path.join(tmp_dir, "manifest.json"), "w") as f:
+        json.dump({"store": store, "rows": len(roster), "players": len(careers),
+                   "seconds": round(time.perf_counter() - start, 2)}, f, indent=1)
+    os.replace(tmp_dir, directory)
+
+
+class SharedDataset:
+    """The published serving dataset of one roster store version, attached."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        self._careers: Optional["pa.Table"] = None
+
+    @classmethod
+    def open(cls, store: str = ROSTER_STORE, serving_dir: str = SERVING_DIR) -> "SharedDataset":
+        """Attach to the dataset published for the current roster store,
+        publishing it first if no worker has yet."""
+        if not os.path.isdir(store):
+            raise FileNotFoundError(f"No roster store at {store}; run 1. Get_Historical_Roster_Data.py first")
+        directory = os.path.join(serving_dir, _version(store))
+        if not os.path.isfile(os.path.join(directory, "manifest.json")):
+            with _exclusive(os.path.join(serving_dir, ".lock")):
+                # Another worker may have published while this one waited
+                if not os.path.isfile(os.path.join(directory, "manifest.json")):
+                    _publish(store, directory)
+                    for name in os.listdir(serving_dir):
+                        path = os.path.join(serving_dir, name)
+                        if os.path.isdir(path) and path != directory:
+                            shutil.rmtree(path, ignore_errors=True)
+        return cls(directory)
+
+    def careers(self) -> "pa.Table":
+        # Zero-copy: the table's buffers point into the mapped file
+        if self._careers is None:
+            import pyarrow as pa
+            self._careers = pa.ipc.open_file(pa.memory_map(os.path.join(self.directory, "careers.arrow"))).read_all()
+        return self._careers
+
+    def careers_frame(self) -> "pd.DataFrame":
+        return self.careers().to_pandas()
+
+    def documents(self, name: str) -> DocumentTable:
+        return DocumentTable(self.directory, name)
@@ -0,0 +1,118 @@
+import os
+import shutil
+from typing import Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .paths import ROSTER_STORE
+
+
+# -----------------------------------------------------------------------
+# Schema
+#
+# Low-cardinality strings are dictionary encoded (categoricals in pandas),
+# bio numbers use the smallest integer that fits, and birth_date is a real
+# date. season isn't stored in the files at all: it's the partition key,
+# one directory per season (rosters/season=20242025/part-0.parquet).
+# -----------------------------------------------------------------------
+
+def _dictionary(index_type: pa.DataType = pa.int16()) -> pa.DataType:
+    return pa.dictionary(index_type, pa.string())
+
+
+ROSTER_SCHEMA = pa.schema([
+    ('team', _dictionary()),
+    ('id', pa.int32()),
+    ('first_name', pa.string()),
+    ('last_name', pa.string()),
+    ('position', _dictionary(pa.int8())),
+    ('sweater', pa.int8()),
+    ('shoots', _dictionary(pa.int8())),
+    ('birth_date', pa.date32()),
+    ('birth_city', pa.string()),
+    ('birth_province', _dictionary()),
+    ('birth_country', _dictionary()),
+    ('height_in', pa.int8()),
+    ('weight_lb', pa.int16()),
+    ('headshot', pa.string()),
+])
+
+SEASON_PARTITIONING = ds.partitioning(pa.schema([('season', pa.int32())]), flavor="hive")
+
+# Arrow -> pandas: keep the small integers small (nullable, since bio fields have gaps)
+_PANDAS_TYPES = {
+    pa.int8(): pd.Int8Dtype(),
+    pa.int16(): pd.Int16Dtype(),
+    pa.int32(): pd.Int32Dtype(),
+}
+
+
+# -----------------------------------------------------------------------
+# Writing
+# -----------------------------------------------------------------------
+
+def to_roster_table(rosters_df: pd.DataFrame) -> pa.Table:
+    # Coerce a rosters.csv-shaped frame (minus season) to ROSTER_SCHEMA
+    df = rosters_df[ROSTER_SCHEMA.names].copy()
+    df['birth_date'] = pd.to_datetime(df['birth_date'], errors='coerce').dt.date
+    for field in ROSTER_SCHEMA:
+        if pa.types.is_integer(field.type):
+            df[field.name] = pd.to_numeric(df[field.name], errors='coerce').astype(_PANDAS_TYPES[field.type])
+        elif pa.types.is_dictionary(field.type) or pa.types.is_string(field.type):
+            df[field.name] = df[field.name].astype(object).where(df[field.name].notna(), None)
+    return pa.Table.from_pandas(df, schema=ROSTER_SCHEMA, preserve_index=False)
+
+
+def write_roster_store(rosters_df: pd.DataFrame, store: str = ROSTER_STORE,
+                       seasons: Optional[Iterable[int]] = None) -> List[int]:
+    """Write rosters to the season-partitioned Parquet store.
+
+    With `seasons`, only those partitions are (re)written and the rest of
+    the store is left alone; otherwise the whole store is rebuilt. Each
+    partition is written to a temp file and swapped in, so readers never
+    see a half-written season. Returns the seasons written.
+    """
+    if seasons is None:
+        shutil.rmtree(store, ignore_errors=True)
+        seasons = rosters_df['season'].unique()
+
+    written = []
+    for season in sorted(int(s) for s in seasons):
+        partition_dir = os.path.join(store, f"season={season}")
+        season_df = rosters_df[rosters_df['season'] == season]
+        if season_df.empty:
+            shutil.rmtree(partition_dir, ignore_errors=True)
+            continue
+
+        os.makedirs(partition_dir, exist_ok=True)
+        path = os.path.join(partition_dir, "part-0.parquet")
+        pq.write_table(to_roster_table(season_df), f"{path}.tmp", compression="zstd")
+        os.replace(f"{path}.tmp", path)
+        written.append(season)
+    return written
+
+
+# -----------------------------------------------------------------------
+# Reading
+# -----------------------------------------------------------------------
+
+def load_rosters(columns: Optional[List[str]] = None, seasons: Optional[Iterable[int]] = None,
+                 store: str = ROSTER_STORE) -> pd.DataFrame:
+    """Load rosters from the Parquet store as a compactly typed DataFrame.
+
+    Only the requested `columns` are read from disk, and only the season
+    directories in `seasons` are opened. `season` is always included.
+    """
+    if not os.path.isdir(store):
+        raise FileNotFoundError(f"No roster store at {store}; run 1. Get_Historical_Roster_Data.py first")
+
+    dataset = ds.dataset(store, format="parquet", partitioning=SEASON_PARTITIONING)
+    if columns is not None:
+        columns = list(dict.fromkeys(['season'] + list(columns)))
+    row_filter = ds.field('season').isin([int(s) for s in seasons]) if seasons is not None else None
+
+    table = dataset.to_table(columns=columns, filter=row_filter)
+    return table.to_pandas(types_mapper=_PANDAS_TYPES.get, date_as_object=False)
@@ -0,0 +1,125 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from starlette.routing import BaseRoute, compile_path
+
+from app.assets.compress import EXTENSIONS
+from app.routes.pages import PAGES, page_cache
+
+
+# Default output tree for `python -m app.export`
+EXPORT_DIR = "dist"
+STATIC_DIR = "static"
+
+
+# -----------------------------------------------------------------------
+# Static site export
+#
+# Writes every registered page to <out>/<path>/index.html (so /about is
+# served from about/index.html by any static host), copies static/ next
+# to them, and records the result in <out>/manifest.json. The pages are
+# the same bytes the app serves from its page cache, with their .br / .gz
+# encodings beside them for hosts that serve precompressed files (nginx
+# gzip_static / brotli_static). Routes that aren't in the page registry
+# (the dashboard) are listed in the manifest as dynamic: those are the
+# only paths a reverse proxy needs to forward to the app.
+# -----------------------------------------------------------------------
+
+def _page_file(path: str) -> str:
+    # "/" -> "index.html", "/deep-dives/player_movement" -> "deep-dives/player_movement/index.html"
+    return os.path.join(*path.strip("/").split("/"), "index.html") if path.strip("/") else "index.html"
+
+
+def _write(path: str, body: bytes) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.tmp", "wb") as f:
+        f.write(body)
+    os.replace(f"{path}.tmp", path)
+
+
+def _api_routes(routes: Iterable[BaseRoute], prefix: str = "") -> Iterator[Tuple[str, APIRoute]]:
+    # Every APIRoute with its full path, schema or not (/metrics isn't in it).
+    # Newer FastAPI versions keep an included router as one entry wrapping
+    # the original router rather than copying its routes into the app's.
+    for route in routes:
+        if isinstance(route, APIRoute):
+            yield prefix + route.path, route
+        elif hasattr(route, "original_router"):
+            yield from _api_routes(route.original_router.routes, prefix + route.include_context.prefix)
+
+
+def dynamic_routes(app: FastAPI) -> List[str]:
+    # GET paths of the app that no registered page covers
+    static_paths = {path.rstrip("/") or "/" for path in PAGES}
+    routes = []
+    for path, route in _api_routes(app.routes):
+        if "GET" not in route.methods or path in routes:
+            continue
+        regex, _, _ = compile_path(path)
+        if not any(regex.match(page) or regex.match(f"{page}/") for page in static_paths):
+            routes.append(path)
+    return routes
+
+
+def export_site(out_dir: str = EXPORT_DIR, app: Optional[FastAPI] = None, static_dir: str = STATIC_DIR,
+                verbose: bool = True) -> Dict:
+    """Render every registered page into `out_dir`, copy the static assets
+    alongside and write the manifest. Returns the manifest."""
+    start = time.perf_counter()
+    pages = {}
+    for path, template in sorted(PAGES.items()):
+        page = page_cache.get(template)
+        file = _page_file(path)
+        _write(os.path.join(out_dir, file), page.body)
+        for encoding, body in page.encoded.items():
+            _write(os.path.join(out_dir, file + EXTENSIONS[encoding]), body)
+        pages[path] = {
+            "file": file.replace(os.sep, "/"),
+            "template": template,
+            "bytes": len(page.body),
+            "etag": page.etag,
+            "last_modified": page.last_modified
+        }
+
+    static = {}
+    if os.path.isdir(static_dir):
+        shutil.copytree(static_dir, os.path.join(out_dir, "static"), dirs_exist_ok=True)
+        for root, _, files in os.walk(static_dir):
+            for name in sorted(files):
+                full = os.path.join(root, name)
+                with open(full, "rb") as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()
+                rel = os.path.relpath(full, static_dir).replace(os.sep, "/")
+                static[f"/static/{rel}"] = {"bytes": os.path.getsize(full), "sha256": digest}
+
+    manifest = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "pages": pages,
+        "static": static,
+        "dynamic": dynamic_routes(app) if app is not None else []
+    }
+    _write(os.path.join(out_dir, "manifest.json"), json.dumps(manifest, indent=1).encode("utf-8"))
+
+    if verbose:
+        total = sum(page["bytes"] for page in pages.values())
+        print(f"📦 Exported {len(pages)} pages ({total / 1024:.0f} KB) and {len(static)} static files "
+              f"to {out_dir} in {time.perf_counter() - start:.1f}s")
+        if manifest["dynamic"]:
+            print(f"   Dynamic routes left to the app: {', '.join(manifest['dynamic'])}")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-render the site's static pages to disk")
+    parser.add_argument("--out", default=EXPORT_DIR, help="output directory (default: dist)")
+    args = parser.parse_args()
+
+    from main import app
+    export_site(args.out, app=app)
@@ -0,0 +1,4 @@
+from .broadcast import Broadcaster, sse_message
+from .metrics import GameMetrics, MetricsEngine, TeamMetrics
+from .poller import GameState, LivePoller, diff_game, game_summary, live_poller
+from .replay import ReplaySource, load_game, replay_events
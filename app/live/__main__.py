@@ -0,0 +1,27 @@
+import argparse
+import json
+import time
+
+from .replay import replay_events
+
+
+# -----------------------------------------------------------------------
+# Replay a recorded game through the metrics engine: python -m app.live game.json
+# -----------------------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded game through the live metrics engine")
+    parser.add_argument("game", help="recorded play-by-play JSON")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="game seconds per real second (default: as fast as possible)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    metrics = None
+    for metrics in replay_events(args.game, speed=args.speed):
+        pass
+    elapsed = time.perf_counter() - start
+    if metrics is not None:
+        print(json.dumps(metrics.snapshot(), indent=1))
+        print(f"⏱  {metrics.events} events in {elapsed * 1000:.1f} ms "
+              f"({elapsed / max(metrics.events, 1) * 1e6:.1f} µs per event)")
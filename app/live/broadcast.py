@@ -0,0 +1,65 @@
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import Any, Optional, Set
+
+
+# -----------------------------------------------------------------------
+# Server-Sent Events fan-out
+#
+# Every message is encoded to SSE bytes once and the same bytes object is
+# put on every subscriber's queue, so a publish costs one queue append per
+# client whatever the payload size. A client that falls `max_queue`
+# messages behind has its backlog dropped and is told to resync: it gets a
+# fresh full snapshot instead of a pile of stale diffs.
+# -----------------------------------------------------------------------
+
+# Put on a lagging subscriber's queue in place of the messages it missed
+RESYNC = b""
+
+
+def sse_message(event: str, data: Any, id: Optional[int] = None) -> bytes:
+    lines = [f"event: {event}"]
+    if id is not None:
+        lines.append(f"id: {id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+@dataclass
+class BroadcastStats:
+    published: int = 0
+    delivered: int = 0
+    resyncs: int = 0
+
+
+class Broadcaster:
+
+    def __init__(self, max_queue: int = 64):
+        self.max_queue = max_queue
+        self.stats = BroadcastStats()
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.max_queue)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def publish(self, message: bytes) -> None:
+        # Must be called from the event loop thread
+        self.stats.published += 1
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(message)
+                self.stats.delivered += 1
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+                self.stats.resyncs += 1
@@ -0,0 +1,257 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# -----------------------------------------------------------------------
+# Live game metrics
+#
+# Every metric is a running sum, so each play-by-play event updates it in
+# O(1) however far into the game we are:
+#
+#   TDI (Total Depth Index) - how widely a team's offence is spread across
+#       its lineup. Each player's involvement (shot attempts, goals and
+#       assists, weighted below) is tracked, and the effective number of
+#       contributors, sum(x)^2 / sum(x^2), is divided by the 18 skaters
+#       dressed. 1.0 is every skater contributing equally; a team riding
+#       one line sits near 0.3. Keeping sum(x) and sum(x^2) per team makes
+#       this O(1) per event.
+#   Depth - that effective number of contributors itself.
+#   Physicality - hits thrown, and per 60 minutes of game clock.
+#   Defensive success - share of the opponent's shot attempts that never
+#       reached the net (blocked or missed), plus takeaways.
+#
+# Amended plays (the league corrects events after the fact) are handled
+# by remembering each event's contributions and reversing them before the
+# corrected version is applied.
+# -----------------------------------------------------------------------
+
+SKATERS_DRESSED = 18
+REGULATION_PERIOD_SECONDS = 20 * 60
+
+# Involvement credited to each player, by role in the event
+INVOLVEMENT = {
+    "shooter": 1.0,    # any shot attempt: on goal, missed, blocked or scored
+    "scorer": 2.0,     # on top of the shot attempt
+    "assist1": 1.5,
+    "assist2": 1.0
+}
+
+SHOT_ATTEMPTS = {"goal", "shot-on-goal", "missed-shot", "blocked-shot"}
+
+# One contribution of an event: (team id, player id or None, stat, amount)
+Contribution = Tuple[int, Optional[int], str, float]
+
+
+def game_seconds(play: dict) -> Optional[int]:
+    # Seconds of game clock elapsed at the event (overtime periods count as 20 minutes)
+    period = (play.get("periodDescriptor") or {}).get("number")
+    time_in_period = play.get("timeInPeriod")
+    if period is None or not time_in_period:
+        return None
+    minutes, seconds = time_in_period.split(":")
+    return (period - 1) * REGULATION_PERIOD_SECONDS + int(minutes) * 60 + int(seconds)
+
+
+@dataclass
+class TeamMetrics:
+    team_id: int
+    abbrev: Optional[str] = None
+    stats: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    involvement: Dict[int, float] = field(default_factory=lambda: defaultdict(float))
+    involvement_sum: float = 0.0
+    involvement_sumsq: float = 0.0
+
+    def add_involvement(self, player_id: int, amount: float) -> None:
+        before = self.involvement[player_id]
+        after = before + amount
+        self.involvement[player_id] = after
+        self.involvement_sum += amount
+        self.involvement_sumsq += after * after - before * before
+        if abs(after) < 1e-9:
+            del self.involvement[player_id]
+
+    @property
+    def depth(self) -> float:
+        # Effective number of contributing players
+        if self.involvement_sumsq <= 1e-9:
+            return 0.0
+        return self.involvement_sum ** 2 / self.involvement_sumsq
+
+    @property
+    def tdi(self) -> float:
+        return min(self.depth / SKATERS_DRESSED, 1.0)
+
+
+class GameMetrics:
+    """Running metrics for one game, fed one play at a time."""
+
+    def __init__(self, game_id: int, home: Optional[dict] = None, away: Optional[dict] = None,
+                 roster: Iterable[dict] = ()):
+        self.game_id = game_id
+        self.teams: Dict[int, TeamMetrics] = {}
+        self.player_team: Dict[int, int] = {}
+        self.applied: Dict[int, Tuple[dict, List[Contribution]]] = {}
+        self.clock_seconds = 0
+        self.events = 0
+        for side in (home, away):
+            if side and side.get("id") is not None:
+                self.teams[side["id"]] = TeamMetrics(side["id"], side.get("abbrev"))
+        self.add_roster(roster)
+
+    def add_roster(self, roster: Iterable[dict]) -> None:
+        # play-by-play "rosterSpots": which team each player id dresses for
+        for spot in roster:
+            self.player_team[spot["playerId"]] = spot["teamId"]
+
+    def _team(self, team_id: int) -> TeamMetrics:
+        if team_id not in self.teams:
+            self.teams[team_id] = TeamMetrics(team_id)
+        return self.teams[team_id]
+
+    def _opponent(self, team_id: int) -> Optional[int]:
+        return next((other for other in self.teams if other != team_id), None)
+
+    # -------------------------------------------------------------------
+    # Events
+    # -------------------------------------------------------------------
+
+    def _contributions(self, play: dict) -> List[Contribution]:
+        kind = play.get("typeDescKey")
+        details = play.get("details") or {}
+        owner = details.get("eventOwnerTeamId")
+        out: List[Contribution] = []
+
+        if kind in SHOT_ATTEMPTS:
+            shooter = details.get("shootingPlayerId") or details.get("scoringPlayerId")
+            # The owner of a blocked shot is the blocking team; go by the shooter if we can
+            shooting_team = self.player_team.get(shooter, owner if kind != "blocked-shot" else self._opponent(owner))
+            if shooting_team is None:
+                return out
+            defending = self._opponent(shooting_team)
+            out.append((shooting_team, shooter, "attempts", 1.0))
+            if shooter is not None:
+                out.append((shooting_team, shooter, "involvement", INVOLVEMENT["shooter"]))
+            if defending is not None:
+                out.append((defending, None, "attempts_against", 1.0))
+                if kind in ("blocked-shot", "missed-shot"):
+                    out.append((defending, None, "attempts_stopped", 1.0))
+            if kind == "blocked-shot" and defending is not None:
+                out.append((defending, details.get("blockingPlayerId"), "blocks", 1.0))
+            if kind in ("shot-on-goal", "goal"):
+                out.append((shooting_team, shooter, "shots_on_goal", 1.0))
+            if kind == "goal":
+                out.append((shooting_team, shooter, "goals", 1.0))
+                out.append((shooting_team, shooter, "involvement", INVOLVEMENT["scorer"]))
+                for role in ("assist1", "assist2"):
+                    assister = details.get(f"{role}PlayerId")
+                    if assister is not None:
+                        out.append((shooting_team, assister, "involvement", INVOLVEMENT[role]))
+
+        elif kind == "hit" and owner is not None:
+            out.append((owner, details.get("hittingPlayerId"), "hits", 1.0))
+        elif kind in ("takeaway", "giveaway") and owner is not None:
+            out.append((owner, details.get("playerId"), f"{kind}s", 1.0))
+        return out
+
+    def _apply(self, contributions: List[Contribution], sign: float) -> None:
+        for team_id, player_id, stat, amount in contributions:
+            team = self._team(team_id)
+            if stat == "involvement":
+                team.add_involvement(player_id, sign * amount)
+            else:
+                team.stats[stat] += sign * amount
+
+    def process(self, play: dict) -> None:
+        """Apply one play. A play whose eventId was already applied replaces
+        the earlier version (its contributions are reversed first)."""
+        event_id = play.get("eventId")
+        previous = self.applied.get(event_id)
+        if previous is not None:
+            if previous[0] == play:
+                return
+            self._apply(previous[1], -1.0)
+        else:
+            self.events += 1
+
+        contributions = self._contributions(play)
+        self._apply(contributions, 1.0)
+        self.applied[event_id] = (play, contributions)
+        seconds = game_seconds(play)
+        if seconds is not None and seconds > self.clock_seconds:
+            self.clock_seconds = seconds
+
+    def remove(self, event_id: int) -> None:
+        previous = self.applied.pop(event_id, None)
+        if previous is not None:
+            self._apply(previous[1], -1.0)
+            self.events -= 1
+
+    # -------------------------------------------------------------------
+    # Snapshot
+    # -------------------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        minutes = self.clock_seconds / 60
+        teams = {}
+        for team in self.teams.values():
+            stats = team.stats
+            against = stats["attempts_against"]
+            teams[team.abbrev or str(team.team_id)] = {
+                "tdi": round(team.tdi, 3),
+                "depth": round(team.depth, 2),
+                "physicality": {
+                    "hits": int(stats["hits"]),
+                    "hits_per_60": round(stats["hits"] * 60 / minutes, 1) if minutes else 0.0
+                },
+                "defensive_success": {
+                    "stopped_share": round(stats["attempts_stopped"] / against, 3) if against else None,
+                    "blocks": int(stats["blocks"]),
+                    "takeaways": int(stats["takeaways"])
+                },
+                "attempts": int(stats["attempts"]),
+                "shots_on_goal": int(stats["shots_on_goal"]),
+                "goals": int(stats["goals"]),
+                "giveaways": int(stats["giveaways"])
+            }
+        return {"id": self.game_id, "clock_seconds": self.clock_seconds, "events": self.events, "teams": teams}
+
+
+# -----------------------------------------------------------------------
+# Engine: every game the poller is following
+# -----------------------------------------------------------------------
+
+class MetricsEngine:
+
+    def __init__(self):
+        self.games: Dict[int, GameMetrics] = {}
+
+    def game(self, game_id: int, data: Optional[dict] = None) -> GameMetrics:
+        # `data` (a play-by-play payload) supplies the teams and rosters
+        metrics = self.games.get(game_id)
+        if metrics is None:
+            data = data or {}
+            metrics = self.games[game_id] = GameMetrics(
+                game_id, data.get("homeTeam"), data.get("awayTeam"), data.get("rosterSpots", [])
+            )
+        elif data and data.get("rosterSpots"):
+            metrics.add_roster(data["rosterSpots"])
+        return metrics
+
+    def apply_update(self, update: dict, data: Optional[dict] = None) -> GameMetrics:
+        """Feed a poller diff (new or amended plays, removed event ids) to
+        its game. Cost is proportional to the diff, not the game so far."""
+        metrics = self.game(update["id"], data)
+        for event_id in update.get("removed", []):
+            metrics.remove(event_id)
+        for play in update.get("plays", []):
+            metrics.process(play)
+        return metrics
+
+    def drop(self, game_id: int) -> None:
+        # A game the poller has stopped following
+        self.games.pop(game_id, None)
+
+    def snapshot(self, game_id: int) -> Optional[dict]:
+        metrics = self.games.get(game_id)
+        return metrics.snapshot() if metrics is not None else None
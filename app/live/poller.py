@@ -0,0 +1,256 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, Optional
+
+from fastapi import Request
+
+from app.nhl.crawler import Crawler, FetchResult
+from app.nhl.games import play_by_play_url
+from app.nhl.rosters import WEB_API
+
+from .broadcast import RESYNC, Broadcaster, sse_message
+from .metrics import MetricsEngine
+from .replay import ReplaySource
+
+
+# Game states, as the NHL web API reports them
+POLLED_STATES = {"PRE", "LIVE", "CRIT"}   # play-by-play fetched every interval
+FINISHED_STATES = {"OFF", "FINAL"}        # fetched once more, then left alone
+
+
+def score_url(base: str = WEB_API) -> str:
+    # Today's games with their state, score and clock
+    return f"{base}/score/now"
+
+
+# -----------------------------------------------------------------------
+# Game state and diffs
+# -----------------------------------------------------------------------
+
+def _team(data: dict) -> dict:
+    return {"abbrev": data.get("abbrev"), "score": data.get("score"), "sog": data.get("sog")}
+
+
+def game_summary(data: dict) -> dict:
+    # The scoreboard fields of a game, from either score/now or play-by-play
+    clock = data.get("clock") or {}
+    return {
+        "id": data["id"],
+        "state": data.get("gameState"),
+        "start": data.get("startTimeUTC"),
+        "period": (data.get("periodDescriptor") or {}).get("number", data.get("period")),
+        "clock": clock.get("timeRemaining"),
+        "intermission": clock.get("inIntermission", False),
+        "home": _team(data.get("homeTeam") or {}),
+        "away": _team(data.get("awayTeam") or {})
+    }
+
+
+def _merge(old: dict, new: dict) -> dict:
+    # Fields one endpoint doesn't report keep the value the other one gave
+    return {**old, **{key: value for key, value in new.items() if value is not None}}
+
+
+@dataclass
+class GameState:
+    summary: dict
+    plays: Dict[int, dict] = field(default_factory=dict)  # eventId -> play, in game order
+    final: bool = False  # play-by-play fetched after the game ended
+
+    def to_dict(self) -> dict:
+        return {**self.summary, "plays": list(self.plays.values())}
+
+
+def diff_game(old: Optional[GameState], new: GameState) -> Optional[dict]:
+    """What changed between two polls of a game: scoreboard fields that
+    differ, plays that are new or were amended (the league corrects
+    events after the fact) and plays that were removed. None if nothing."""
+    changes = {key: value for key, value in new.summary.items()
+               if old is None or old.summary.get(key) != value}
+    plays = [play for event_id, play in new.plays.items()
+             if old is None or old.plays.get(event_id) != play]
+    removed = [event_id for event_id in old.plays if event_id not in new.plays] if old is not None else []
+    if not (changes or plays or removed):
+        return None
+    return {"id": new.summary["id"], "changes": changes, "plays": plays, "removed": removed}
+
+
+# -----------------------------------------------------------------------
+# Poller
+#
+# One background task polls the NHL API for every viewer: the scoreboard
+# once per `schedule_interval`, and each game's play-by-play once per
+# `interval` while it is on (or about to be). Each poll is diffed against
+# the previous one and only the differences are published to the SSE
+# subscribers, so upstream traffic depends on the number of live games,
+# never on the number of people watching. The task starts with the first
+# subscriber and stops when the last one leaves. New and amended plays are
+# also fed to the metrics engine, and each game's updated metrics are
+# published right after its diff. A finished game is kept until it drops
+# off the scoreboard, so the snapshot only ever holds the current slate.
+# -----------------------------------------------------------------------
+
+@dataclass
+class PollerStats:
+    polls: int = 0
+    upstream_requests: int = 0
+    upstream_errors: int = 0
+    updates: int = 0
+    last_poll_seconds: float = 0.0
+
+
+class LivePoller:
+
+    def __init__(self, fetch: Optional[Callable[[str], FetchResult]] = None, interval: float = 5.0,
+                 schedule_interval: float = 60.0, heartbeat: float = 15.0, base: str = WEB_API,
+                 broadcaster: Optional[Broadcaster] = None, engine: Optional[MetricsEngine] = None):
+        # Live data is never cached; one quick retry, then wait for the next poll
+        self.fetch = fetch or Crawler(rate=5.0, retries=1, timeout=interval).fetch
+        self.interval = interval
+        self.schedule_interval = schedule_interval
+        self.heartbeat = heartbeat
+        self.base = base
+        self.broadcaster = broadcaster or Broadcaster()
+        self.engine = engine or MetricsEngine()
+        self.games: Dict[int, GameState] = {}
+        self.stats = PollerStats()
+        self.sequence = 0
+        self._schedule_checked: Optional[float] = None
+        self._snapshot: Optional[tuple] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # -------------------------------------------------------------------
+    # Polling
+    # -------------------------------------------------------------------
+
+    async def _fetch(self, url: str) -> Optional[dict]:
+        # The crawler is blocking (requests); keep it off the event loop
+        result = await asyncio.to_thread(self.fetch, url)
+        self.stats.upstream_requests += 1
+        if not result.ok:
+            self.stats.upstream_errors += 1
+            return None
+        return result.data
+
+    def _publish(self, event: str, data: dict) -> None:
+        self.sequence += 1
+        self.broadcaster.publish(sse_message(event, data, id=self.sequence))
+
+    def _apply(self, new: GameState, data: Optional[dict] = None) -> None:
+        # `data` is the play-by-play payload `new` came from, if any
+        game_id = new.summary["id"]
+        update = diff_game(self.games.get(game_id), new)
+        self.games[game_id] = new
+        if update is None:
+            return
+        self.stats.updates += 1
+        self._publish("update", update)
+        if update["plays"] or update["removed"]:
+            self._publish("metrics", self.engine.apply_update(update, data).snapshot())
+
+    def _evict(self, scheduled: set) -> None:
+        # Finished games that have dropped off the scoreboard (yesterday's)
+        # leave the snapshot, along with their metrics
+        for game_id in [game_id for game_id, game in self.games.items()
+                        if game_id not in scheduled and game.summary["state"] in FINISHED_STATES and game.final]:
+            del self.games[game_id]
+            self.engine.drop(game_id)
+            self._publish("remove", {"id": game_id})
+
+    async def poll_once(self) -> None:
+        start = time.perf_counter()
+        now = time.monotonic()
+        if self._schedule_checked is None or now - self._schedule_checked >= self.schedule_interval:
+            self._schedule_checked = now
+            scoreboard = await self._fetch(score_url(self.base))
+            for game in (scoreboard or {}).get("games", []):
+                old = self.games.get(game["id"])
+                if old is None:
+                    self._apply(GameState(game_summary(game)))
+                elif old.summary["state"] not in POLLED_STATES:
+                    # Games on the ice are tracked by their (fresher) play-by-play
+                    self._apply(GameState(_merge(old.summary, game_summary(game)), old.plays, old.final))
+            if scoreboard is not None:
+                self._evict({game["id"] for game in scoreboard.get("games", [])})
+
+        polled = [game_id for game_id, game in self.games.items()
+                  if game.summary["state"] in POLLED_STATES
+                  or (game.summary["state"] in FINISHED_STATES and not game.final)]
+        responses = await asyncio.gather(*(self._fetch(play_by_play_url(game_id, self.base)) for game_id in polled))
+        for data in responses:
+            if data is None:
+                continue
+            old = self.games.get(data["id"])
+            summary = _merge(old.summary, game_summary(data)) if old is not None else game_summary(data)
+            plays = {play["eventId"]: play for play in sorted(data.get("plays", []),
+                                                               key=lambda play: play.get("sortOrder", 0))}
+            self._apply(GameState(summary, plays, final=summary["state"] in FINISHED_STATES), data)
+
+        self.stats.polls += 1
+        self.stats.last_poll_seconds = time.perf_counter() - start
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while len(self.broadcaster):
+            started = loop.time()
+            try:
+                await self.poll_once()
+            except Exception as e:  # a bad payload must not kill the poller for everyone
+                self.stats.upstream_errors += 1
+                print(f"⚠️ Live poll failed: {e!r}")
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - started)))
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # -------------------------------------------------------------------
+    # Clients
+    # -------------------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        return {
+            "sequence": self.sequence,
+            "games": [{**game.to_dict(), "metrics": self.engine.snapshot(game_id)}
+                      for game_id, game in self.games.items()]
+        }
+
+    def snapshot_message(self) -> bytes:
+        # Encoded once per sequence number, however many clients (re)connect
+        if self._snapshot is None or self._snapshot[0] != self.sequence:
+            self._snapshot = (self.sequence, sse_message("snapshot", self.snapshot(), id=self.sequence))
+        return self._snapshot[1]
+
+    async def stream(self, request: Request) -> AsyncIterator[bytes]:
+        """SSE stream for one client: the current snapshot, then every update
+        as it's published, with a comment line as a keep-alive."""
+        queue = self.broadcaster.subscribe()
+        self.start()
+        try:
+            yield self.snapshot_message()
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield b": keep-alive\n\n"
+                    continue
+                yield self.snapshot_message() if message is RESYNC else message
+        finally:
+            self.broadcaster.unsubscribe(queue)
+
+
+# The app's single poller, shared by every dashboard client (replaying a
+# recorded game instead of polling the NHL API when LIVE_REPLAY is set)
+live_poller = LivePoller(fetch=ReplaySource.from_env())
@@ -0,0 +1,117 @@
+import json
+import os
+import time
+from typing import Callable, Iterator, Optional, Union
+
+from app.nhl.crawler import FetchResult
+from app.nhl.games import PLAY_BY_PLAY_PATTERN
+
+from .metrics import GameMetrics, game_seconds
+
+
+# Point this at a recorded play-by-play JSON to run the live dashboard off
+# a replay instead of the NHL API (LIVE_REPLAY_SPEED sets the pace)
+REPLAY_ENV = "LIVE_REPLAY"
+REPLAY_SPEED_ENV = "LIVE_REPLAY_SPEED"
+
+
+def load_game(source: Union[str, dict]) -> dict:
+    # A recorded game: the JSON of a gamecenter/{id}/play-by-play response
+    if isinstance(source, dict):
+        return source
+    with open(source, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _ordered_plays(game: dict) -> list:
+    return sorted(game.get("plays", []), key=lambda play: play.get("sortOrder", 0))
+
+
+# -----------------------------------------------------------------------
+# Engine replay: feed a recorded game's events straight into GameMetrics
+# -----------------------------------------------------------------------
+
+def replay_events(source: Union[str, dict], speed: float = 0.0,
+                  sleep: Callable[[float], None] = time.sleep) -> Iterator[GameMetrics]:
+    """Feed a recorded game to a GameMetrics one event at a time, yielding
+    it after each event. With `speed` > 0 the events are spaced out in game
+    time divided by `speed` (60 is a period in 20 seconds); 0 is as fast
+    as possible."""
+    game = load_game(source)
+    metrics = GameMetrics(game["id"], game.get("homeTeam"), game.get("awayTeam"), game.get("rosterSpots", []))
+    previous = 0
+    for play in _ordered_plays(game):
+        seconds = game_seconds(play)
+        if speed > 0 and seconds is not None and seconds > previous:
+            sleep((seconds - previous) / speed)
+            previous = seconds
+        metrics.process(play)
+        yield metrics
+
+
+# -----------------------------------------------------------------------
+# Poller replay: a stand-in for the poller's fetch that serves a recorded
+# game as though it were live, revealing plays as (accelerated) game time
+# passes. Exercises the whole live pipeline without the network.
+# -----------------------------------------------------------------------
+
+class ReplaySource:
+
+    def __init__(self, source: Union[str, dict], speed: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.game = load_game(source)
+        self.game_id = self.game["id"]
+        self.plays = _ordered_plays(self.game)
+        self.speed = speed
+        self.clock = clock
+        self.started: Optional[float] = None
+
+    @classmethod
+    def from_env(cls) -> Optional["ReplaySource"]:
+        path = os.environ.get(REPLAY_ENV)
+        if not path:
+            return None
+        return cls(path, speed=float(os.environ.get(REPLAY_SPEED_ENV, "60")))
+
+    def _revealed(self) -> list:
+        if self.started is None:
+            self.started = self.clock()
+        elapsed = (self.clock() - self.started) * self.speed
+        revealed = []
+        for play in self.plays:
+            seconds = game_seconds(play)
+            if seconds is not None and seconds > elapsed:
+                break
+            revealed.append(play)
+        return revealed
+
+    def _state(self, revealed: list) -> dict:
+        finished = len(revealed) == len(self.plays)
+        home, away = dict(self.game.get("homeTeam") or {}), dict(self.game.get("awayTeam") or {})
+        home["score"] = away["score"] = 0
+        for play in revealed:
+            details = play.get("details") or {}
+            if play.get("typeDescKey") == "goal":
+                home["score"], away["score"] = details.get("homeScore", 0), details.get("awayScore", 0)
+        last = revealed[-1] if revealed else {}
+        return {
+            "id": self.game_id,
+            "gameState": "OFF" if finished else "LIVE",
+            "startTimeUTC": self.game.get("startTimeUTC"),
+            "periodDescriptor": last.get("periodDescriptor") or {"number": 1},
+            "clock": {"timeRemaining": last.get("timeRemaining"), "inIntermission": False},
+            "homeTeam": home,
+            "awayTeam": away
+        }
+
+    def __call__(self, url: str) -> FetchResult:
+        revealed = self._revealed()
+        state = self._state(revealed)
+        if url.endswith("/score/now"):
+            return FetchResult(url, 200, {"games": [state]})
+        match = PLAY_BY_PLAY_PATTERN.search(url)
+        if match and int(match.group(1)) == self.game_id:
+            return FetchResult(url, 200, {**state, "rosterSpots": self.game.get("rosterSpots", []),
+                                          "plays": revealed})
+        return FetchResult(url, 404, error="HTTP 404")
+
@@ -0,0 +1,2 @@
+from .registry import Collected, Counter, Gauge, Histogram, Metric, Registry, app_metrics
+from .middleware import LATENCY_BUCKETS, SIZE_BUCKETS, TimingMiddleware
@@ -0,0 +1,89 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .registry import app_metrics
+
+
+# Seconds, from a page cache hit (well under a millisecond) to a cold heatmap render
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Bytes, from an empty 304 to a multi-megabyte chart
+SIZE_BUCKETS = (0, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+http_requests = app_metrics.counter(
+    "http_requests_total", "HTTP requests by route, method and status.", ("route", "method", "status"))
+http_latency = app_metrics.histogram(
+    "http_request_duration_seconds", "Time from receiving a request to sending the last byte of its response.",
+    ("route", "method"), LATENCY_BUCKETS)
+http_response_size = app_metrics.histogram(
+    "http_response_size_bytes", "Response body bytes as sent (after compression).", ("route",), SIZE_BUCKETS)
+http_in_flight = app_metrics.gauge(
+    "http_requests_in_flight", "Requests being handled, open live dashboard streams included.")
+
+
+# -----------------------------------------------------------------------
+# Request timing middleware
+#
+# A plain ASGI middleware rather than a BaseHTTPMiddleware, which would run
+# every request through an extra task and buffer streaming responses. It
+# times each request until its last body chunk is sent and counts the body
+# bytes on the way out. Requests are labelled by route template
+# ("/api/players/{player_id}", "/static" for everything under a mount) or
+# "unmatched" for 404s, never by raw path, so the number of series can't
+# grow with traffic.
+# -----------------------------------------------------------------------
+
+def _route_label(scope: Scope, root_path: str) -> str:
+    # The template of the route that handled the request, once the router has run
+    path = scope["path"][len(root_path):] if scope["path"].startswith(root_path) else scope["path"]
+    route = scope.get("route")
+    regex = getattr(route, "path_regex", None)
+    if regex is not None:
+        if regex.match(path):
+            return route.path
+        # The route of an included router, whose template may not carry the
+        # router's prefix: put back the part of the path it didn't match
+        for i in range(1, len(path)):
+            if path[i] == "/" and regex.match(path[i:]):
+                return path[:i] + route.path
+        return route.path
+    if "endpoint" in scope:
+        # A mount (static files): the prefix it was mounted at
+        return scope.get("root_path", "")[len(root_path):] or "/"
+    return "unmatched"
+
+
+class TimingMiddleware:
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        root_path = scope.get("root_path", "")
+        status = 500  # if the app fails before responding
+        size = 0
+
+        async def send_counted(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_counted)
+        finally:
+            http_in_flight.dec()
+            route = _route_label(scope, root_path)
+            method = scope["method"]
+            http_requests.labels(route, method, str(status)).inc()
+            http_latency.labels(route, method).observe(time.perf_counter() - start)
+            http_response_size.labels(route).observe(size)
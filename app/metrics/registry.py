@@ -0,0 +1,203 @@
+import math
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple, Union
+
+LabelValues = Tuple[str, ...]
+
+
+# -----------------------------------------------------------------------
+# Metrics
+#
+# Counters, gauges and histograms rendered in the Prometheus text format
+# (version 0.0.4), small enough to leave on: recording is an attribute
+# increment on a child looked up once per label combination, and all the
+# formatting happens when /metrics is scraped. They're updated from the
+# event loop thread (the timing middleware), so there's no locking.
+#
+# Stats that other parts of the app keep already (cache hits, poller
+# counts) aren't duplicated: a Collected metric reads them at scrape time.
+#
+# Everything is per process. With several workers each has its own
+# numbers, and a scrape sees whichever worker answered it.
+# -----------------------------------------------------------------------
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = [*zip(names, values), *extra]
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last one is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        # Buckets are upper bounds, inclusive ("le")
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._children: Dict[LabelValues, object] = {}
+
+    def _child(self):
+        return _Value()
+
+    def labels(self, *values: str):
+        """The series for these label values (in label order), created on
+        first use. Callers on a hot path should keep the child."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} takes labels {self.label_names}, got {values}")
+            child = self._children[values] = self._child()
+        return child
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        # (name suffix, rendered labels, value) for every series
+        for values, child in list(self._children.items()):
+            yield "", _labels(self.label_names, values), child.value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{self.name}{suffix}{labels} {_number(value)}" for suffix, labels, value in self.samples())
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = ()):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _child(self):
+        return _Buckets(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), child.counts):
+                cumulative += count
+                yield "_bucket", _labels(self.label_names, values, [("le", _number(float(bound)))]), cumulative
+            yield "_sum", _labels(self.label_names, values), child.sum
+            yield "_count", _labels(self.label_names, values), cumulative
+
+
+class Collected(Metric):
+    """A counter or gauge read at scrape time: `collect` returns the value,
+    or label values -> value for a labelled metric."""
+
+    def __init__(self, name: str, help: str, kind: str,
+                 collect: Callable[[], Union[float, Dict[LabelValues, float]]], labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self.kind = kind
+        self.collect = collect
+
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        values = self.collect()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for label_values, value in values.items():
+            yield "", _labels(self.label_names, label_values), value
+
+
+# -----------------------------------------------------------------------
+# Registry
+# -----------------------------------------------------------------------
+
+class Registry:
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._metrics
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = ()) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def collected(self, name: str, help: str, kind: str, collect: Callable, labels: Sequence[str] = ()) -> Collected:
+        return self.register(Collected(name, help, kind, collect, labels))
+
+    def render(self) -> bytes:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+# The app's metrics, served at /metrics
+app_metrics = Registry()
@@ -0,0 +1,9 @@
+from .cache import ResponseCache
+from .crawler import Crawler, FetchResult, TokenBucket
+from .franchises import FranchiseIndex
+from .games import (SHOT_EVENTS, fetch_game_ids, flatten_shots, game_season, game_type, historical_games_immutable,
+                    iter_game_shots, play_by_play_url, schedule_url)
+from .journal import CrawlJournal, crawl_to_journal
+from .partitions import MergeSummary, PartitionManifest, merge_partitions
+from .rosters import (ROSTER_COLUMNS, RosterPartition, crawl_partitions, crawl_rosters, fetch_teams,
+                      flatten_roster, historical_rosters_immutable, iter_partitions, season_range)
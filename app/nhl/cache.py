@@ -0,0 +1,137 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+
+# -----------------------------------------------------------------------
+# Content-addressed response cache for the NHL APIs
+#
+# Layout under `root`:
+#   objects/ab/abcdef....json.gz  - gzipped response bodies, named by the
+#                                   sha256 of the body (identical payloads
+#                                   are stored once)
+#   urls/12/123456....json        - one small record per URL: body hash,
+#                                   ETag, Last-Modified, fetch time
+# -----------------------------------------------------------------------
+
+@dataclass
+class CachedResponse:
+    url: str
+    body_hash: str
+    size: int
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+    def validators(self) -> dict:
+        # Headers for a conditional GET
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    stored: int = 0
+    bytes_saved: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, **counts) -> None:
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def report(self) -> str:
+        lookups = self.hits + self.revalidated + self.misses
+        hit_rate = (self.hits + self.revalidated) / lookups if lookups else 0.0
+        return (f"HTTP cache: {self.hits} hits, {self.revalidated} revalidated (304), "
+                f"{self.misses} misses ({hit_rate:.0%} served locally), "
+                f"{self.bytes_saved / 1e6:.1f} MB not downloaded")
+
+
+class ResponseCache:
+    """On-disk HTTP response cache keyed by URL.
+
+    `immutable(url)` decides which URLs never change once fetched (e.g.
+    rosters for finished seasons); those are served from disk without
+    touching the network. Everything else is revalidated with a conditional
+    GET. With `offline=True` the network is never used at all.
+    """
+
+    def __init__(self, root: str, immutable: Optional[Callable[[str], bool]] = None, offline: bool = False):
+        self.root = root
+        self.immutable = immutable or (lambda url: False)
+        self.offline = offline
+        self.stats = CacheStats()
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(root, "urls"), exist_ok=True)
+
+    # -------------------------------------------------------------------
+    # Paths
+    # -------------------------------------------------------------------
+
+    def _url_path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.root, "urls", key[:2], f"{key}.json")
+
+    def _object_path(self, body_hash: str) -> str:
+        return os.path.join(self.root, "objects", body_hash[:2], f"{body_hash}.json.gz")
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    # -------------------------------------------------------------------
+    # Reads and writes
+    # -------------------------------------------------------------------
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        path = self._url_path(url)
+        if not os.path.isfile(path):
+            return None
+        with open(path) as f:
+            entry = CachedResponse(**json.load(f))
+        if not os.path.isfile(self._object_path(entry.body_hash)):
+            return None
+        return entry
+
+    def body(self, entry: CachedResponse) -> bytes:
+        with open(self._object_path(entry.body_hash), "rb") as f:
+            return gzip.decompress(f.read())
+
+    def store(self, url: str, body: bytes, headers) -> CachedResponse:
+        body_hash = hashlib.sha256(body).hexdigest()
+        object_path = self._object_path(body_hash)
+        if not os.path.isfile(object_path):
+            self._write_atomic(object_path, gzip.compress(body, compresslevel=6))
+
+        entry = CachedResponse(
+            url=url,
+            body_hash=body_hash,
+            size=len(body),
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+            fetched_at=time.time(),
+        )
+        self._write_atomic(self._url_path(url), json.dumps(entry.__dict__).encode())
+        self.stats.add(stored=1)
+        return entry
+
+    def is_fresh(self, url: str) -> bool:
+        # Fresh entries are served without asking the server
+        return self.offline or self.immutable(url)
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional
+from urllib.parse import urlsplit
+
+from .cache import ResponseCache
+
+if TYPE_CHECKING:
+    import requests
+
+
+# Status codes worth another attempt. Anything else (404 included) is a final
+# answer from the API and gets handed straight back to the caller.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+# -----------------------------------------------------------------------
+# Token bucket: global requests-per-second limit shared by every worker
+# -----------------------------------------------------------------------
+
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` calls per second on average,
+    with bursts of up to `burst` calls."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# -----------------------------------------------------------------------
+# Result of a single fetch
+# -----------------------------------------------------------------------
+
+@dataclass
+class FetchResult:
+    url: str
+    status: Optional[int] = None
+    data: Any = None
+    error: Optional[str] = None
+    attempts: int = 0
+    key: Any = None
+    digest: Optional[str] = None  # sha256 of the response body
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200 and self.error is None
+
+
+# -----------------------------------------------------------------------
+# Crawler: thread pool + global rate limit + per-host cap + retries
+# -----------------------------------------------------------------------
+
+class Crawler:
+    """Concurrent JSON fetcher for the NHL APIs.
+
+    Every request waits on a shared token bucket (`rate` requests/second),
+    holds one of `per_host` slots for its host while in flight, and is retried
+    with exponential backoff on connection errors and 429/5xx responses.
+    Given a ResponseCache, fresh entries are served from disk and stale ones
+    are revalidated with a conditional GET.
+    """
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        burst: Optional[int] = None,
+        max_workers: int = 16,
+        per_host: int = 8,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 15.0,
+        cache: Optional[ResponseCache] = None,
+    ):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = cache
+        self._host_slots = {}
+        self._host_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _session(self) -> "requests.Session":
+        # requests.Session is not guaranteed thread-safe, so one per worker
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=self.per_host)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+        return session
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._host_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _sleep_before_retry(self, attempt: int, response: Optional["requests.Response"]) -> None:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = float(retry_after)
+        else:
+            delay = self.backoff * (2 ** attempt)
+        time.sleep(delay + random.uniform(0, self.backoff))
+
+    @staticmethod
+    def _decode(result: FetchResult, body: bytes) -> FetchResult:
+        result.status = 200
+        result.digest = hashlib.sha256(body).hexdigest()
+        try:
+            result.data, result.error = json.loads(body), None
+        except ValueError as e:
+            result.error = f"Invalid JSON: {e}"
+        return result
+
+    def fetch(self, url: str, key: Any = None) -> FetchResult:
+        # Imported on first use: the server only fetches once a live dashboard is open
+        import requests
+
+        result = FetchResult(url=url, key=key)
+        cache = self.cache
+        cached = cache.lookup(url) if cache is not None else None
+
+        # Immutable (or offline) cache entries never touch the network
+        if cached is not None and cache.is_fresh(url):
+            cache.stats.add(hits=1, bytes_saved=cached.size)
+            return self._decode(result, cache.body(cached))
+        if cache is not None and cache.offline:
+            result.error = "Not in cache (offline)"
+            return result
+
+        headers = cached.validators() if cached is not None else {}
+
+        for attempt in range(self.retries + 1):
+            result.attempts = attempt + 1
+            response = None
+            self.bucket.acquire()
+
+            try:
+                with self._slot(url):
+                    response = self._session().get(url, headers=headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                result.status, result.error = None, str(e)
+            else:
+                result.status = response.status_code
+                if response.status_code == 304 and cached is not None:
+                    cache.stats.add(revalidated=1, bytes_saved=cached.size)
+                    return self._decode(result, cache.body(cached))
+                if response.status_code not in RETRY_STATUSES:
+                    if response.status_code != 200:
+                        result.error = f"HTTP {response.status_code}"
+                        return result
+                    self._decode(result, response.content)
+                    if cache is not None and result.ok:
+                        cache.stats.add(misses=1)
+                        cache.store(url, response.content, response.headers)
+                    return result
+                result.error = f"HTTP {response.status_code}"
+
+            if attempt < self.retries:
+                self._sleep_before_retry(attempt, response)
+
+        return result
+
+    def fetch_all(self, jobs: Iterable) -> Iterator[FetchResult]:
+        """Fetch many URLs concurrently, yielding results as they finish.
+
+        `jobs` is an iterable of URLs or (key, url) pairs; the key is
+        carried through on the result so callers can put things back in order.
+        Only a small window of requests is queued at a time, so memory stays
+        flat however long `jobs` is, and an interrupt cancels the rest.
+        """
+        jobs = iter(jobs)
+        window = self.max_workers * 2
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = set()
+
+        try:
+            while True:
+                for item in islice(jobs, window - len(pending)):
+                    key, url = item if isinstance(item, tuple) else (None, item)
+                    pending.add(pool.submit(self.fetch, url, key))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,133 @@
+import json
+import os
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .crawler import Crawler
+
+
+# -----------------------------------------------------------------------
+# Franchise activity index
+#
+# Remembers which (team, season) rosters exist so the crawler only asks for
+# plausible pairs instead of every tricode against every season since 1917.
+# Per tricode it keeps:
+#   listed  - seasons the API's roster-season metadata says exist
+#   active  - seasons we fetched a roster for (HTTP 200)
+#   missing - seasons the API told us don't exist (HTTP 404)
+# -----------------------------------------------------------------------
+
+class FranchiseIndex:
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.teams: Dict[str, Dict[str, set]] = {}
+        if path and os.path.isfile(path):
+            self.load()
+
+    def _team(self, abbr: str) -> Dict[str, set]:
+        if abbr not in self.teams:
+            self.teams[abbr] = {"listed": set(), "active": set(), "missing": set()}
+        return self.teams[abbr]
+
+    # -------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------
+
+    def load(self) -> None:
+        with open(self.path) as f:
+            raw = json.load(f)
+        self.teams = {
+            abbr: {kind: set(seasons) for kind, seasons in entry.items()}
+            for abbr, entry in raw.get("teams", {}).items()
+        }
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        payload = {
+            "updated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "teams": {
+                abbr: {kind: sorted(seasons) for kind, seasons in entry.items()}
+                for abbr, entry in sorted(self.teams.items())
+            },
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(payload, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    # -------------------------------------------------------------------
+    # Recording what we learn
+    # -------------------------------------------------------------------
+
+    def record(self, abbr: str, season: int, status: Optional[int]) -> None:
+        # Only definitive answers go in the index; errors and 5xx teach us nothing
+        team = self._team(abbr)
+        if status == 200:
+            team["active"].add(season)
+            team["missing"].discard(season)
+        elif status == 404:
+            team["missing"].add(season)
+            team["active"].discard(season)
+
+    def seed_from_metadata(self, crawler: Crawler, team_abbreviations: Iterable[str], base: str) -> int:
+        """Fill `listed` from the /roster-season/{abbr} endpoint (one request
+        per team rather than one per team-season). Teams without metadata stay
+        unknown and get a full probe. Returns the number of teams seeded."""
+        jobs = [(abbr, f"{base}/roster-season/{abbr}") for abbr in team_abbreviations]
+        seeded = 0
+        for result in crawler.fetch_all(jobs):
+            if result.ok and isinstance(result.data, list):
+                self._team(result.key)["listed"].update(int(s) for s in result.data)
+                seeded += 1
+        return seeded
+
+    # -------------------------------------------------------------------
+    # Planning
+    # -------------------------------------------------------------------
+
+    def known_seasons(self, abbr: str) -> set:
+        team = self.teams.get(abbr)
+        if team is None:
+            return set()
+        return (team["listed"] | team["active"]) - team["missing"]
+
+    def plan(self, team_abbreviations: List[str], seasons: List[int], edge: int = 1) -> List[Tuple[int, str]]:
+        """(season, team) pairs worth requesting, in season then team order.
+
+        Teams the index has never seen are probed for every season. For known
+        teams we request their known range, `edge` extra seasons either side of
+        it, and every newer season if the team was active in the latest season
+        anyone has played. Seasons already answered with a 404 are skipped,
+        except the newest season, which may simply not have started yet.
+        """
+        seasons = sorted(seasons)
+        newest = seasons[-1]
+        latest_known = max((max(k) for k in map(self.known_seasons, self.teams) if k), default=None)
+
+        wanted = {}
+        for abbr in team_abbreviations:
+            team = self.teams.get(abbr)
+            known = self.known_seasons(abbr)
+
+            if team is None:
+                # Never seen this team: probe everything once
+                wanted[abbr] = set(seasons)
+                continue
+            if not known:
+                # Nothing has ever been found for this team; only watch the newest season
+                wanted[abbr] = {newest}
+                continue
+
+            lo = max(0, bisect_left(seasons, min(known)) - edge)
+            hi = bisect_right(seasons, max(known)) - 1 + edge
+            if max(known) == latest_known:
+                hi = len(seasons) - 1
+
+            wanted[abbr] = {s for s in seasons[lo:hi + 1] if s not in team["missing"] or s == newest}
+
+        return [(season, abbr) for season in seasons for abbr in team_abbreviations
+                if season in wanted[abbr]]
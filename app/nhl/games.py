@@ -0,0 +1,162 @@
+import re
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from .crawler import Crawler
+from .rosters import WEB_API
+
+
+# Game ids are {start year}{game type:02}{number:04}: 2024020001 is the
+# first regular season game of 2024-25, 2024030111 a first-round playoff game
+GAME_TYPES = {1: "preseason", 2: "regular", 3: "playoffs"}
+
+# Play types that are shot attempts, as the play-by-play names them
+SHOT_EVENTS = ("goal", "shot-on-goal", "missed-shot", "blocked-shot")
+
+PLAY_BY_PLAY_PATTERN = re.compile(r"/gamecenter/(\d{10})/play-by-play$")
+SCHEDULE_PATTERN = re.compile(r"/club-schedule-season/([A-Z]{3})/(\d{8})$")
+
+
+def schedule_url(abbr: str, season: int, base: str = WEB_API) -> str:
+    # Every game one team played in a season, preseason and playoffs included
+    return f"{base}/club-schedule-season/{abbr}/{season}"
+
+
+def play_by_play_url(game_id: int, base: str = WEB_API) -> str:
+    return f"{base}/gamecenter/{game_id}/play-by-play"
+
+
+def game_season(game_id: int) -> int:
+    # 2024020001 -> 20242025
+    year = game_id // 1000000
+    return year * 10000 + year + 1
+
+
+def game_type(game_id: int) -> int:
+    return game_id // 10000 % 100
+
+
+def historical_games_immutable(current_season: int) -> Callable[[str], bool]:
+    # Schedules and play-by-play from before the current season are never
+    # amended, so the cache can serve them without asking the API again
+    def immutable(url: str) -> bool:
+        match = PLAY_BY_PLAY_PATTERN.search(url)
+        if match is not None:
+            return game_season(int(match.group(1))) < current_season
+        match = SCHEDULE_PATTERN.search(url)
+        return match is not None and int(match.group(2)) < current_season
+    return immutable
+
+
+# -----------------------------------------------------------------------
+# Flattening shots
+#
+# One row per shot attempt with who took it, how, at what strength and
+# where from. Coordinates are in feet from centre ice (x along the rink,
+# -100 to 100; y across it, -42.5 to 42.5) and are flipped so that every
+# shot is taken at the net on the right, whichever end the team attacked
+# that period.
+# -----------------------------------------------------------------------
+
+def _strength(situation: Optional[str], home: bool) -> Optional[str]:
+    # situationCode is away goalie, away skaters, home skaters, home goalie ("1551" is 5v5)
+    if not situation or len(situation) != 4 or not situation.isdigit():
+        return None
+    own, other = (int(situation[2]), int(situation[1])) if home else (int(situation[1]), int(situation[2]))
+    if own > other:
+        return "PP"
+    if own < other:
+        return "SH"
+    return "EV"
+
+
+def _attacks_right(play: dict, home: bool, x: float) -> bool:
+    side = play.get("homeTeamDefendingSide")
+    if side in ("left", "right"):
+        return (side == "left") == home
+    # Older games don't say; the shooter is nearly always in the attacking half
+    return x >= 0
+
+
+def flatten_shots(data: dict) -> List[dict]:
+    """Shot attempts in a gamecenter/{id}/play-by-play response, one row
+    each. Attempts without coordinates or a shooter are skipped."""
+    game_id = data["id"]
+    home_id = (data.get("homeTeam") or {}).get("id")
+    roster = {spot["playerId"]: spot["teamId"] for spot in data.get("rosterSpots", [])}
+    rows = []
+    for play in data.get("plays", []):
+        kind = play.get("typeDescKey")
+        if kind not in SHOT_EVENTS:
+            continue
+        details = play.get("details") or {}
+        shooter = details.get("shootingPlayerId") or details.get("scoringPlayerId")
+        x, y = details.get("xCoord"), details.get("yCoord")
+        if shooter is None or x is None or y is None:
+            continue
+
+        # A blocked shot belongs to the blocking team; the roster says who shot it
+        team = roster.get(shooter, details.get("eventOwnerTeamId"))
+        home = team == home_id
+        if not _attacks_right(play, home, x):
+            x, y = -x, -y
+        rows.append({
+            'game_id': game_id,
+            'game_type': game_type(game_id),
+            'period': (play.get("periodDescriptor") or {}).get("number"),
+            'player_id': shooter,
+            'team_id': team,
+            'event': kind,
+            'shot_type': details.get("shotType"),
+            'strength': _strength(play.get("situationCode"), home),
+            'x': x,
+            'y': y,
+            'season': game_season(game_id)
+        })
+    return rows
+
+
+# -----------------------------------------------------------------------
+# Pulls
+# -----------------------------------------------------------------------
+
+def fetch_game_ids(crawler: Crawler, plan: Iterable[Tuple[int, str]], base: str = WEB_API,
+                   game_types: Iterable[int] = (2, 3), verbose: bool = True) -> List[int]:
+    """Ids of every game in the planned (season, team) schedules, of the
+    given game types, in order. Each game appears in both teams' schedules
+    but is only listed once."""
+    game_types = set(game_types)
+    game_ids = set()
+    jobs = ((key, schedule_url(key[1], key[0], base)) for key in plan)
+    for result in crawler.fetch_all(jobs):
+        if not result.ok:
+            if result.status != 404:
+                print(f"  ⚠️ Failed to retrieve the {result.key[1]} {result.key[0]} schedule: {result.error}")
+            continue
+        game_ids.update(game["id"] for game in result.data.get("games", [])
+                        if game.get("gameType") in game_types)
+    if verbose:
+        print(f"  📅 {len(game_ids)} games scheduled")
+    return sorted(game_ids)
+
+
+def iter_game_shots(crawler: Crawler, game_ids: Iterable[int], base: str = WEB_API,
+                    verbose: bool = True) -> Iterator[Tuple[int, List[dict]]]:
+    """Pull every game's play-by-play concurrently and flatten its shots.
+
+    Yields (game id, rows) as each request finishes; games that fail are
+    reported and skipped.
+    """
+    failures = 0
+    jobs = ((game_id, play_by_play_url(game_id, base)) for game_id in game_ids)
+    for result in crawler.fetch_all(jobs):
+        if not result.ok:
+            failures += 1
+            print(f"  ⚠️ Failed to retrieve play-by-play for game {result.key}: {result.error}")
+            continue
+        rows = flatten_shots(result.data)
+        if verbose:
+            print(f"  ✅ {len(rows)} shots from game {result.key}")
+        yield result.key, rows
+
+    if failures:
+        print(f"⚠️ {failures} play-by-play requests failed after retries")
@@ -0,0 +1,174 @@
+import csv
+import io
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .franchises import FranchiseIndex
+from .partitions import partitions_to_csv
+from .rosters import ROSTER_COLUMNS, RosterPartition
+
+
+PartitionKey = Tuple[int, str]  # (season, team)
+
+
+# -----------------------------------------------------------------------
+# Crawl journal
+#
+# A crawl writes finished (season, team) units to disk in batches instead of
+# holding every roster row until the end. The journal directory holds:
+#   part-00001.csv ...  - roster rows for a batch of finished partitions
+#   journal.jsonl       - one line per finished unit: status, response hash
+#                         and where its rows live (part file, byte range)
+# A part file is fsynced before the journal lines that point into it, so
+# after a crash or Ctrl-C everything in the journal is safe to trust and a
+# restart only has to fetch what's missing.
+# -----------------------------------------------------------------------
+
+@dataclass
+class JournalEntry:
+    season: int
+    team: str
+    status: int
+    digest: Optional[str] = None
+    part: Optional[str] = None
+    offset: int = 0
+    length: int = 0
+
+
+class CrawlJournal:
+
+    def __init__(self, directory: str, batch_size: int = 100):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.completed: Dict[PartitionKey, JournalEntry] = {}
+        self._buffer: List[Tuple[int, Optional[RosterPartition]]] = []
+        self._parts = 0
+        self._journal_path = os.path.join(directory, "journal.jsonl")
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.isfile(self._journal_path):
+            return
+        with open(self._journal_path, "rb+") as f:
+            good = 0
+            for line in f:
+                try:
+                    entry = JournalEntry(**json.loads(line))
+                except ValueError:
+                    # A torn final line from a crash mid-write; keep everything before it
+                    f.truncate(good)
+                    break
+                self.completed[(entry.season, entry.team)] = entry
+                good += len(line)
+        self._parts = len([name for name in os.listdir(self.directory) if name.startswith("part-")])
+
+    def reset(self) -> None:
+        # Forget everything, e.g. once the output has been written
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
+        self.completed = {}
+        self._buffer = []
+        self._parts = 0
+
+    def pending(self, plan: Iterable[PartitionKey]) -> List[PartitionKey]:
+        return [key for key in plan if key not in self.completed]
+
+    # -------------------------------------------------------------------
+    # Recording finished units
+    # -------------------------------------------------------------------
+
+    def add(self, key: PartitionKey, status: Optional[int], partition: Optional[RosterPartition] = None) -> None:
+        # Failed requests aren't journaled so a resume tries them again
+        if status == 200 and partition is not None:
+            self._buffer.append((status, partition))
+        elif status == 404:
+            self._buffer.append((status, RosterPartition(key[0], key[1], [])))
+        else:
+            return
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+
+        self._parts += 1
+        part = f"part-{self._parts:05d}.csv"
+
+        chunks, entries = [], []
+        offset = 0
+        for status, partition in self._buffer:
+            chunk = partitions_to_csv([partition])
+            chunks.append(chunk)
+            entries.append(JournalEntry(partition.season, partition.team, status, partition.digest,
+                                        part if chunk else None, offset, len(chunk)))
+            offset += len(chunk)
+
+        self._write_durable(os.path.join(self.directory, part), b"".join(chunks), "wb")
+        lines = "".join(json.dumps(entry.__dict__) + "\n" for entry in entries)
+        self._write_durable(self._journal_path, lines.encode("utf-8"), "ab")
+
+        for entry in entries:
+            self.completed[(entry.season, entry.team)] = entry
+        self._buffer = []
+
+    @staticmethod
+    def _write_durable(path: str, data: bytes, mode: str) -> None:
+        with open(path, mode) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    # -------------------------------------------------------------------
+    # Reading finished units back
+    # -------------------------------------------------------------------
+
+    def _read_rows(self, entry: JournalEntry) -> bytes:
+        if entry.part is None:
+            return b""
+        with open(os.path.join(self.directory, entry.part), "rb") as f:
+            f.seek(entry.offset)
+            return f.read(entry.length)
+
+    def partitions(self, keys: Iterable[PartitionKey]) -> Iterator[RosterPartition]:
+        # One partition at a time, for the keys that returned a roster
+        for key in keys:
+            entry = self.completed.get(key)
+            if entry is None or entry.status != 200:
+                continue
+            text = self._read_rows(entry).decode("utf-8")
+            rows = list(csv.DictReader(io.StringIO(text), fieldnames=ROSTER_COLUMNS))
+            yield RosterPartition(entry.season, entry.team, rows, entry.digest)
+
+    def write_csv(self, csv_path: str, keys: Iterable[PartitionKey]) -> int:
+        """Stitch the journaled partitions into one CSV in `keys` order by
+        copying byte ranges out of the part files. Returns the row count."""
+        rows = 0
+        tmp_path = f"{csv_path}.tmp"
+        with open(tmp_path, "wb") as out:
+            out.write((",".join(ROSTER_COLUMNS) + "\n").encode("utf-8"))
+            for key in keys:
+                entry = self.completed.get(key)
+                if entry is not None and entry.status == 200:
+                    data = self._read_rows(entry)
+                    rows += data.count(b"\n")
+                    out.write(data)
+        os.replace(tmp_path, csv_path)
+        return rows
+
+
+def crawl_to_journal(partitions: Iterable[Tuple[PartitionKey, Optional[int], Optional[RosterPartition]]],
+                     journal: CrawlJournal, index: Optional[FranchiseIndex] = None) -> None:
+    """Drain an iter_partitions() stream into the journal, flushing in
+    batches. Whatever finished is flushed even if the crawl is interrupted."""
+    try:
+        for key, status, partition in partitions:
+            journal.add(key, status, partition)
+    finally:
+        journal.flush()
+        if index is not None:
+            index.save()
@@ -0,0 +1,173 @@
+import csv
+import io
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple
+
+from .rosters import ROSTER_COLUMNS, RosterPartition
+
+
+PartitionKey = Tuple[int, str]  # (season, team)
+
+
+# -----------------------------------------------------------------------
+# Partition manifest
+#
+# rosters.csv is a flat file, but it is really a stack of (season, team)
+# partitions. The manifest sits next to it and remembers which partitions
+# are in the file and the hash of the API response each one came from, so
+# an incremental refresh can tell new and changed partitions from ones it
+# already has.
+# -----------------------------------------------------------------------
+
+class PartitionManifest:
+
+    def __init__(self, path: str):
+        self.path = path
+        self.digests: Dict[PartitionKey, Optional[str]] = {}
+
+    @staticmethod
+    def _encode(key: PartitionKey) -> str:
+        return f"{key[0]}/{key[1]}"
+
+    @staticmethod
+    def _decode(name: str) -> PartitionKey:
+        season, team = name.split("/")
+        return int(season), team
+
+    @classmethod
+    def for_csv(cls, csv_path: str) -> "PartitionManifest":
+        """Manifest for `csv_path`, loaded from disk if present, otherwise
+        rebuilt from the CSV itself (with unknown digests)."""
+        manifest = cls(f"{os.path.splitext(csv_path)[0]}.partitions.json")
+        if os.path.isfile(manifest.path):
+            with open(manifest.path) as f:
+                manifest.digests = {cls._decode(k): v for k, v in json.load(f).items()}
+        elif os.path.isfile(csv_path):
+            manifest.digests = {key: None for key in scan_partitions(csv_path)}
+        return manifest
+
+    def update(self, partitions: Iterable[RosterPartition]) -> None:
+        for partition in partitions:
+            self.digests[(partition.season, partition.team)] = partition.digest
+
+    def save(self) -> None:
+        payload = {self._encode(k): v for k, v in sorted(self.digests.items())}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(payload, f, indent=0)
+        os.replace(tmp_path, self.path)
+
+    def __contains__(self, key: PartitionKey) -> bool:
+        return key in self.digests
+
+
+# -----------------------------------------------------------------------
+# Reading and rewriting the CSV by partition
+# -----------------------------------------------------------------------
+
+def _row_key(line: bytes) -> PartitionKey:
+    # team is the first column and season the last
+    row = next(csv.reader([line.decode("utf-8")]))
+    return int(row[-1]), row[0]
+
+
+def scan_partitions(csv_path: str) -> Dict[PartitionKey, int]:
+    # Byte offset of the first row of each partition, in file order
+    offsets = {}
+    with open(csv_path, "rb") as f:
+        offset = len(f.readline())
+        for line in f:
+            key = _row_key(line)
+            if key not in offsets:
+                offsets[key] = offset
+            offset += len(line)
+    return offsets
+
+
+def partitions_to_csv(partitions: Iterable[RosterPartition]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=ROSTER_COLUMNS, lineterminator="\n")
+    for partition in partitions:
+        writer.writerows(partition.rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+@dataclass
+class MergeSummary:
+    added: int = 0
+    replaced: int = 0
+    skipped: int = 0
+    rows_written: int = 0
+    bytes_rewritten: int = 0
+    seasons: set = field(default_factory=set)  # seasons with added or replaced partitions
+
+    def __str__(self) -> str:
+        return (f"Partitions: {self.added} added, {self.replaced} replaced, {self.skipped} unchanged "
+                f"({self.rows_written} rows written, {self.bytes_rewritten / 1e3:.0f} KB of existing "
+                f"file rewritten)")
+
+
+def _copy(src, out, length: Optional[int] = None, chunk: int = 1 << 20) -> None:
+    # The next `length` bytes of src (all of it if None) to out
+    while length is None or length > 0:
+        data = src.read(chunk if length is None else min(chunk, length))
+        if not data:
+            break
+        out.write(data)
+        if length is not None:
+            length -= len(data)
+
+
+def merge_partitions(csv_path: str, manifest: PartitionManifest,
+                     partitions: Iterable[RosterPartition]) -> MergeSummary:
+    """Merge freshly pulled partitions into rosters.csv.
+
+    Partitions whose response hash matches the manifest are skipped. New
+    partitions are appended. Changed partitions are replaced by cutting the
+    file at the first row of the earliest changed partition and filtering
+    only the tail, so history above that point is copied as-is (in
+    practice only the current season is rewritten). The result is written
+    to a temporary copy and swapped in, and the manifest is saved after it,
+    so an interrupted merge leaves the old file and manifest as they were.
+    """
+    summary = MergeSummary()
+    changed = {}
+    for partition in partitions:
+        key = (partition.season, partition.team)
+        if key in manifest and partition.digest is not None and manifest.digests[key] == partition.digest:
+            summary.skipped += 1
+        else:
+            changed[key] = partition
+
+    replaced = {key for key in changed if key in manifest}
+    summary.replaced = len(replaced)
+    summary.added = len(changed) - len(replaced)
+    summary.rows_written = sum(len(p.rows) for p in changed.values())
+    summary.seasons = {season for season, _ in changed}
+
+    tmp_path = f"{csv_path}.tmp"
+    if not os.path.isfile(csv_path):
+        with open(tmp_path, "wb") as out:
+            out.write((",".join(ROSTER_COLUMNS) + "\n").encode("utf-8"))
+            out.write(partitions_to_csv(changed.values()))
+        os.replace(tmp_path, csv_path)
+    elif changed:
+        offsets = scan_partitions(csv_path) if replaced else {}
+        cuts = [offsets[key] for key in replaced if key in offsets]
+        with open(csv_path, "rb") as src, open(tmp_path, "wb") as out:
+            if cuts:
+                _copy(src, out, min(cuts))
+                tail = src.read()
+                summary.bytes_rewritten = len(tail)
+                out.write(b"".join(line for line in tail.splitlines(keepends=True)
+                                   if _row_key(line) not in replaced))
+            else:
+                _copy(src, out)
+            out.write(partitions_to_csv(changed.values()))
+        os.replace(tmp_path, csv_path)
+
+    manifest.update(changed.values())
+    manifest.save()
+    return summary
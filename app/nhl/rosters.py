@@ -0,0 +1,139 @@
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .crawler import Crawler
+from .franchises import FranchiseIndex
+
+
+# Base URLs are module level so the crawl can be pointed at a local stub server
+STATS_API = "https://api.nhle.com/stats/rest/en"
+WEB_API = "https://api-web.nhle.com/v1"
+
+FIRST_SEASON_YEAR = 1917
+
+# Column order of rosters.csv
+ROSTER_COLUMNS = [
+    'team', 'id', 'first_name', 'last_name', 'position', 'sweater', 'shoots', 'birth_date',
+    'birth_city', 'birth_province', 'birth_country', 'height_in', 'weight_lb', 'headshot', 'season'
+]
+
+ROSTER_URL_PATTERN = re.compile(r"/roster/([A-Z]{3})/(\d{8})$")
+
+
+# -----------------------------------------------------------------------
+# Helpers: seasons, URLs, flattening
+# -----------------------------------------------------------------------
+
+def season_range(first_year: int = FIRST_SEASON_YEAR, last_year: int = 2024) -> List[int]:
+    # 1917 -> 19171918, ..., 2024 -> 20242025
+    return [int(f"{year}{year+1}") for year in range(first_year, last_year + 1)]
+
+
+def roster_url(abbr: str, season: int, base: str = WEB_API) -> str:
+    return f"{base}/roster/{abbr}/{season}"
+
+
+def historical_rosters_immutable(current_season: int) -> Callable[[str], bool]:
+    # Rosters for seasons before the current one never change, so the cache
+    # can serve them without asking the API again
+    def immutable(url: str) -> bool:
+        match = ROSTER_URL_PATTERN.search(url)
+        return match is not None and int(match.group(2)) < current_season
+    return immutable
+
+
+def flatten_roster(data: dict, abbr: str, season: int) -> List[dict]:
+    # One row per player: renames variables, adds team and season
+    rows = []
+    for player in data.get('forwards', []) + data.get('defensemen', []) + data.get('goalies', []):
+        rows.append({
+            'team': abbr,
+            'id': player.get('id'),
+            'first_name': player.get('firstName', {}).get('default'),
+            'last_name': player.get('lastName', {}).get('default'),
+            'position': player.get('positionCode'),
+            'sweater': player.get('sweaterNumber'),
+            'shoots': player.get('shootsCatches'),
+            'birth_date': player.get('birthDate'),
+            'birth_city': player.get('birthCity', {}).get('default'),
+            'birth_province': player.get('birthStateProvince', {}).get('default') if 'birthStateProvince' in player else None,
+            'birth_country': player.get('birthCountry'),
+            'height_in': player.get('heightInInches'),
+            'weight_lb': player.get('weightInPounds'),
+            'headshot': player.get('headshot'),
+            'season': season
+        })
+    return rows
+
+
+# -----------------------------------------------------------------------
+# Pulls
+# -----------------------------------------------------------------------
+
+def fetch_teams(crawler: Crawler, base: str = STATS_API) -> List[dict]:
+    # All active and defunct NHL teams
+    result = crawler.fetch(f"{base}/team")
+    if not result.ok:
+        raise RuntimeError(f"Could not load the team list: {result.error}")
+    return result.data['data']
+
+
+@dataclass
+class RosterPartition:
+    # Flattened rows for one (season, team) plus the hash of the raw response
+    season: int
+    team: str
+    rows: List[dict]
+    digest: Optional[str] = None
+
+
+def iter_partitions(crawler: Crawler, plan: Iterable[Tuple[int, str]], base: str = WEB_API,
+                    index: Optional[FranchiseIndex] = None,
+                    verbose: bool = True) -> Iterator[Tuple[Tuple[int, str], Optional[int], Optional[RosterPartition]]]:
+    """Pull every planned (season, team) roster concurrently and flatten the players.
+
+    Yields (key, status, partition) as each request finishes; partition is
+    None for pairs that 404 or fail. Every definitive 200/404 answer is
+    recorded in `index` when one is given.
+    """
+    failures = 0
+
+    jobs = ((key, roster_url(key[1], key[0], base)) for key in plan)
+    for result in crawler.fetch_all(jobs):
+        season, abbr = result.key
+        if index is not None:
+            index.record(abbr, season, result.status)
+
+        partition = None
+        if result.ok:
+            partition = RosterPartition(season, abbr, flatten_roster(result.data, abbr, season), result.digest)
+            if verbose:
+                print(f"  ✅ Loaded {abbr} roster for {season}")
+        elif result.status != 404:
+            # A 404 just means the franchise didn't exist that season
+            failures += 1
+            print(f"  ⚠️ Failed to retrieve roster for {abbr} {season}: {result.error}")
+
+        yield result.key, result.status, partition
+
+    if failures:
+        print(f"⚠️ {failures} roster requests failed after retries")
+
+
+def crawl_partitions(crawler: Crawler, plan: Iterable[Tuple[int, str]], base: str = WEB_API,
+                     index: Optional[FranchiseIndex] = None,
+                     verbose: bool = True) -> Dict[Tuple[int, str], RosterPartition]:
+    # Every partition in memory, in plan order (season, then team, like the
+    # old serial loop) whatever order the requests finished in
+    plan = list(plan)
+    partitions = {key: partition for key, _, partition in iter_partitions(crawler, plan, base, index, verbose)
+                  if partition is not None}
+    return {key: partitions[key] for key in plan if key in partitions}
+
+
+def crawl_rosters(crawler: Crawler, plan: Iterable[Tuple[int, str]], base: str = WEB_API,
+                  index: Optional[FranchiseIndex] = None, verbose: bool = True) -> List[dict]:
+    # Same as crawl_partitions, flattened into one list of rows
+    partitions = crawl_partitions(crawler, plan, base, index, verbose)
+    return [row for partition in partitions.values() for row in partition.rows]
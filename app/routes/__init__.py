@@ -1 +1,7 @@
-from .core import core_routerfrom .deepdive import deepdive_routerfrom .dashboard import dashboard_router
\ No newline at end of file
+from .core import core_router
+from .deepdive import deepdive_router
+from .dashboard import dashboard_router
+from .lookup import lookup_router
+from .shots import shots_router
+from .metrics import metrics_router
+from .pages import DEEP_DIVES, PAGES, page_cache
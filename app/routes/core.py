@@ -1 +1,23 @@
-from fastapi import APIRouter, Requestfrom fastapi.responses import HTMLResponsefrom fastapi.templating import Jinja2Templates# Tell Jinja where to find the htmltemplates = Jinja2Templates(directory = "templates")core_router = APIRouter()# -----------------------------------------------------------------------# Route: Homepage ('/')# Loads templates/index.html# -----------------------------------------------------------------------@core_router.get("/", response_class=HTMLResponse)async def index(request: Request):    return templates.TemplateResponse("index.html", {"request": request})# -----------------------------------------------------------------------# Route: About Page ('/about')# Loads templates/about.html# -----------------------------------------------------------------------@core_router.get("/about", response_class=HTMLResponse)async def about(request: Request):    return templates.TemplateResponse("about.html", {"request": request})
\ No newline at end of file
+from fastapi import APIRouter, Request
+from fastapi.responses import HTMLResponse
+
+from .pages import page_cache
+
+core_router = APIRouter()
+
+# -----------------------------------------------------------------------
+# Route: Homepage ('/')
+# Loads templates/index.html
+# -----------------------------------------------------------------------
+
+@core_router.get("/", response_class=HTMLResponse)
+async def index(request: Request):
+    return page_cache.response(request, "index.html")
+
+# -----------------------------------------------------------------------
+# Route: About Page ('/about')
+# Loads templates/about.html
+# -----------------------------------------------------------------------
+@core_router.get("/about", response_class=HTMLResponse)
+async def about(request: Request):
+    return page_cache.response(request, "about.html")
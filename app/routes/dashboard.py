@@ -1 +1,34 @@
-from fastapi import APIRouter, Requestfrom fastapi.responses import HTMLResponsefrom fastapi.templating import Jinja2Templates# Tell Jinja where to find the htmltemplates = Jinja2Templates(directory = "templates")dashboard_router = APIRouter()# -----------------------------------------------------------------------# Route: Dashboard page ('/dashboard')# Loads templates/dashboard.html# -----------------------------------------------------------------------@dashboard_router.get("/dashboard", response_class = HTMLResponse)async def dashboard(request: Request):    return templates.TemplateResponse("dashboard.html", {"request": request})
\ No newline at end of file
+from fastapi import APIRouter, Request
+from fastapi.responses import HTMLResponse, StreamingResponse
+
+from app.live import live_poller
+
+# Same Jinja environment as the cached pages, so asset_url() is available
+from .pages import templates
+
+dashboard_router = APIRouter()
+
+
+# -----------------------------------------------------------------------
+# Route: Dashboard page ('/dashboard')
+# Loads templates/dashboard.html
+# -----------------------------------------------------------------------
+
+@dashboard_router.get("/dashboard", response_class = HTMLResponse)
+async def dashboard(request: Request):
+    return templates.TemplateResponse(request, "dashboard.html")
+
+# -----------------------------------------------------------------------
+# Route: Live games feed ('/dashboard/live')
+# Server-Sent Events from the shared live poller: a snapshot of today's
+# games on connect, then only what changed after each poll
+# -----------------------------------------------------------------------
+
+@dashboard_router.get("/dashboard/live")
+async def dashboard_live(request: Request):
+    return StreamingResponse(
+        live_poller.stream(request),
+        media_type = "text/event-stream",
+        # No caching, and no proxy buffering between polls
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
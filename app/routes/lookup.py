@@ -0,0 +1,65 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+
+from app.assets import cached_response
+from app.data import LookupDocument, roster_index
+from app.search import ORDERS, player_search
+
+lookup_router = APIRouter()
+
+
+# The document routes are plain functions, run in the threadpool: the
+# first request for a document in an encoding compresses it (brotli at
+# quality 11 takes milliseconds on a big roster), which would otherwise
+# hold up the event loop and every other request with it.
+
+def _document_response(request: Request, document: LookupDocument, what: str):
+    if document is None:
+        if not roster_index.loaded:
+            raise HTTPException(status_code=503, detail="Roster data isn't loaded.")
+        raise HTTPException(status_code=404, detail=f"{what} not found.")
+    return cached_response(request, document.body, document.encoded, "application/json", document.etag,
+                           headers = {"Cache-Control": "public, max-age=3600"})
+
+# -----------------------------------------------------------------------
+# Route: Player search ('/api/players/search?q=drai')
+# Autocomplete over every player's name, accent and typo tolerant, ranked
+# by career length or (order=recent) by last season. Declared before the
+# player lookup so "search" isn't taken for a player id.
+# -----------------------------------------------------------------------
+
+@lookup_router.get("/api/players/search")
+async def player_search_results(q: str, limit: int = 10, order: str = "career"):
+    if not player_search.loaded:
+        raise HTTPException(status_code=503, detail="Roster data isn't loaded.")
+    if order not in ORDERS:
+        raise HTTPException(status_code=422, detail=f"order must be one of {', '.join(ORDERS)}")
+    return Response(content = player_search.results_json(q, min(max(limit, 1), 50), order),
+                    media_type = "application/json", headers = {"Cache-Control": "public, max-age=3600"})
+
+# -----------------------------------------------------------------------
+# Route: Player lookup ('/api/players/{id}')
+# Bio, career summary and every team-season of one player
+# -----------------------------------------------------------------------
+
+@lookup_router.get("/api/players/{player_id}")
+def player(request: Request, player_id: int):
+    return _document_response(request, roster_index.player(player_id), "Player")
+
+# -----------------------------------------------------------------------
+# Route: Team lookup ('/api/teams/{abbr}/{season}')
+# One team's roster for one season, e.g. /api/teams/EDM/20242025
+# -----------------------------------------------------------------------
+
+@lookup_router.get("/api/teams/{abbr}/{season}")
+def team_season(request: Request, abbr: str, season: int):
+    return _document_response(request, roster_index.team(abbr, season), "Team season")
+
+# -----------------------------------------------------------------------
+# Route: Season lookup ('/api/seasons/{season}')
+# Every team that season with its roster size and average age and size
+# -----------------------------------------------------------------------
+
+@lookup_router.get("/api/seasons/{season}")
+def season(request: Request, season: int):
+    return _document_response(request, roster_index.season(season), "Season")
@@ -0,0 +1,79 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.data import roster_index
+from app.live import live_poller
+from app.metrics import app_metrics
+from app.shots.heatmaps import heatmap_cache
+from app.startup import startup_profile
+
+from .pages import page_cache
+
+metrics_router = APIRouter()
+
+
+# -----------------------------------------------------------------------
+# Cache and app metrics
+#
+# Read at scrape time from the stats each part of the app keeps anyway.
+# Every cache reports its lookups as hits (served from memory) or misses
+# (rendered, or for the lookup API's encodings compressed), plus what it
+# holds; the heatmap and lookup caches also count evictions.
+# -----------------------------------------------------------------------
+
+def _lookup_tables():
+    # The shared dataset's document tables (a built index has no encoding cache)
+    return {f"lookup_{name}": table for name, table in roster_index.tables().items() if hasattr(table, "hits")}
+
+
+def _cache_requests():
+    heatmaps = heatmap_cache.stats
+    counts = {
+        ("page", "hit"): page_cache.stats.hits,
+        ("page", "miss"): page_cache.stats.renders,
+        ("heatmap", "hit"): heatmaps.hits,
+        ("heatmap", "disk_hit"): heatmaps.disk_hits,
+        ("heatmap", "miss"): heatmaps.misses,
+    }
+    for cache, table in _lookup_tables().items():
+        counts[(cache, "hit")] = table.hits
+        counts[(cache, "miss")] = table.misses
+    return counts
+
+
+app_metrics.collected("cache_requests_total", "Cache lookups by cache and result.", "counter",
+                      _cache_requests, ("cache", "result"))
+app_metrics.collected("cache_render_seconds_total", "Time spent rendering what the caches missed.", "counter",
+                      lambda: {("page",): page_cache.stats.render_seconds,
+                               ("heatmap",): heatmap_cache.stats.render_seconds}, ("cache",))
+app_metrics.collected("cache_entries", "Entries held in memory.", "gauge",
+                      lambda: {("page",): len(page_cache), ("heatmap",): heatmap_cache.stats.entries}, ("cache",))
+app_metrics.collected("cache_bytes", "Bytes held in memory by the heatmap and lookup encoding caches.", "gauge",
+                      lambda: {("heatmap",): heatmap_cache.stats.bytes,
+                               **{(cache,): table.encoded_bytes for cache, table in _lookup_tables().items()}},
+                      ("cache",))
+app_metrics.collected("cache_evictions_total", "Entries evicted to stay under the memory budget.", "counter",
+                      lambda: {("heatmap",): heatmap_cache.stats.evictions,
+                               **{(cache,): table.evictions for cache, table in _lookup_tables().items()}},
+                      ("cache",))
+
+app_metrics.collected("live_polls_total", "Live poller cycles.", "counter", lambda: live_poller.stats.polls)
+app_metrics.collected("live_upstream_requests_total", "Requests made to the NHL API by the live poller.", "counter",
+                      lambda: live_poller.stats.upstream_requests)
+app_metrics.collected("live_upstream_errors_total", "Failed live poller requests.", "counter",
+                      lambda: live_poller.stats.upstream_errors)
+app_metrics.collected("live_subscribers", "Open live dashboard streams.", "gauge",
+                      lambda: len(live_poller.broadcaster))
+
+app_metrics.collected("app_startup_seconds", "Time this worker took to import and run each startup step.", "gauge",
+                      lambda: {(name,): seconds for name, seconds in startup_profile.steps.items()}, ("step",))
+
+# -----------------------------------------------------------------------
+# Route: Metrics ('/metrics')
+# Every metric above plus the request timings from TimingMiddleware, in
+# the Prometheus text format. Per worker process.
+# -----------------------------------------------------------------------
+
+@metrics_router.get("/metrics", include_in_schema = False)
+async def metrics():
+    return Response(content = app_metrics.render(), media_type = "text/plain; version=0.0.4; charset=utf-8")
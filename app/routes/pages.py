@@ -0,0 +1,199 @@
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.templating import Jinja2Templates
+from jinja2 import meta
+
+from app.assets import ASSET_MANIFEST, IMAGE_MANIFEST, asset_url, negotiated_response, picture, precompress, variant_etag
+
+# Tell Jinja where to find the html
+TEMPLATE_DIR = "templates"
+templates = Jinja2Templates(directory = TEMPLATE_DIR)
+
+# Static files are referenced through {{ asset_url("style.css") }} for their
+# fingerprinted URLs, and charts through {{ picture(src, alt) }} for AVIF/WebP srcsets
+templates.env.globals["asset_url"] = asset_url
+templates.env.globals["picture"] = picture
+
+
+# -----------------------------------------------------------------------
+# Page registry
+#
+# Every page that doesn't depend on the request (the home and about pages,
+# the deep-dive index and each deep-dive post) is listed here by URL path.
+# Deep-dive posts are discovered from templates/deep-dives/: dropping a new
+# <slug>.html in there publishes it at /deep-dives/<slug>.
+# -----------------------------------------------------------------------
+
+DEEP_DIVE_DIR = "deep-dives"
+
+
+def discover_deep_dives(template_dir: str = TEMPLATE_DIR) -> Dict[str, str]:
+    # slug -> template name, for every post template in templates/deep-dives
+    directory = os.path.join(template_dir, DEEP_DIVE_DIR)
+    return {
+        name[:-len(".html")]: f"{DEEP_DIVE_DIR}/{name}"
+        for name in sorted(os.listdir(directory))
+        if name.endswith(".html") and name != "index.html"
+    }
+
+
+DEEP_DIVES: Dict[str, str] = discover_deep_dives()
+
+PAGES: Dict[str, str] = {
+    "/": "index.html",
+    "/about": "about.html",
+    "/deep-dives": f"{DEEP_DIVE_DIR}/index.html",
+    **{f"/deep-dives/{slug}": template for slug, template in DEEP_DIVES.items()}
+}
+
+
+# -----------------------------------------------------------------------
+# Page cache
+#
+# Each page is rendered once (at startup, or on its first hit) and kept as
+# bytes with an ETag and Last-Modified, plus its brotli/gzip encodings, so
+# serving it is a dict lookup and a repeat visitor revalidating it gets an
+# empty 304. Last-Modified is the newest of everything the page is made
+# from (its template chain and the asset manifests), so a client checking
+# with If-Modified-Since sees a rebuilt stylesheet or an edited base
+# template too.
+# -----------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class RenderedPage:
+    template: str
+    body: bytes
+    etag: str
+    last_modified: str
+    mtime: int
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+    def etags(self) -> List[str]:
+        # The identity ETag and one per encoding, which are different bytes
+        return [variant_etag(self.etag, encoding) for encoding in [None, *self.encoded]]
+
+
+@dataclass
+class PageCacheStats:
+    hits: int = 0
+    renders: int = 0
+    not_modified: int = 0
+    render_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.renders
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self) -> str:
+        return (f"Page cache: {self.hits} hits, {self.renders} rendered ({self.hit_rate:.0%} cached), "
+                f"{self.not_modified} not modified")
+
+
+class PageCache:
+
+    def __init__(self, templates: Jinja2Templates, template_dir: str = TEMPLATE_DIR):
+        self.templates = templates
+        self.template_dir = template_dir
+        self.stats = PageCacheStats()
+        self._pages: Dict[str, RenderedPage] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def _sources(self, template: str) -> List[str]:
+        # Files the page is made from: its template, every template it extends,
+        # includes or imports (recursively) and the asset manifests that
+        # asset_url() and picture() read
+        env = self.templates.env
+        files, seen, pending = [], set(), [template]
+        while pending:
+            name = pending.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            source, filename, _ = env.loader.get_source(env, name)
+            files.append(filename)
+            pending.extend(ref for ref in meta.find_referenced_templates(env.parse(source)) if ref is not None)
+        return files + [path for path in (ASSET_MANIFEST, IMAGE_MANIFEST) if os.path.isfile(path)]
+
+    def _render(self, template: str) -> RenderedPage:
+        body = self.templates.get_template(template).render().encode("utf-8")
+        mtime = int(max(os.path.getmtime(path) for path in self._sources(template)))
+        return RenderedPage(
+            template = template,
+            body = body,
+            etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+            last_modified = formatdate(mtime, usegmt=True),
+            mtime = mtime,
+            encoded = precompress(body)
+        )
+
+    def get(self, template: str) -> RenderedPage:
+        page = self._pages.get(template)
+        if page is None:
+            with self._lock:
+                page = self._pages.get(template)
+                if page is None:
+                    start = time.perf_counter()
+                    page = self._pages[template] = self._render(template)
+                    self.stats.renders += 1
+                    self.stats.render_seconds += time.perf_counter() - start
+                    return page
+        self.stats.hits += 1
+        return page
+
+    def warm(self, templates: Optional[Iterable[str]] = None) -> int:
+        # Render `templates` (default: every registered page) ahead of the first request
+        names = PAGES.values() if templates is None else templates
+        for template in names:
+            self.get(template)
+        return len(self._pages)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pages.clear()
+
+    def response(self, request: Request, template: str) -> Response:
+        page = self.get(template)
+        headers = {
+            "Last-Modified": page.last_modified,
+            # Let browsers keep the page but check back; revalidating is a 304
+            "Cache-Control": "no-cache"
+        }
+        response = negotiated_response(request, page.body, page.encoded, "text/html", headers, etag = page.etag)
+        if _not_modified(request, page):
+            self.stats.not_modified += 1
+            return Response(status_code = 304, headers = {
+                name: value for name, value in response.headers.items()
+                if name not in ("content-length", "content-type", "content-encoding")
+            })
+        return response
+
+
+def _not_modified(request: Request, page: RenderedPage) -> bool:
+    # If-None-Match wins over If-Modified-Since when both are sent (RFC 9110)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(tag.removeprefix("W/") in page.etags() for tag in tags)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            return page.mtime <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+page_cache = PageCache(templates)
@@ -0,0 +1,54 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Request
+
+from app.shots.heatmaps import FORMATS, HeatmapQuery, heatmap_cache, shot_bins
+
+shots_router = APIRouter()
+
+
+def _split(value: Optional[str], cast = str) -> Optional[List]:
+    # "8478402,8477934" -> [8478402, 8477934]
+    if not value:
+        return None
+    try:
+        return [cast(item.strip()) for item in value.split(",") if item.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Invalid list: {value}")
+
+
+# -----------------------------------------------------------------------
+# Route: Shot heatmaps ('/api/shots/heatmap.json', '/api/shots/heatmap.png')
+# A density grid or rendered image for one or more players, summed over
+# the requested seasons and filtered by strength and shot type. Served
+# from the heatmap cache; only a query nobody has asked for yet touches
+# the shot bins. A plain def, so a render runs in the threadpool rather
+# than blocking the event loop.
+# -----------------------------------------------------------------------
+
+@shots_router.get("/api/shots/heatmap.{format}")
+def shot_heatmap(request: Request, format: str, players: str, seasons: Optional[str] = None,
+                 strength: Optional[str] = None, shot_type: Optional[str] = None,
+                 playoffs: bool = False, feet: int = 5):
+    if format not in FORMATS:
+        raise HTTPException(status_code=404, detail="Not found.")
+    try:
+        query = HeatmapQuery.create(
+            players = _split(players, int),
+            seasons = _split(seasons, int),
+            strengths = _split(strength),
+            shot_types = _split(shot_type),
+            game_types = [3] if playoffs else [2],
+            feet = feet,
+            format = format
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not query.players:
+        raise HTTPException(status_code=422, detail="No players given.")
+
+    try:
+        bins = shot_bins()
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="Shot data hasn't been ingested yet.")
+    return heatmap_cache.response(request, bins, query)
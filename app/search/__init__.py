@@ -0,0 +1 @@
+from .index import ORDERS, PlayerSearch, fold, player_search, trigrams
@@ -0,0 +1,77 @@
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.data import ROSTER_STORE, load_rosters
+
+from .index import PlayerSearch, fold
+
+
+# -----------------------------------------------------------------------
+# Search benchmark: python -m app.search [--log queries.txt]
+#
+# Replays a query log (one query per line) against the player search built
+# from the roster store and reports per-query latency. Without a log, one
+# is made up the way the search box gets used: players picked in
+# proportion to career length (people look up the well-known ones), typed
+# a keystroke at a time as "last" or "first last", with a typo in some and
+# the accents left off others.
+# -----------------------------------------------------------------------
+
+def _typo(word: str, rng: random.Random) -> str:
+    if len(word) < 4:
+        return word
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.choice(("drop", "swap", "replace"))
+    if kind == "drop":
+        return word[:i] + word[i + 1:]
+    if kind == "swap":
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + rng.choice("aeiounrst") + word[i + 1:]
+
+
+def synthetic_log(search: PlayerSearch, sessions: int = 2000, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    weights = [player['career_length'] for player in search.players]
+    queries = []
+    for player in rng.choices(search.players, weights=weights, k=sessions):
+        name = player['name'] if rng.random() < 0.3 else player['name'].split()[-1]
+        if rng.random() < 0.3:
+            name = fold(name)
+        if rng.random() < 0.15:
+            name = _typo(name, rng)
+        # Autocomplete fires from the second keystroke on
+        queries.extend(name[:length] for length in range(2, len(name) + 1))
+    return queries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark player search over a query log")
+    parser.add_argument("--log", help="query log, one query per line (default: a synthetic one)")
+    parser.add_argument("--store", default=ROSTER_STORE, help="roster store to index")
+    parser.add_argument("--order", default="career", choices=("career", "recent"))
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    search = PlayerSearch().build(load_rosters(store=args.store))
+    print(f"🔎 {len(search)} players indexed in {search.build_seconds:.2f}s")
+
+    if args.log:
+        with open(args.log, encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+    else:
+        queries = synthetic_log(search)
+
+    latencies = np.empty(len(queries))
+    empty = 0
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        results = search.search(query, args.limit, args.order)
+        latencies[i] = time.perf_counter() - start
+        empty += not results
+
+    ms = latencies * 1000
+    print(f"⏱  {len(queries)} queries: mean {ms.mean():.3f} ms, p50 {np.percentile(ms, 50):.3f} ms, "
+          f"p99 {np.percentile(ms, 99):.3f} ms, max {ms.max():.3f} ms ({empty} with no results)")
@@ -0,0 +1,348 @@
+import json
+import os
+import re
+import time
+import unicodedata
+from collections.abc import Sequence
+from functools import reduce
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+
+# -----------------------------------------------------------------------
+# Folding
+#
+# Names are matched lower-cased with accents stripped, so "Stützle",
+# "Stutzle" and "STUTZLE" are the same thing. Letters that don't
+# decompose into a base letter plus an accent are spelled out.
+# -----------------------------------------------------------------------
+
+_SPELLED_OUT = str.maketrans({"ø": "o", "æ": "ae", "œ": "oe", "ß": "ss", "ł": "l", "đ": "d", "ð": "d", "þ": "th",
+                              "ı": "i"})
+_SEPARATORS = re.compile(r"[^a-z0-9]+")
+
+
+def fold(text: str) -> str:
+    if text.isascii():
+        # Most names: nothing to decompose
+        return _SEPARATORS.sub(" ", text.lower()).strip()
+    decomposed = unicodedata.normalize("NFKD", text.lower().translate(_SPELLED_OUT))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _SEPARATORS.sub(" ", stripped).strip()
+
+
+def trigrams(token: str) -> List[str]:
+    # Padded so the start of a word counts for more: "oel" -> " oe", "oel", "el "
+    padded = f" {token} "
+    return sorted({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+# -----------------------------------------------------------------------
+# Player search
+#
+# Every distinct player, numbered in ranking order (longest career first),
+# is indexed two ways:
+#   prefix table  - every prefix of every name token ("c", "co", ...,
+#                   "mcdavid"), sorted, with the sorted array of players
+#                   having a token that starts with it. An autocomplete
+#                   query is a binary search per query token and an
+#                   intersection of the arrays at the end.
+#   trigram index - trigram -> the distinct tokens containing it. A query
+#                   token that isn't a prefix of anything (a typo) is
+#                   matched to tokens that share most of its trigrams.
+# Because players are numbered by rank, the best results of any match set
+# are simply its lowest numbers; recency ranking re-orders by last season.
+#
+# Everything is flat arrays (fixed-width byte strings for the keys, one
+# concatenated array plus offsets for each set of postings) and each
+# player's result is kept as its JSON, so the shared dataset publishes the
+# index as .npy files and every worker memory maps it instead of building
+# its own.
+# -----------------------------------------------------------------------
+
+ORDERS = ("career", "recent")
+
+# A typo'd token has to share this much (Jaccard) of its trigrams with a name token
+FUZZY_THRESHOLD = 0.35
+
+# Tokens shorter than this are only prefix-matched: trigrams of two letters say nothing
+FUZZY_MIN_LENGTH = 3
+
+_EMPTY = np.empty(0, dtype=np.int32)
+
+# What a player result carries, read from the careers table
+_CAREER_COLUMNS = ('id', 'first_name', 'last_name', 'position', 'first_season', 'last_season', 'career_length',
+                   'primary_team')
+
+# The arrays an index is made of, as saved
+_ARRAYS = ('bodies', 'body_offsets', 'recency', 'prefixes', 'prefix_offsets', 'prefix_players',
+           'token_offsets', 'token_players', 'token_trigrams', 'trigrams', 'trigram_offsets', 'trigram_tokens')
+
+
+def _postings(lists: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    # Lists of ids as one int32 array and the offsets of each list in it
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    np.cumsum([len(ids) for ids in lists], out=offsets[1:])
+    values = np.fromiter((i for ids in lists for i in ids), dtype=np.int32, count=int(offsets[-1]))
+    return values, offsets
+
+
+def _find(keys: np.ndarray, key: str) -> int:
+    # Row of `key` in a sorted byte-string array, or -1
+    encoded = key.encode("ascii")
+    if not len(keys) or len(encoded) > keys.dtype.itemsize:
+        return -1
+    row = int(np.searchsorted(keys, encoded))
+    return row if row < len(keys) and keys[row] == encoded else -1
+
+
+class _Players(Sequence):
+    """The players' result dicts in rank order, held as their JSON bodies
+    back to back and decoded on access."""
+
+    def __init__(self, bodies: np.ndarray, offsets: np.ndarray):
+        self.bodies = bodies
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def body(self, number: int) -> bytes:
+        return self.bodies[self.offsets[number]:self.offsets[number + 1]].tobytes()
+
+    def __getitem__(self, number: int) -> dict:
+        if number < 0:
+            number += len(self)
+        if not 0 <= number < len(self):
+            raise IndexError("player number out of range")
+        return json.loads(self.body(number))
+
+
+class PlayerSearch:
+
+    def __init__(self):
+        self.build_seconds = 0.0
+        self._set({name: np.empty(0, dtype=np.int32) for name in _ARRAYS})
+
+    def _set(self, arrays: Dict[str, np.ndarray]) -> None:
+        # Swaps in a whole index at once
+        if not len(arrays['body_offsets']):
+            arrays = {**arrays, 'body_offsets': np.zeros(1, dtype=np.int64)}
+        self._arrays = arrays
+        self.players = _Players(arrays['bodies'], arrays['body_offsets'])
+        self.recency = arrays['recency']    # players' positions in recency order
+        self._prefixes = arrays['prefixes']
+        self._prefix_offsets = arrays['prefix_offsets']
+        self._prefix_players = arrays['prefix_players']
+        self._token_offsets = arrays['token_offsets']
+        self._token_players = arrays['token_players']
+        self._token_trigrams = arrays['token_trigrams']
+        self._trigrams = arrays['trigrams']
+        self._trigram_offsets = arrays['trigram_offsets']
+        self._trigram_tokens = arrays['trigram_tokens']
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    @property
+    def loaded(self) -> bool:
+        return len(self.players) > 0
+
+    # -------------------------------------------------------------------
+    # Build
+    # -------------------------------------------------------------------
+
+    def build(self, roster: Optional["pd.DataFrame"] = None,
+              careers: Union["pd.DataFrame", "pa.Table", None] = None) -> "PlayerSearch":
+        """Index every distinct player in `careers` (or the careers built
+        from `roster`). `careers` can be a DataFrame or an Arrow table (the
+        shared dataset's), which is read without importing pandas. The new
+        index is swapped in whole."""
+        start = time.perf_counter()
+        if careers is None:
+            from app.data.careers import build_player_careers
+            careers = build_player_careers(roster)
+        # Plain column lists either way: Series.tolist() or ChunkedArray.to_pylist()
+        columns = [getattr(careers[name], "to_pylist", None) or careers[name].tolist for name in _CAREER_COLUMNS]
+        rows = list(zip(*(column() for column in columns)))
+        rows.sort(key=lambda row: (-row[6], -row[5], row[0]))
+
+        bodies, names, last_seasons = [], [], []
+        for player_id, first_name, last_name, position, first_season, last_season, career_length, team in rows:
+            name = " ".join(part for part in (first_name, last_name) if isinstance(part, str))
+            bodies.append(json.dumps({
+                'id': int(player_id),
+                'name': name,
+                'position': position if isinstance(position, str) else None,
+                'team': team if isinstance(team, str) else None,
+                'first_season': int(first_season),
+                'last_season': int(last_season),
+                'career_length': int(career_length)
+            }, separators=(',', ':')).encode("utf-8"))
+            names.append(name)
+            last_seasons.append(int(last_season))
+
+        prefix_players: Dict[str, List[int]] = {}
+        token_ids: Dict[str, int] = {}
+        token_players: List[List[int]] = []
+        for number, name in enumerate(names):
+            for token in set(fold(name).split()):
+                for end in range(1, len(token) + 1):
+                    players = prefix_players.setdefault(token[:end], [])
+                    # "Jean-Jacques" has the "j" prefix twice; list the player once
+                    if not players or players[-1] != number:
+                        players.append(number)
+                if token not in token_ids:
+                    token_ids[token] = len(token_players)
+                    token_players.append([])
+                token_players[token_ids[token]].append(number)
+
+        # Players were added in rank order, so every list is already sorted
+        prefixes = sorted(prefix_players)
+        tokens = list(token_ids)
+        postings: Dict[str, List[int]] = {}
+        for token_id, token in enumerate(tokens):
+            for gram in trigrams(token):
+                postings.setdefault(gram, []).append(token_id)
+        grams = sorted(postings)
+
+        recency_order = sorted(range(len(names)), key=lambda n: (-last_seasons[n], n))
+        recency = np.empty(len(names), dtype=np.int32)
+        recency[recency_order] = np.arange(len(names), dtype=np.int32)
+
+        body_offsets = np.zeros(len(bodies) + 1, dtype=np.int64)
+        np.cumsum([len(body) for body in bodies], out=body_offsets[1:])
+        arrays = {
+            'bodies': np.frombuffer(b"".join(bodies), dtype=np.uint8),
+            'body_offsets': body_offsets,
+            'recency': recency,
+            'prefixes': np.array([prefix.encode("ascii") for prefix in prefixes], dtype=bytes),
+            'token_trigrams': np.array([len(trigrams(token)) for token in tokens], dtype=np.int32),
+            'trigrams': np.array([gram.encode("ascii") for gram in grams], dtype=bytes)
+        }
+        arrays['prefix_players'], arrays['prefix_offsets'] = _postings([prefix_players[p] for p in prefixes])
+        arrays['token_players'], arrays['token_offsets'] = _postings(token_players)
+        arrays['trigram_tokens'], arrays['trigram_offsets'] = _postings([postings[gram] for gram in grams])
+        self._set(arrays)
+        self.build_seconds = time.perf_counter() - start
+        return self
+
+    # -------------------------------------------------------------------
+    # Persist and load
+    # -------------------------------------------------------------------
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), self._arrays[name])
+
+    def load(self, directory: str) -> "PlayerSearch":
+        # Memory mapped: the pages are shared with every other process mapping them
+        if not os.path.isdir(directory):
+            raise FileNotFoundError(f"No player search index at {directory}")
+        self._set({name: np.asarray(np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r"))
+                   for name in _ARRAYS})
+        return self
+
+    def attach(self, dataset) -> "PlayerSearch":
+        # Serve the index a SharedDataset published instead of building it
+        return self.load(os.path.join(dataset.directory, "search"))
+
+    # -------------------------------------------------------------------
+    # Matching
+    # -------------------------------------------------------------------
+
+    def _prefix(self, token: str) -> np.ndarray:
+        row = _find(self._prefixes, token)
+        if row < 0:
+            return _EMPTY
+        return self._prefix_players[self._prefix_offsets[row]:self._prefix_offsets[row + 1]]
+
+    def _fuzzy(self, token: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Players with a name token similar to `token`, and the best
+        similarity (trigram Jaccard) each of them reached."""
+        rows = [row for row in (_find(self._trigrams, gram) for gram in trigrams(token)) if row >= 0]
+        if len(token) < FUZZY_MIN_LENGTH or not rows:
+            return _EMPTY, np.empty(0)
+        offsets = self._trigram_offsets
+        shared = np.bincount(np.concatenate([self._trigram_tokens[offsets[row]:offsets[row + 1]] for row in rows]),
+                             minlength=len(self._token_trigrams))
+        candidates = np.flatnonzero(shared)
+        similarity = shared[candidates] / (len(trigrams(token)) + self._token_trigrams[candidates] - shared[candidates])
+        keep = similarity >= FUZZY_THRESHOLD
+        candidates, similarity = candidates[keep], similarity[keep]
+        if not len(candidates):
+            return _EMPTY, np.empty(0)
+
+        best: Dict[int, float] = {}
+        offsets = self._token_offsets
+        for token_id, score in zip(candidates.tolist(), similarity.tolist()):
+            for player in self._token_players[offsets[token_id]:offsets[token_id + 1]].tolist():
+                if score > best.get(player, 0.0):
+                    best[player] = score
+        players = np.fromiter(best, dtype=np.int32, count=len(best))
+        return players, np.fromiter(best.values(), dtype=np.float64, count=len(best))
+
+    def _top(self, players: np.ndarray, limit: int, order: str) -> List[int]:
+        # Sorted by career rank already; recency needs the k best of another key
+        if order == "career" or len(players) == 0:
+            return players[:limit].tolist()
+        keys = self.recency[players]
+        if len(players) > limit:
+            best = np.argpartition(keys, limit - 1)[:limit]
+            players, keys = players[best], keys[best]
+        return players[np.argsort(keys, kind="stable")].tolist()
+
+    def _numbers(self, query: str, limit: int, order: str) -> List[int]:
+        # The numbers of the players search() returns
+        if order not in ORDERS:
+            raise ValueError(f"order must be one of {', '.join(ORDERS)}")
+        tokens = fold(query).split()
+        if not tokens or limit <= 0:
+            return []
+
+        exact = reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), map(self._prefix, tokens))
+        numbers = self._top(exact, limit, order)
+
+        if len(numbers) < limit:
+            # Each token matches by prefix (a perfect score) or by trigram similarity
+            scores: Optional[Dict[int, float]] = None
+            for token in tokens:
+                token_scores = dict.fromkeys(self._prefix(token).tolist(), 1.0)
+                fuzzy_players, fuzzy_scores = self._fuzzy(token)
+                for player, score in zip(fuzzy_players.tolist(), fuzzy_scores.tolist()):
+                    if score > token_scores.get(player, 0.0):
+                        token_scores[player] = score
+                scores = token_scores if scores is None else {
+                    player: score + token_scores[player] for player, score in scores.items() if player in token_scores
+                }
+                if not scores:
+                    break
+            seen = set(numbers)
+            recent = order == "recent"
+            fuzzy = sorted((player for player in scores or () if player not in seen),
+                           key=lambda player: (-scores[player], self.recency[player] if recent else player))
+            numbers += fuzzy[:limit - len(numbers)]
+
+        return numbers
+
+    def search(self, query: str, limit: int = 10, order: str = "career") -> List[dict]:
+        """Players matching `query` as you type it: every query token must
+        start one of the player's name tokens. If that finds fewer than
+        `limit` players, typo matches are added after them, closest first.
+        Within each group players are ranked by career length or, with
+        order="recent", by their last season."""
+        return [self.players[number] for number in self._numbers(query, limit, order)]
+
+    def results_json(self, query: str, limit: int = 10, order: str = "career") -> bytes:
+        # The stored JSON of each result, without decoding it
+        return b"[" + b",".join(self.players.body(number) for number in self._numbers(query, limit, order)) + b"]"
+
+
+# The app's player search, attached at startup alongside the roster index
+player_search = PlayerSearch()
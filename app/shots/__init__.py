@@ -0,0 +1,8 @@
+from app.startup.lazy import lazy_exports
+
+# The event store (pandas, pyarrow) is only imported by the ingest
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    'store': ['GRID_FEET', 'GRID_SHAPE', 'SHOT_BINS', 'SHOT_STORE', 'ShotBins', 'coarsen'],
+    'events': ['SHOT_SCHEMA', 'load_shots', 'write_shot_store'],
+    'heatmaps': ['HEATMAP_CACHE', 'CachedHeatmap', 'HeatmapCache', 'HeatmapQuery', 'heatmap_cache', 'shot_bins'],
+})
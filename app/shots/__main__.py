@@ -0,0 +1,70 @@
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from app.nhl import Crawler, FranchiseIndex, ResponseCache, fetch_teams, season_range
+from app.nhl import rosters as nhl_rosters
+from app.nhl.games import fetch_game_ids, historical_games_immutable, iter_game_shots
+
+from .events import SHOT_SCHEMA, load_shots, write_shot_store
+from .store import SHOT_BINS, SHOT_STORE, ShotBins
+
+
+# Shot coordinates are recorded from 2010-11 on
+FIRST_SHOT_YEAR = 2010
+
+
+# -----------------------------------------------------------------------
+# Offline shot ingest: python -m app.shots
+#
+# Pulls every game's play-by-play for the requested seasons, rewrites those
+# seasons' partitions of the shot event store, then rebuilds the pre-binned
+# store the heatmap explorer reads from the whole event store.
+# -----------------------------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingest NHL shot locations into the pre-binned heatmap store")
+    parser.add_argument("--first-year", type=int, default=FIRST_SHOT_YEAR, help="Start year of the first season")
+    parser.add_argument("--last-year", type=int, default=2024, help="Start year of the last season")
+    parser.add_argument("--rate", type=float, default=10.0, help="Max requests per second")
+    parser.add_argument("--workers", type=int, default=16, help="Worker threads")
+    parser.add_argument("--bins-only", action="store_true", help="Rebuild the bins from the event store without crawling")
+    parser.add_argument("--offline", action="store_true", help="Use the HTTP cache only")
+    parser.add_argument("--stats-api", default=nhl_rosters.STATS_API, help="Override the stats API base URL")
+    parser.add_argument("--web-api", default=nhl_rosters.WEB_API, help="Override the web API base URL")
+    args = parser.parse_args()
+
+    if not args.bins_only:
+        current_season = season_range(args.last_year, args.last_year)[0]
+        cache = ResponseCache(os.path.join("data", "http_cache"),
+                              immutable=historical_games_immutable(current_season), offline=args.offline)
+        crawler = Crawler(rate=args.rate, max_workers=args.workers, cache=cache)
+
+        # The roster crawl's franchise index knows which teams played when
+        teams = [team['triCode'] for team in fetch_teams(crawler, base=args.stats_api)]
+        index = FranchiseIndex(os.path.join("data", "nhl-player-demographics", "franchise_index.json"))
+        new_teams = [abbr for abbr in teams if abbr not in index.teams]
+        if new_teams:
+            index.seed_from_metadata(crawler, new_teams, base=args.web_api)
+            index.save()
+        seasons = season_range(args.first_year, args.last_year)
+        plan = index.plan(teams, seasons)
+
+        # One season at a time, so memory holds a season of shots at most
+        for season in seasons:
+            print(f"🏒 {season}")
+            game_ids = fetch_game_ids(crawler, [key for key in plan if key[0] == season], base=args.web_api)
+            rows = [row for _, game_rows in iter_game_shots(crawler, game_ids, base=args.web_api, verbose=False)
+                    for row in game_rows]
+            shots = pd.DataFrame(rows, columns=SHOT_SCHEMA.names + ['season'])
+            write_shot_store(shots, SHOT_STORE, seasons=[season])
+            print(f"  ✅ {len(shots)} shots from {len(game_ids)} games")
+        print(cache.stats.report())
+
+    start = time.perf_counter()
+    bins = ShotBins.from_shots(load_shots())
+    bins.save(SHOT_BINS)
+    print(f"🗂  {len(bins)} player-season grids, {len(bins.cell)} binned cells "
+          f"({time.perf_counter() - start:.1f}s)")
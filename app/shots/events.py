@@ -0,0 +1,77 @@
+import os
+import shutil
+from typing import Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from app.data.store import SEASON_PARTITIONING
+
+from .store import SHOT_STORE
+
+
+# -----------------------------------------------------------------------
+# Event store
+#
+# Every shot attempt since coordinates were first recorded, one row each,
+# in the same season-partitioned Parquet layout as the roster store. It's
+# the source of truth the bins are built from; the site never reads it.
+# -----------------------------------------------------------------------
+
+SHOT_SCHEMA = pa.schema([
+    ('game_id', pa.int32()),
+    ('game_type', pa.int8()),
+    ('period', pa.int8()),
+    ('player_id', pa.int32()),
+    ('team_id', pa.int16()),
+    ('event', pa.dictionary(pa.int8(), pa.string())),
+    ('shot_type', pa.dictionary(pa.int8(), pa.string())),
+    ('strength', pa.dictionary(pa.int8(), pa.string())),
+    ('x', pa.int16()),
+    ('y', pa.int16()),
+])
+
+
+def write_shot_store(shots_df: pd.DataFrame, store: str = SHOT_STORE,
+                     seasons: Optional[Iterable[int]] = None) -> List[int]:
+    """Write flattened shot rows to the season-partitioned Parquet store.
+
+    Like write_roster_store: with `seasons` only those partitions are
+    (re)written, otherwise the whole store is rebuilt, and each partition
+    is swapped in whole. Returns the seasons written.
+    """
+    if seasons is None:
+        shutil.rmtree(store, ignore_errors=True)
+        seasons = shots_df['season'].unique() if len(shots_df) else []
+
+    written = []
+    for season in sorted(int(s) for s in seasons):
+        partition_dir = os.path.join(store, f"season={season}")
+        season_df = shots_df[shots_df['season'] == season]
+        if season_df.empty:
+            shutil.rmtree(partition_dir, ignore_errors=True)
+            continue
+
+        os.makedirs(partition_dir, exist_ok=True)
+        path = os.path.join(partition_dir, "part-0.parquet")
+        table = pa.Table.from_pandas(season_df[SHOT_SCHEMA.names].sort_values(['player_id', 'game_id']),
+                                     schema=SHOT_SCHEMA, preserve_index=False)
+        pq.write_table(table, f"{path}.tmp", compression="zstd")
+        os.replace(f"{path}.tmp", path)
+        written.append(season)
+    return written
+
+
+def load_shots(columns: Optional[List[str]] = None, seasons: Optional[Iterable[int]] = None,
+               store: str = SHOT_STORE) -> pd.DataFrame:
+    # Shot rows from the Parquet store; `season` is always included
+    if not os.path.isdir(store):
+        raise FileNotFoundError(f"No shot store at {store}; run python -m app.shots first")
+
+    dataset = ds.dataset(store, format="parquet", partitioning=SEASON_PARTITIONING)
+    if columns is not None:
+        columns = list(dict.fromkeys(['season'] + list(columns)))
+    row_filter = ds.field('season').isin([int(s) for s in seasons]) if seasons is not None else None
+    return dataset.to_table(columns=columns, filter=row_filter).to_pandas()
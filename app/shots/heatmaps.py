@@ -0,0 +1,337 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.assets import cached_response, precompress
+
+from .store import GRID_X, GRID_Y, SHOT_BINS, SHOT_DIR, ShotBins
+
+
+# Second (on-disk) tier of the app's heatmap cache
+HEATMAP_CACHE = os.path.join(SHOT_DIR, "heatmap_cache")
+
+# Heatmap resolutions on offer, in feet per cell; anything else would only
+# spread the cache over near-identical maps
+RESOLUTIONS = (1, 2, 5, 10)
+
+FORMATS = {"json": "application/json", "png": "image/png"}
+
+# Most players and seasons one map may combine. Every combination is its own
+# cache entry, so unbounded lists would let a client mint them without end
+MAX_PLAYERS = 20
+MAX_SEASONS = 40
+
+
+# -----------------------------------------------------------------------
+# Queries
+#
+# A query is normalized before it's used as a key - players and seasons
+# sorted and deduplicated, empty filters dropped - so the same map asked
+# for in a different order is the same cache entry.
+# -----------------------------------------------------------------------
+
+def _normalized(values: Optional[Iterable]) -> Optional[tuple]:
+    if values is None:
+        return None
+    values = tuple(sorted(set(values)))
+    return values or None
+
+
+@dataclass(frozen=True)
+class HeatmapQuery:
+    players: Tuple[int, ...]
+    seasons: Optional[Tuple[int, ...]] = None      # None: every season
+    strengths: Optional[Tuple[str, ...]] = None    # None: every strength
+    shot_types: Optional[Tuple[str, ...]] = None   # None: every shot type
+    game_types: Tuple[int, ...] = (2,)
+    feet: int = 5
+    format: str = "json"
+
+    @classmethod
+    def create(cls, players: Iterable[int], seasons: Optional[Iterable[int]] = None,
+               strengths: Optional[Iterable[str]] = None, shot_types: Optional[Iterable[str]] = None,
+               game_types: Iterable[int] = (2,), feet: int = 5, format: str = "json") -> "HeatmapQuery":
+        if feet not in RESOLUTIONS:
+            raise ValueError(f"Resolution must be one of {RESOLUTIONS} feet")
+        if format not in FORMATS:
+            raise ValueError(f"Format must be one of {', '.join(FORMATS)}")
+        players, seasons = _normalized(players) or (), _normalized(seasons)
+        if len(players) > MAX_PLAYERS:
+            raise ValueError(f"At most {MAX_PLAYERS} players per map")
+        if seasons is not None and len(seasons) > MAX_SEASONS:
+            raise ValueError(f"At most {MAX_SEASONS} seasons per map")
+        return cls(players, seasons, _normalized(strengths), _normalized(shot_types),
+                   _normalized(game_types) or (2,), feet, format)
+
+    def key(self, version: str) -> str:
+        # Cache key; `version` is the shot bins' content hash, so a rebuild never serves stale maps
+        fields = ", ".join(f"{name}={value}" for name, value in self.__dict__.items())
+        return f"{version}: {fields}"
+
+
+# -----------------------------------------------------------------------
+# Rendering
+# -----------------------------------------------------------------------
+
+def heatmap_grid(bins: ShotBins, query: HeatmapQuery) -> np.ndarray:
+    return bins.heatmap(query.players, query.seasons, query.game_types,
+                        shot_types=query.shot_types, strengths=query.strengths, feet=query.feet)
+
+
+def render_json(grid: np.ndarray, query: HeatmapQuery) -> bytes:
+    # Rows run across the rink (y), columns along it (x, toward the net)
+    payload = {
+        "feet": query.feet,
+        "x": list(GRID_X),
+        "y": list(GRID_Y),
+        "shots": int(grid.sum()),
+        "max": int(grid.max()) if grid.size else 0,
+        "grid": grid.tolist()
+    }
+    return json.dumps(payload, separators=(',', ':')).encode("utf-8")
+
+
+def render_png(grid: np.ndarray, query: HeatmapQuery) -> bytes:
+    # The object-oriented API rather than pyplot: no global figure state, so
+    # renders can run concurrently from the server's threads
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(5, 4.3), dpi=100)
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes((0, 0, 1, 1))
+    extent = (GRID_X[0], GRID_X[0] + grid.shape[1] * query.feet, GRID_Y[0], GRID_Y[0] + grid.shape[0] * query.feet)
+    ax.imshow(np.ma.masked_equal(grid, 0), origin="lower", extent=extent, cmap="inferno_r",
+              interpolation="nearest" if query.feet > 2 else "bilinear")
+    # Blue line, goal line and net, for orientation
+    ax.axvline(25, color="#1f4e99", linewidth=2)
+    ax.axvline(89, color="#c8102e", linewidth=1)
+    ax.plot([89, 93, 93, 89], [-3, -3, 3, 3], color="#c8102e", linewidth=1)
+    ax.set_xlim(GRID_X)
+    ax.set_ylim(GRID_Y)
+    ax.set_axis_off()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    return buffer.getvalue()
+
+
+RENDERERS: Dict[str, Callable[[np.ndarray, HeatmapQuery], bytes]] = {"json": render_json, "png": render_png}
+
+
+# -----------------------------------------------------------------------
+# Cache
+#
+# Rendered maps are kept in memory in least-recently-used order, up to
+# `max_bytes` of bodies (and their precompressed variants); the oldest are
+# evicted to make room. With a `root` directory every render is also
+# written to disk, so an evicted map - or one rendered before a restart, or
+# by another worker - is read back instead of re-rendered. The disk tier
+# has a budget of its own, `max_disk_bytes`: past it the least recently
+# used files are deleted (a disk hit touches its file), down to three
+# quarters of the budget so the next prune is a while off. Maps cached for
+# old shot bins are never read again, so they're the first to go.
+# -----------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class CachedHeatmap:
+    body: bytes
+    media_type: str
+    etag: str
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(data) for data in self.encoded.values())
+
+    @classmethod
+    def create(cls, body: bytes, media_type: str) -> "CachedHeatmap":
+        # PNGs are compressed already; only the JSON grids get brotli/gzip variants
+        encoded = precompress(body) if media_type == FORMATS["json"] else {}
+        return cls(body, media_type, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"', encoded)
+
+
+@dataclass
+class HeatmapCacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    disk_evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+    render_seconds: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def report(self) -> str:
+        return (f"Heatmap cache: {self.hits} hits, {self.disk_hits} from disk, {self.misses} rendered "
+                f"({self.hit_rate:.0%} cached), {self.evictions} evicted, {self.entries} entries "
+                f"({self.bytes / 1e6:.1f} MB), {self.disk_evictions} deleted from disk")
+
+
+class HeatmapCache:
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, root: Optional[str] = None,
+                 max_disk_bytes: int = 1024 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.root = root
+        self.max_disk_bytes = max_disk_bytes
+        self.stats = HeatmapCacheStats()
+        self._entries: "OrderedDict[str, CachedHeatmap]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None  # counted on the first write
+        self._disk_lock = threading.Lock()
+
+    def _path(self, key: str, media_type: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        extension = next(name for name, media in FORMATS.items() if media == media_type)
+        return os.path.join(self.root, digest[:2], f"{digest}.{extension}")
+
+    def _insert(self, key: str, entry: CachedHeatmap) -> None:
+        # Caller holds the lock
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.stats.bytes -= previous.size
+        self._entries[key] = entry
+        self.stats.bytes += entry.size
+        while self.stats.bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.stats.bytes -= evicted.size
+            self.stats.evictions += 1
+        self.stats.entries = len(self._entries)
+
+    def get(self, key: str, media_type: str) -> Optional[CachedHeatmap]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return entry
+
+        if self.root is not None:
+            path = self._path(key, media_type)
+            try:
+                with open(path, "rb") as f:
+                    entry = CachedHeatmap.create(f.read(), media_type)
+                os.utime(path)
+            except FileNotFoundError:  # never written, or pruned (by this or another worker)
+                entry = None
+            if entry is not None:
+                with self._lock:
+                    self._insert(key, entry)
+                    self.stats.disk_hits += 1
+                return entry
+        return None
+
+    def put(self, key: str, entry: CachedHeatmap) -> None:
+        with self._lock:
+            self._insert(key, entry)
+        if self.root is not None:
+            path = self._path(key, entry.media_type)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(entry.body)
+            os.replace(tmp_path, path)
+            with self._disk_lock:
+                if self._disk_bytes is None:
+                    self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+                else:
+                    self._disk_bytes += len(entry.body)
+                if self._disk_bytes > self.max_disk_bytes:
+                    self._prune_disk()
+
+    def _disk_files(self) -> List[Tuple[float, int, str]]:
+        # (last used, size, path) of every cached map on disk
+        files = []
+        for root, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _prune_disk(self) -> None:
+        # Caller holds the disk lock. Sizes are re-read from disk, since other
+        # workers write to (and prune) the same directory.
+        files = sorted(self._disk_files())
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_disk_bytes * 3 // 4:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.stats.disk_evictions += 1
+        self._disk_bytes = total
+
+    def clear(self) -> None:
+        # Memory tier only; the disk tier is keyed by bins version, and maps
+        # for old bins age out of its budget
+        with self._lock:
+            self._entries.clear()
+            self.stats.bytes = self.stats.entries = 0
+
+    def heatmap(self, bins: ShotBins, query: HeatmapQuery) -> CachedHeatmap:
+        """The rendered map for `query`, from memory, then disk, and only
+        rendered (and cached) if neither has it."""
+        key = query.key(bins.version)
+        media_type = FORMATS[query.format]
+        entry = self.get(key, media_type)
+        if entry is None:
+            start = time.perf_counter()
+            entry = CachedHeatmap.create(RENDERERS[query.format](heatmap_grid(bins, query), query), media_type)
+            with self._lock:
+                self.stats.misses += 1
+                self.stats.render_seconds += time.perf_counter() - start
+            self.put(key, entry)
+        return entry
+
+    def response(self, request: Request, bins: ShotBins, query: HeatmapQuery) -> Response:
+        entry = self.heatmap(bins, query)
+        return cached_response(request, entry.body, entry.encoded, entry.media_type, entry.etag,
+                               headers = {"Cache-Control": "public, max-age=3600"})
+
+
+_bins: Dict[str, Tuple[tuple, ShotBins]] = {}
+_bins_lock = threading.Lock()
+
+
+def shot_bins(directory: str = SHOT_BINS) -> ShotBins:
+    """The shot bins, loaded (memory mapped) on first use and again after
+    python -m app.shots swaps in new ones. That rewrites meta.json, so a
+    stat of it per call is enough to notice; heatmaps cached for the old
+    bins are keyed by their version and never served for the new ones."""
+    try:
+        stat = os.stat(os.path.join(directory, "meta.json"))
+    except FileNotFoundError:
+        raise FileNotFoundError(f"No shot bins at {directory}; run python -m app.shots first")
+    signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    with _bins_lock:
+        loaded = _bins.get(directory)
+        if loaded is None or loaded[0] != signature:
+            loaded = _bins[directory] = (signature, ShotBins.load(directory))
+    return loaded[1]
+
+
+# The app's heatmap cache
+heatmap_cache = HeatmapCache(root=HEATMAP_CACHE)
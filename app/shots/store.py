@@ -0,0 +1,253 @@
+import hashlib
+import json
+import os
+import shutil
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Project-relative locations of the shot data
+SHOT_DIR = os.path.join("data", "shots")
+SHOT_STORE = os.path.join(SHOT_DIR, "events")
+SHOT_BINS = os.path.join(SHOT_DIR, "bins")
+
+
+# -----------------------------------------------------------------------
+# Rink grid
+#
+# Shots are binned on a 1 ft grid over the attacking half of the rink
+# (x 0 to 100 ft from centre ice, y -43 to 43 ft across it); the odd shot
+# from the far side of the red line lands in the first column. Coarser
+# heatmaps are whole multiples of that grid, so they're sums of blocks.
+# -----------------------------------------------------------------------
+
+GRID_FEET = 1
+GRID_X = (0, 100)
+GRID_Y = (-43, 43)
+GRID_SHAPE = ((GRID_Y[1] - GRID_Y[0]) // GRID_FEET, (GRID_X[1] - GRID_X[0]) // GRID_FEET)  # (rows, columns)
+
+# Filterable categories, stored as small integer codes
+CATEGORIES = ('event', 'shot_type', 'strength')
+
+
+def grid_cells(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    # Flat grid cell (row * columns + column) of each shot
+    rows, columns = GRID_SHAPE
+    column = np.clip((np.asarray(x) - GRID_X[0]) // GRID_FEET, 0, columns - 1)
+    row = np.clip((np.asarray(y) - GRID_Y[0]) // GRID_FEET, 0, rows - 1)
+    return (row * columns + column).astype(np.uint16)
+
+
+def coarsen(grid: np.ndarray, feet: int) -> np.ndarray:
+    """A base-resolution grid summed into `feet` x `feet` blocks (the last
+    row and column of blocks may cover less of the rink)."""
+    factor = max(1, int(round(feet / GRID_FEET)))
+    if factor == 1:
+        return grid
+    rows, columns = grid.shape
+    padded = np.zeros((-(-rows // factor) * factor, -(-columns // factor) * factor), dtype=grid.dtype)
+    padded[:rows, :columns] = grid
+    return padded.reshape(padded.shape[0] // factor, factor, padded.shape[1] // factor, factor).sum(axis=(1, 3))
+
+
+# -----------------------------------------------------------------------
+# Pre-binned store
+#
+# Shot counts per grid cell for every (player, season, game type), laid out
+# like a sparse matrix: `keys` lists the (player, season, game type) triples
+# in sorted order and key i owns entries offsets[i]:offsets[i+1] of the
+# cell / count / category columns, one entry per non-empty (cell, event,
+# shot type, strength). A key's dense grid is a bincount of its entries,
+# and any query - several seasons, several players, filtered or not - is
+# the same bincount over the union of their slices. Nothing is grouped or
+# scanned per request, and the files are memory mapped, so workers share
+# the pages.
+# -----------------------------------------------------------------------
+
+ShotKey = Tuple[int, int, int]  # (player id, season, game type)
+
+_ARRAYS = ('keys', 'offsets', 'cell', 'count') + CATEGORIES
+
+
+class ShotBins:
+
+    def __init__(self, keys: np.ndarray, offsets: np.ndarray, cell: np.ndarray, count: np.ndarray,
+                 categories: Dict[str, np.ndarray], vocabularies: Dict[str, List[str]],
+                 version: Optional[str] = None):
+        self.keys = keys
+        self.offsets = offsets
+        self.cell = cell
+        self.count = count
+        self.categories = categories
+        self.vocabularies = vocabularies
+        # Content hash: anything derived from the bins (cached heatmaps) is keyed on it
+        self.version = version or self._digest()
+        self._codes = {name: {value: code for code, value in enumerate(values)}
+                       for name, values in vocabularies.items()}
+
+        # Hash indexes over the sorted keys
+        self._index: Dict[ShotKey, int] = {key: i for i, key in enumerate(map(tuple, keys.tolist()))}
+        self._by_player: Dict[int, np.ndarray] = {}
+        if len(keys):
+            players, starts = np.unique(keys[:, 0], return_index=True)
+            for player, start, end in zip(players.tolist(), starts, np.append(starts[1:], len(keys))):
+                self._by_player[player] = np.arange(start, end)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: ShotKey) -> bool:
+        return tuple(key) in self._index
+
+    def _digest(self) -> str:
+        digest = hashlib.blake2b(json.dumps(self.vocabularies, sort_keys=True).encode("utf-8"), digest_size=8)
+        for array in (self.keys, self.offsets, self.cell, self.count, *self.categories.values()):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+
+    @property
+    def players(self) -> List[int]:
+        return list(self._by_player)
+
+    def seasons(self, player: int) -> List[int]:
+        rows = self._by_player.get(player)
+        return sorted(set(self.keys[rows, 1].tolist())) if rows is not None else []
+
+    # -------------------------------------------------------------------
+    # Build
+    # -------------------------------------------------------------------
+
+    @classmethod
+    def from_shots(cls, shots_df: "pd.DataFrame") -> "ShotBins":
+        """Aggregate flattened shot rows (as stored by write_shot_store) into
+        per-key grid counts."""
+        # Only the ingest builds bins; the server just loads them
+        import pandas as pd
+
+        frame = pd.DataFrame({
+            'player_id': shots_df['player_id'].to_numpy(np.int32),
+            'season': shots_df['season'].to_numpy(np.int32),
+            'game_type': shots_df['game_type'].to_numpy(np.int32),
+            'cell': grid_cells(shots_df['x'].to_numpy(np.float64), shots_df['y'].to_numpy(np.float64)),
+        })
+        vocabularies = {}
+        for name in CATEGORIES:
+            values = shots_df[name].astype('category')
+            vocabularies[name] = [str(value) for value in values.cat.categories]
+            frame[name] = values.cat.codes.to_numpy(np.int8)  # -1 where unknown
+
+        group = ['player_id', 'season', 'game_type', 'cell', *CATEGORIES]
+        counts = frame.groupby(group, sort=True).size().rename('count').reset_index()
+        keys, starts = np.unique(counts[['player_id', 'season', 'game_type']].to_numpy(np.int32),
+                                 axis=0, return_index=True)
+        return cls(
+            keys=keys,
+            offsets=np.append(starts, len(counts)).astype(np.int64),
+            cell=counts['cell'].to_numpy(np.uint16),
+            count=counts['count'].to_numpy(np.uint32),
+            categories={name: counts[name].to_numpy(np.int8) for name in CATEGORIES},
+            vocabularies=vocabularies,
+        )
+
+    # -------------------------------------------------------------------
+    # Persist and load
+    # -------------------------------------------------------------------
+
+    def save(self, directory: str = SHOT_BINS) -> None:
+        # Built in a sibling directory and swapped in, so readers never see a mix
+        tmp_dir = f"{directory}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        arrays = {'keys': self.keys, 'offsets': self.offsets, 'cell': self.cell, 'count': self.count,
+                  **self.categories}
+        for name in _ARRAYS:
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), arrays[name])
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+            json.dump({'version': self.version, 'grid_feet': GRID_FEET, 'grid_x': GRID_X, 'grid_y': GRID_Y,
+                       'vocabularies': self.vocabularies}, f, indent=1)
+
+        old_dir = f"{directory}.old"
+        if os.path.isdir(directory):
+            os.replace(directory, old_dir)
+        os.replace(tmp_dir, directory)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory: str = SHOT_BINS, mmap: bool = True) -> "ShotBins":
+        if not os.path.isdir(directory):
+            raise FileNotFoundError(f"No shot bins at {directory}; run python -m app.shots first")
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        if (meta['grid_feet'], tuple(meta['grid_x']), tuple(meta['grid_y'])) != (GRID_FEET, GRID_X, GRID_Y):
+            raise ValueError(f"Shot bins at {directory} were built on a different grid; rebuild them")
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None)
+                  for name in _ARRAYS}
+        return cls(
+            keys=np.asarray(arrays['keys']),
+            offsets=arrays['offsets'],
+            cell=arrays['cell'],
+            count=arrays['count'],
+            categories={name: arrays[name] for name in CATEGORIES},
+            vocabularies=meta['vocabularies'],
+            version=meta.get('version'),
+        )
+
+    # -------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------
+
+    def select(self, players: Iterable[int], seasons: Optional[Iterable[int]] = None,
+               game_types: Optional[Iterable[int]] = (2,)) -> np.ndarray:
+        # Key rows matching every filter (None means any)
+        rows = [self._by_player[player] for player in players if player in self._by_player]
+        if not rows:
+            return np.empty(0, dtype=np.int64)
+        rows = np.concatenate(rows)
+        if seasons is not None:
+            rows = rows[np.isin(self.keys[rows, 1], list(seasons))]
+        if game_types is not None:
+            rows = rows[np.isin(self.keys[rows, 2], list(game_types))]
+        return rows
+
+    def _entries(self, rows: np.ndarray) -> np.ndarray:
+        # Entry positions owned by the given key rows, without a Python loop per key
+        starts, ends = self.offsets[rows], self.offsets[rows + 1]
+        lengths = ends - starts
+        if not lengths.sum():
+            return np.empty(0, dtype=np.int64)
+        return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+    def _category_mask(self, entries: np.ndarray, name: str, values: Optional[Sequence[str]]) -> Optional[np.ndarray]:
+        if values is None:
+            return None
+        codes = [self._codes[name][value] for value in values if value in self._codes[name]]
+        return np.isin(self.categories[name][entries], codes)
+
+    def heatmap(self, players: Iterable[int], seasons: Optional[Iterable[int]] = None,
+                game_types: Optional[Iterable[int]] = (2,), events: Optional[Sequence[str]] = None,
+                shot_types: Optional[Sequence[str]] = None, strengths: Optional[Sequence[str]] = None,
+                feet: int = GRID_FEET) -> np.ndarray:
+        """Shot counts on the rink grid for the union of `players` over
+        `seasons` (default: every season) and `game_types` (default: regular
+        season), optionally limited to some events ("goal", ...), shot types
+        ("wrist", ...) or strengths ("EV", "PP", "SH"), at `feet` resolution."""
+        entries = self._entries(self.select(players, seasons, game_types))
+        mask = None
+        for name, values in (('event', events), ('shot_type', shot_types), ('strength', strengths)):
+            category_mask = self._category_mask(entries, name, values)
+            if category_mask is not None:
+                mask = category_mask if mask is None else mask & category_mask
+        if mask is not None:
+            entries = entries[mask]
+
+        rows, columns = GRID_SHAPE
+        grid = np.bincount(self.cell[entries], weights=self.count[entries], minlength=rows * columns)
+        return coarsen(grid.astype(np.uint32).reshape(rows, columns), feet)
+
+    def grid(self, player: int, season: int, game_type: int = 2) -> np.ndarray:
+        # The dense base-resolution grid of a single key
+        return self.heatmap([player], [season], [game_type])
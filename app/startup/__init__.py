@@ -0,0 +1,3 @@
+from .lazy import lazy_exports
+from .profiler import (HEAVY_IMPORTS, ImportTime, StartupProfile, heavy_imports, import_chain, import_times,
+                       startup_profile)
@@ -0,0 +1,52 @@
+import argparse
+import asyncio
+import importlib
+import sys
+
+from .profiler import heavy_imports, import_chain, import_times, startup_profile
+
+
+# -----------------------------------------------------------------------
+# Startup profiler: python -m app.startup [--check]
+#
+# Imports the app in a fresh interpreter under -X importtime and lists the
+# slowest imports, then imports it here and runs its startup hooks, which
+# print how long each one took. --check fails if any of the HEAVY_IMPORTS
+# (pandas, matplotlib, ...) were imported by the app.
+# -----------------------------------------------------------------------
+
+async def _run_lifespan(app) -> None:
+    async with app.router.lifespan_context(app):
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile the app's imports and startup hooks")
+    parser.add_argument("--module", default="main", help="module defining the FastAPI `app`")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--imports-only", action="store_true", help="skip running the startup hooks")
+    parser.add_argument("--check", action="store_true", help="exit 1 if a heavy package was imported")
+    args = parser.parse_args()
+
+    times = import_times(args.module)
+    total = next((entry.cumulative_seconds for entry in times if entry.module == args.module), 0.0)
+    print(f"📦 import {args.module}: {total * 1000:.0f} ms in a fresh interpreter ({len(times)} modules)")
+
+    # Top-level packages and the app's own modules, by what importing each cost
+    listed = [entry for entry in times if "." not in entry.module or entry.package == "app"]
+    listed.sort(key=lambda entry: entry.cumulative_seconds, reverse=True)
+    print(f"   {'cumulative':>10}  {'self':>8}  module")
+    for entry in listed[:args.top]:
+        print(f"   {entry.cumulative_seconds * 1000:7.1f} ms  {entry.self_seconds * 1000:5.1f} ms  {entry.module}")
+
+    heavy = heavy_imports(times)
+    for package in heavy:
+        print(f"⚠️ {package} imported via {' -> '.join(import_chain(times, package))}")
+
+    if not args.imports_only:
+        startup_profile.reset()
+        module = importlib.import_module(args.module)
+        asyncio.run(_run_lifespan(module.app))
+
+    if args.check and heavy:
+        sys.exit(1)
@@ -0,0 +1,35 @@
+import importlib
+import sys
+from typing import Callable, Dict, Iterable, List, Tuple
+
+
+# -----------------------------------------------------------------------
+# Lazy package exports
+#
+# A package __init__ that re-exports its modules' names imports every one
+# of them, so importing the one light module a route needs (app.data.lookup)
+# drags pandas in through its siblings. lazy_exports() gives the package a
+# module-level __getattr__ (PEP 562) instead: `from app.data import
+# load_rosters` works as before, but app.data.store is only imported the
+# first time something asks for one of its names.
+# -----------------------------------------------------------------------
+
+def lazy_exports(package: str, exports: Dict[str, Iterable[str]]) -> Tuple[Callable, Callable, List[str]]:
+    """The `__getattr__`, `__dir__` and `__all__` of `package`, which
+    re-exports the names listed per submodule in `exports`."""
+    owners = {name: module for module, names in exports.items() for name in names}
+    namespace = sys.modules[package].__dict__
+
+    def __getattr__(name: str):
+        module = owners.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(f"{package}.{module}"), name)
+        # Stored on the package, so the next lookup doesn't come back here
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(owners))
+
+    return __getattr__, __dir__, list(owners)
@@ -0,0 +1,117 @@
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+
+# Packages that must never be imported just to serve the site: the analysis
+# stack and the API crawler's HTTP client. Dashboards import them on demand.
+HEAVY_IMPORTS = ("pandas", "matplotlib", "seaborn", "statsmodels", "scipy", "requests", "PIL")
+
+
+# -----------------------------------------------------------------------
+# Startup profile
+#
+# How long the app took to become ready in this process: importing main
+# (timed from when this module was first imported, which main does before
+# anything else) and then each startup hook in the lifespan, in order.
+# Every worker prints it once it's ready.
+# -----------------------------------------------------------------------
+
+@dataclass
+class StartupProfile:
+    started: float = field(default_factory=time.perf_counter)
+    steps: Dict[str, float] = field(default_factory=dict)
+    _last: Optional[float] = None
+
+    def reset(self) -> None:
+        self.started, self.steps, self._last = time.perf_counter(), {}, None
+
+    def mark(self, name: str) -> None:
+        # Time since the previous mark (or since startup) goes to `name`
+        now = time.perf_counter()
+        self.steps[name] = now - (self.started if self._last is None else self._last)
+        self._last = now
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._last = time.perf_counter()
+            self.steps[name] = self._last - start
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.steps.values())
+
+    def report(self) -> str:
+        steps = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.steps.items())
+        return f"🚀 Ready in {self.total_seconds * 1000:.0f} ms ({steps})"
+
+
+# The app's startup profile (main.py marks the steps)
+startup_profile = StartupProfile()
+
+
+# -----------------------------------------------------------------------
+# Import times
+#
+# Per-module import times of a fresh interpreter importing `module`, as
+# measured by python -X importtime: the module's own time and its time
+# including everything it imported first.
+# -----------------------------------------------------------------------
+
+_IMPORT_TIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+@dataclass
+class ImportTime:
+    module: str
+    self_seconds: float
+    cumulative_seconds: float
+    depth: int
+
+    @property
+    def package(self) -> str:
+        return self.module.split(".")[0]
+
+
+def import_times(module: str = "main", python: str = sys.executable) -> List[ImportTime]:
+    """Every module imported by `import module` in a new interpreter, in
+    the order they finished importing."""
+    result = subprocess.run([python, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    times = []
+    for line in result.stderr.splitlines():
+        match = _IMPORT_TIME.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            times.append(ImportTime(name, int(own) / 1e6, int(cumulative) / 1e6, len(indent) // 2))
+    return times
+
+
+def heavy_imports(times: List[ImportTime]) -> List[str]:
+    # The HEAVY_IMPORTS packages that were imported
+    packages = {entry.package for entry in times}
+    return [name for name in HEAVY_IMPORTS if name in packages]
+
+
+def import_chain(times: List[ImportTime], module: str) -> List[str]:
+    """Who imported `module`: the chain of imports from the top level down
+    to it (importtime lists a module's imports before the module itself)."""
+    for i, entry in enumerate(times):
+        if entry.module == module:
+            chain, depth = [module], entry.depth
+            for parent in times[i + 1:]:
+                if parent.depth < depth:
+                    chain.append(parent.module)
+                    depth = parent.depth
+            return chain[::-1]
+    return []
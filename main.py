@@ -1,15 +1,54 @@
+# Start the startup profile's clock before anything else is imported
+from app.startup import startup_profile
+
 # Import core FastAPI tools and classes
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-from app.routes import core_router, deepdive_router, dashboard_router
+from app.assets import ImmutableStaticFiles, PrecompressedStaticFiles
+from app.data import SharedDataset, roster_index
+from app.live import live_poller
+from app.metrics import TimingMiddleware
+from app.routes import (core_router, deepdive_router, dashboard_router, lookup_router, metrics_router, shots_router,
+                        page_cache)
+from app.search import player_search
+
+
+# Render every static page into the page cache and attach the lookup API
+# and player search to the shared roster dataset (publishing it if this is
+# the first worker) before taking traffic, timing each step, and stop the
+# live game poller (if a dashboard started it) on the way out
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with startup_profile.step("page cache"):
+        page_cache.warm()
+    try:
+        with startup_profile.step("shared dataset"):
+            dataset = SharedDataset.open()
+    except FileNotFoundError as e:
+        print(f"⚠️ Lookup API disabled: {e}")
+    else:
+        with startup_profile.step("roster index"):
+            roster_index.attach(dataset)
+        with startup_profile.step("player search"):
+            player_search.attach(dataset)
+    print(startup_profile.report())
+    yield
+    await live_poller.stop()
 
 # Initialize the FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan = lifespan)
 
-# Mount the /static URL path to serve all the static files
-app.mount("/static", StaticFiles(directory = "static"), name = "static")
+# Time every request and count response sizes (served at /metrics)
+app.add_middleware(TimingMiddleware)
+
+# Mount the fingerprinted copies first (cached for a year, see python -m app.assets),
+# then the /static URL path to serve all the static files. Both serve the
+# prebuilt .br / .gz copies of text files to clients that accept them.
+app.mount("/static/hashed", ImmutableStaticFiles(directory = "static/hashed", check_dir = False), name = "hashed")
+app.mount("/static", PrecompressedStaticFiles(directory = "static"), name = "static")
 
 # Tell FastAPI to use the "Templates" folder for the html Templates
 templates = Jinja2Templates(directory = "templates")
@@ -18,6 +57,11 @@ templates = Jinja2Templates(directory = "templates")
 app.include_router(core_router)
 app.include_router(deepdive_router, prefix="/deep-dives")
 app.include_router(dashboard_router)
+app.include_router(lookup_router)
+app.include_router(shots_router)
+app.include_router(metrics_router)
+
+startup_profile.mark("imports")
 
 
 
@@ -9,31 +9,78 @@ Created on Sun Jun 29 15:00:18 2025
 """
 
 # Import the libraries needed
-import requests
-import pandas as pd
-import time
+import argparse
 import os
+import sys
+import time
+
+import pandas as pd
+
+# Make the project root importable so the shared app.* modules resolve
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.nhl import (Crawler, CrawlJournal, FranchiseIndex, PartitionManifest, ResponseCache,
+                     crawl_to_journal, fetch_teams, historical_rosters_immutable, iter_partitions,
+                     merge_partitions, season_range)
+from app.nhl import rosters as nhl_rosters
+from app.data import ROSTER_STORE, write_player_careers, write_roster_store
 
 # ----------------------------------------------------------------------
 #
-# PULL ALL THE TEAM ABBREVIATIONS FOR ALL TIME
+# CRAWLER SETTINGS
 #
 # ----------------------------------------------------------------------
 
-# Create a list of all active and defunct NHL teams
-endpoint = "https://api.nhle.com/stats/rest/en/team"
-
-# Make a get request to the API endpoint
-response = requests.get(endpoint)
+# Defaults keep us polite to the API: ~10 requests/second overall, never
+# more than 8 in flight at once, and a few retries with backoff on 429/5xx.
+parser = argparse.ArgumentParser(description="Pull every NHL roster since 1917.")
+parser.add_argument("--rate", type=float, default=10.0, help="Max requests per second")
+parser.add_argument("--workers", type=int, default=16, help="Worker threads")
+parser.add_argument("--per-host", type=int, default=8, help="Max concurrent requests per host")
+parser.add_argument("--retries", type=int, default=3, help="Retries on errors and 429/5xx")
+parser.add_argument("--last-year", type=int, default=2024, help="Start year of the last season")
+parser.add_argument("--full-probe", action="store_true", help="Ignore the franchise index and try every team in every season")
+parser.add_argument("--incremental", action="store_true", help="Only pull new partitions and the current season, and merge them into rosters.csv")
+parser.add_argument("--restart", action="store_true", help="Throw away the journal of an interrupted crawl instead of resuming it")
+parser.add_argument("--batch-size", type=int, default=100, help="Rosters per checkpoint batch")
+parser.add_argument("--offline", action="store_true", help="Rebuild rosters.csv from the HTTP cache only")
+parser.add_argument("--no-cache", action="store_true", help="Skip the on-disk HTTP cache")
+parser.add_argument("--stats-api", default=nhl_rosters.STATS_API, help="Override the stats API base URL")
+parser.add_argument("--web-api", default=nhl_rosters.WEB_API, help="Override the web API base URL")
+args, _ = parser.parse_known_args()
+if args.offline and args.no_cache:
+    parser.error("--offline needs the HTTP cache")
+
+# Raw API responses are cached on disk. Rosters for finished seasons never
+# change, so only the current season (and the team lists) go back to the API,
+# and --offline re-flattens everything without any network at all.
+cache = None
+if not args.no_cache:
+    cache = ResponseCache(
+        os.path.join("data", "http_cache"),
+        immutable=historical_rosters_immutable(season_range(args.last_year, args.last_year)[0]),
+        offline=args.offline
+    )
+
+crawler = Crawler(
+    rate=args.rate,
+    max_workers=args.workers,
+    per_host=args.per_host,
+    retries=args.retries,
+    cache=cache
+)
 
-# Pull the data
-data = response.json()
+# ----------------------------------------------------------------------
+#
+# PULL ALL THE TEAM ABBREVIATIONS FOR ALL TIME
+#
+# ----------------------------------------------------------------------
 
-# Flatten 'data' key into a DataFrame
-df_teams = pd.json_normalize(data['data'])
+# Flatten the list of all active and defunct NHL teams into a DataFrame
+df_teams = pd.json_normalize(fetch_teams(crawler, base=args.stats_api))
 
 # Pull all the tricodes into a list
-
 team_abbreviations = df_teams['triCode'].to_list()
 
 
@@ -43,70 +90,86 @@ team_abbreviations = df_teams['triCode'].to_list()
 #
 # ----------------------------------------------------------------------
 
-# Test this out by pulling all rosters in 2025
-all_rosters = []
-
 # List of all seasons
-seasons = [int(f"{year}{year+1}") for year in range(1917, 2025)]
-
-for season in seasons:
-    
-    # Print a progress message
-    print(f"Working on {season}")
-    
-    # For loop that goes over teams and pulls the rosters taht year,
-    # renames variables, adds a season variable, flattens, and appends.
-    for abbr in team_abbreviations:
-        # Set the URL
-        url = f'https://api-web.nhle.com/v1/roster/{abbr}/{season}'
-        
-        try:
-            response = requests.get(url)
-            time.sleep(0.5) # Just a slight slowdown to not be rude
-            response.raise_for_status()
-            data = response.json()
-    
-            for player in data.get('forwards', []) + data.get('defensemen', []) + data.get('goalies', []):
-                player_flat = {
-                    'team': abbr,
-                    'id': player.get('id'),
-                    'first_name': player.get('firstName', {}).get('default'),
-                    'last_name': player.get('lastName', {}).get('default'),
-                    'position': player.get('positionCode'),
-                    'sweater': player.get('sweaterNumber'),
-                    'shoots': player.get('shootsCatches'),
-                    'birth_date': player.get('birthDate'),
-                    'birth_city': player.get('birthCity', {}).get('default'),
-                    'birth_province': player.get('birthStateProvince', {}).get('default') if 'birthStateProvince' in player else None,
-                    'birth_country': player.get('birthCountry'),
-                    'height_in': player.get('heightInInches'),
-                    'weight_lb': player.get('weightInPounds'),
-                    'headshot': player.get('headshot'),
-                    'season': season
-                }
-                all_rosters.append(player_flat)
-                
-            # ✅ Success message
-            print(f"  ✅ Loaded {abbr} roster for {season}")
-        
-        except:
-            pass
-        #except Exception as e:
-        #    print(f"Failed to retrieve roster for {abbr}: {e}")
-
-# Convert to DataFrame
-rosters_df = pd.DataFrame(all_rosters)
-
-# Preview
-print(rosters_df.head())
+seasons = season_range(last_year=args.last_year)
 
 # Set path to project-relative data folder
 data_folder = os.path.join("data", "nhl-player-demographics")
 os.makedirs(data_folder, exist_ok=True)  # Make sure the folder exists
-
-# Save the file into that folder
 csv_path = os.path.join(data_folder, "rosters.csv")
-rosters_df.to_csv(csv_path, index=False)
+
+# Only ask for (team, season) pairs that can plausibly exist. The franchise
+# index remembers every 200/404 we've seen; on a first run it is seeded from
+# the API's per-team roster-season list (one call per team).
+index = FranchiseIndex(os.path.join(data_folder, "franchise_index.json"))
+if args.full_probe:
+    plan = [(season, abbr) for season in seasons for abbr in team_abbreviations]
+else:
+    new_teams = [abbr for abbr in team_abbreviations if abbr not in index.teams]
+    if new_teams:
+        seeded = index.seed_from_metadata(crawler, new_teams, base=args.web_api)
+        print(f"Seeded franchise index for {seeded} of {len(new_teams)} new teams")
+    plan = index.plan(team_abbreviations, seasons)
+
+# The manifest tracks which (season, team) partitions are already in
+# rosters.csv. An incremental refresh only pulls partitions we don't have
+# yet plus the current season, which is the only one that can still change.
+manifest = PartitionManifest.for_csv(csv_path)
+incremental = args.incremental and os.path.isfile(csv_path)
+if incremental:
+    plan = [key for key in plan if key not in manifest or key[0] == seasons[-1]]
+
+possible = len(seasons) * len(team_abbreviations)
+print(f"Planned {len(plan)} of {possible} possible roster requests")
+
+# Finished rosters are checkpointed to a journal in batches rather than held
+# in memory. If a previous crawl died part way through, pick up where it
+# left off instead of starting again from 1917.
+journal = CrawlJournal(os.path.join(data_folder, "crawl_journal"), batch_size=args.batch_size)
+if args.restart:
+    journal.reset()
+pending = journal.pending(plan)
+if len(pending) < len(plan):
+    print(f"Resuming: {len(plan) - len(pending)} rosters already in the journal")
+
+# Every pending roster is fetched concurrently under the rate limit,
+# flattened, and flushed to the journal
+start_time = time.perf_counter()
+crawl_to_journal(iter_partitions(crawler, pending, base=args.web_api, index=index), journal, index)
+print(f"Finished {len(pending)} roster requests in {time.perf_counter() - start_time:.1f}s")
+
+if cache is not None:
+    print(cache.stats.report())
+
+if incremental:
+    # Merge into the existing file without rewriting untouched history
+    summary = merge_partitions(csv_path, manifest, journal.partitions(plan))
+    print(summary)
+    changed_seasons = summary.seasons
+else:
+    # Full rebuild: stitch the journaled rosters together in season/team order
+    journal.write_csv(csv_path, plan)
+    manifest.digests = {}
+    manifest.update(journal.partitions(plan))
+    manifest.save()
+    changed_seasons = None
+
+# The output is complete, so the journal has done its job
+journal.reset()
+rosters_df = pd.read_csv(csv_path)
+
+# Mirror the CSV into the season-partitioned Parquet store the analyses load
+# from (compact dtypes, column and season pruning). Incremental runs only
+# rewrite the seasons that changed.
+written = write_roster_store(rosters_df, ROSTER_STORE, seasons=changed_seasons)
+print(f"✅ Parquet store updated for {len(written)} seasons: {ROSTER_STORE}")
+
+# Rebuild the shared per-player careers table every deep dive reads from
+careers_df = write_player_careers(ROSTER_STORE)
+print(f"✅ Player careers table rebuilt: {len(careers_df)} players")
+
+# Preview
+print(rosters_df.head())
 
 print(f"✅ Roster data saved to: {csv_path}")
 